@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark harness - tag yazma ve önizleme hot path'leri
+
+Sentetik MP3 (sessiz MPEG frame'leri + farklı ID3 tag/padding/APIC
+durumları) ve farklı çözünürlük/formatta cover resimleri üretir, sonra
+write_cover (load, delall, add, save), render_preview ve run_batch
+yollarını, gecikme eklenmiş sahte bir "ağ mount'unda" run_batch ile
+run_batch_async'i, ayrıca modül import / CLI başlangıç süresini ölçer.
+Her vaka ayrı bir process'te koşar ve kendi peak RSS'ini raporlar.
+Sonuç JSON olarak yazılır; farklı sürümlerin çıktıları karşılaştırılarak
+regresyonlar yakalanır.
+
+    python bench_mp3_cover_tool.py --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import builtins
+import platform
+import resource
+import tempfile
+import traceback
+import subprocess
+import multiprocessing
+from contextlib import contextmanager
+
+from mutagen.id3 import ID3, APIC, TIT2
+from PIL import Image
+
+import mp3_cover_tool as tool
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, padding yok -> 417 byte'lık frame
+SILENT_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+# Mevcut tag durumları
+TAG_SCENARIOS = ('no_tag', 'tight_tag', 'padded_tag', 'multi_apic')
+
+# Cover çözünürlükleri ve formatları
+COVER_SIZES = (300, 1000, 3000)
+COVER_FORMATS = ('JPEG', 'PNG')
+
+
+def make_cover(path, size, fmt):
+    """Gürültülü (sıkıştırması gerçekçi) kare cover üret"""
+    image = Image.effect_noise((size, size), 48).convert('RGB')
+    image.save(path, fmt, **({'quality': 90} if fmt == 'JPEG' else {}))
+    return path
+
+
+def make_mp3(path, audio_bytes, scenario, picture=b''):
+    """Sessiz MPEG frame'lerinden MP3 üret, sonra senaryoya göre tag ekle"""
+    frames = max(1, audio_bytes // len(SILENT_FRAME))
+    with open(path, 'wb') as f:
+        f.write(SILENT_FRAME * frames)
+
+    if scenario == 'no_tag':
+        return path
+
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text=u'Benchmark'))
+    if scenario == 'multi_apic':
+        for picture_type, desc in ((3, u'Front'), (4, u'Back'), (8, u'Artist')):
+            tags.add(APIC(encoding=3, mime='image/jpeg', type=picture_type,
+                          desc=desc, data=picture))
+    padding = 64 * 1024 if scenario == 'padded_tag' else 0
+    tags.save(path, padding=lambda info: padding)
+    return path
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def latency_stats(samples, total_elapsed=None):
+    """Gecikme listesi -> p50/p99/ortalama ve files/s"""
+    total = total_elapsed if total_elapsed is not None else sum(samples)
+    return {
+        'count': len(samples),
+        'total_s': round(total, 6),
+        'files_per_sec': round(len(samples) / total, 2) if total else None,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3) if samples else None,
+        'p99_ms': round(percentile(samples, 99) * 1000, 3) if samples else None,
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3) if samples else None
+    }
+
+
+def written_bytes():
+    """Bu process'in write() ile yazdığı toplam byte (Linux /proc/self/io)"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_kb(who=resource.RUSAGE_SELF):
+    """Peak RSS (KB, Linux ru_maxrss birimi)"""
+    return resource.getrusage(who).ru_maxrss
+
+
+def _isolated_child(conn, func, args):
+    tool.reset_peak_rss()
+    try:
+        result = func(*args)
+    except BaseException:
+        conn.send(('error', traceback.format_exc()))
+    else:
+        rss = tool.peak_rss()
+        conn.send(('ok', result, {
+            'self': rss // 1024 if rss is not None else None,
+            'children': peak_rss_kb(resource.RUSAGE_CHILDREN)
+        }))
+    finally:
+        conn.close()
+
+
+def isolated(func, *args):
+    """func'ı fork edilmiş ayrı bir process'te çalıştır, peak RSS'i sonuca ekle
+    
+    Her vaka kendi process'inde koştuğu için önceki vakaların peak'i
+    sonrakine taşınmaz; self VmHWM başta sıfırlanır, children sadece bu
+    vakanın pool worker'larını kapsar.
+    """
+    ctx = multiprocessing.get_context('fork')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_isolated_child, args=(child_conn, func, args))
+    process.start()
+    child_conn.close()
+    try:
+        message = parent_conn.recv()
+    except EOFError:
+        message = ('error', f'benchmark process exited with code {process.exitcode}')
+    process.join()
+    if message[0] == 'error':
+        raise RuntimeError(message[1])
+    result, rss = message[1], message[2]
+    result['peak_rss_kb'] = rss
+    return result
+
+
+def write_case(workdir, scenario, cover_path, files, audio_bytes):
+    """write_cover hot path'i: tek tag senaryosu x cover"""
+    cover = tool.load_cover(cover_path)
+    case_dir = os.path.join(workdir, 'write')
+    os.makedirs(case_dir, exist_ok=True)
+    template = make_mp3(os.path.join(case_dir, 'template.mp3'), audio_bytes,
+                        scenario, picture=cover.data[:4096])
+    targets = []
+    for i in range(files):
+        target = os.path.join(case_dir, f'{i:05d}.mp3')
+        shutil.copyfile(template, target)
+        targets.append(target)
+
+    samples = []
+    modes = {}
+    before = written_bytes()
+    for target in targets:
+        result = tool.write_cover(target, cover, force=True)
+        samples.append(result['elapsed'])
+        modes[result['write_mode']] = modes.get(result['write_mode'], 0) + 1
+    after = written_bytes()
+
+    case = {
+        'scenario': scenario,
+        'cover': os.path.basename(cover_path),
+        'cover_bytes': cover.size,
+        'audio_bytes': audio_bytes,
+        'write_modes': modes,
+        'bytes_written_per_file': (after - before) // files if before is not None else None
+    }
+    case.update(latency_stats(samples))
+    shutil.rmtree(case_dir)
+    return case
+
+
+def bench_write(workdir, covers, files, audio_bytes):
+    """write_cover: her tag senaryosu x cover ayrı bir vaka"""
+    return [isolated(write_case, workdir, scenario, cover_path, files, audio_bytes)
+            for scenario in TAG_SCENARIOS for cover_path in covers]
+
+
+def preview_case(cover_path, repeat, workdir):
+    """render_preview: cache'siz decode ve cache'li (bellek) yol"""
+    cold = []
+    peaks = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        image, info = tool.render_preview(cover_path)
+        cold.append(time.perf_counter() - start)
+        peaks.append(info['buffer_bytes'])
+
+    cache = tool.ThumbnailCache(cache_dir=os.path.join(workdir, 'thumbs'))
+    tool.render_preview(cover_path, cache=cache)
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tool.render_preview(cover_path, cache=cache)
+        warm.append(time.perf_counter() - start)
+
+    return {
+        'cover': os.path.basename(cover_path),
+        'cover_bytes': os.path.getsize(cover_path),
+        'decode_buffer_bytes': max(peaks),
+        'decode': latency_stats(cold),
+        'cached': latency_stats(warm)
+    }
+
+
+def bench_preview(covers, repeat, workdir):
+    """Her cover için ayrı bir önizleme vakası"""
+    return [isolated(preview_case, cover_path, repeat, workdir) for cover_path in covers]
+
+
+def bench_batch(workdir, cover_path, files, audio_bytes, workers):
+    """run_batch: process pool ile toplu yazma"""
+    batch_dir = os.path.join(workdir, 'batch')
+    os.makedirs(batch_dir, exist_ok=True)
+    template = make_mp3(os.path.join(batch_dir, 'template.mp3'), audio_bytes, 'tight_tag')
+    jobs = []
+    for i in range(files):
+        target = os.path.join(batch_dir, f'{i:05d}.mp3')
+        shutil.copyfile(template, target)
+        jobs.append((target, cover_path))
+
+    report = tool.run_batch(jobs, workers=workers, force=True)
+    samples = [r['elapsed'] for r in report.results if r['ok']]
+    result = {
+        'workers': workers or os.cpu_count(),
+        'files': files,
+        'failed': report.failed,
+        'mb_per_sec': round(report.mb_per_sec, 2),
+        # Worker'ların write() sayaçları okunamıyor: in_place -> tag, rewrite -> tüm dosya
+        'bytes_written_per_file_est': sum(
+            r['old_tag_size'] if r['write_mode'] == 'in_place' else r['bytes']
+            for r in report.results if r['ok']) // max(1, report.ok),
+        'write_modes': {'in_place': report.in_place, 'rewrite': report.rewritten}
+    }
+    result.update(latency_stats(samples, total_elapsed=report.elapsed))
+    shutil.rmtree(batch_dir)
+    return result
+
+
+@contextmanager
+def simulated_latency(root, delay):
+    """root altındaki her open/stat çağrısına delay saniye round-trip ekle
+    
+    NFS/SMB yerine geçen basit bir stand-in: gecikme sleep ile (GIL'siz)
+    eklenir, fork edilen pool worker'ları da yamayı devralır.
+    """
+    originals = (builtins.open, os.open, os.stat)
+    prefix = os.path.abspath(root) + os.sep
+
+    def slow(func):
+        def wrapper(path, *args, **kwargs):
+            if isinstance(path, str) and os.path.abspath(path).startswith(prefix):
+                time.sleep(delay)
+            return func(path, *args, **kwargs)
+        return wrapper
+
+    builtins.open, os.open, os.stat = (slow(func) for func in originals)
+    try:
+        yield
+    finally:
+        builtins.open, os.open, os.stat = originals
+
+
+def latency_case(name, mount_dir, template, cover, targets, workers, delay, concurrency):
+    """Gecikmeli mount'ta tek bir çalıştırma (process_pool ya da async)"""
+    for target in targets:
+        shutil.copyfile(template, target)
+    jobs = [(target, cover) for target in targets]
+    with simulated_latency(mount_dir, delay):
+        if name == 'async':
+            report = tool.run_batch_async(jobs, concurrency=concurrency,
+                                          per_mount=concurrency, force=True)
+        else:
+            report = tool.run_batch(jobs, workers=workers, force=True)
+    return {
+        'in_flight': report.workers,
+        'failed': report.failed,
+        'elapsed': round(report.elapsed, 3),
+        'files_per_sec': round(report.files_per_sec, 1)
+    }
+
+
+def bench_latency(workdir, cover_path, files, audio_bytes, workers, delay, concurrency):
+    """Yüksek gecikmeli mount: process pool (run_batch) vs asyncio (run_batch_async)"""
+    mount_dir = os.path.join(workdir, 'mount')
+    os.makedirs(mount_dir, exist_ok=True)
+    template = make_mp3(os.path.join(workdir, 'latency_template.mp3'), audio_bytes, 'tight_tag')
+    cover = shutil.copyfile(cover_path, os.path.join(mount_dir, 'cover.jpg'))
+    targets = [os.path.join(mount_dir, f'{i:05d}.mp3') for i in range(files)]
+    results = {'delay_ms': delay * 1000, 'files': files}
+    for name in ('process_pool', 'async'):
+        results[name] = isolated(latency_case, name, mount_dir, template, cover, targets,
+                                 workers, delay, concurrency)
+    results['speedup'] = round(results['async']['files_per_sec']
+                               / max(results['process_pool']['files_per_sec'], 1e-9), 2)
+    shutil.rmtree(mount_dir)
+    return results
+
+
+# CLI yolunda hiç yüklenmemesi gereken modüller
+HEAVY_MODULES = ('tkinter', 'tkinterdnd2', 'PIL', 'sqlite3', 'pstats', 'multiprocessing')
+
+
+def parse_importtime(stderr, module):
+    """-X importtime çıktısı -> (modülün kümülatif süresi, doğrudan alt import'lar) (µs)"""
+    children = []
+    total = None
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() == module and not name.startswith('  '):
+            total = int(cumulative)
+        elif name.startswith('   ') and not name.startswith('    '):
+            children.append((name.strip(), int(cumulative)))
+    return total, children
+
+
+def bench_startup(repeat):
+    """Process başlangıcı: modül import süresi (-X importtime) ve CLI duvar süresi"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    # İlk çalıştırma .pyc üretir, ölçüme katılmaz (kurulu araçta .pyc hep vardır)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    subprocess.run([sys.executable, '-c', 'import mp3_cover_tool'], env=env, check=True)
+
+    imports = []
+    children = {}
+    for _ in range(repeat):
+        run = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import mp3_cover_tool'],
+                             env=env, capture_output=True, text=True, check=True)
+        total, direct = parse_importtime(run.stderr, 'mp3_cover_tool')
+        imports.append(total / 1e6)
+        for name, cumulative in direct:
+            children.setdefault(name, []).append(cumulative)
+
+    wall = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(here, 'mp3_cover_tool.py'), '--help'],
+                       env=env, capture_output=True, check=True)
+        wall.append(time.perf_counter() - start)
+
+    probe = subprocess.run(
+        [sys.executable, '-c', 'import sys, json, mp3_cover_tool; print(json.dumps(sorted('
+         '{m.split(".")[0] for m in sys.modules} & set(%r))))' % (HEAVY_MODULES,)],
+        env=env, capture_output=True, text=True, check=True)
+    top = sorted(((percentile(v, 50), name) for name, v in children.items()), reverse=True)[:10]
+    return {
+        'import': latency_stats(imports),
+        'cli_help': latency_stats(wall),
+        'top_imports_us': {name: value for value, name in top},
+        'heavy_modules_loaded': json.loads(probe.stdout)
+    }
+
+
+def environment():
+    """Karşılaştırma için ortam bilgisi"""
+    import mutagen
+    import PIL
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'mutagen': mutagen.version_string,
+        'pillow': PIL.__version__
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the MP3 cover tool hot paths')
+    parser.add_argument('--files', type=int, default=50,
+                        help='MP3 files per write case (default: %(default)s)')
+    parser.add_argument('--audio-kb', type=int, default=4096,
+                        help='audio payload per synthetic MP3 in KB (default: %(default)s)')
+    parser.add_argument('--preview-repeat', type=int, default=5,
+                        help='preview renders per cover (default: %(default)s)')
+    parser.add_argument('--startup-repeat', type=int, default=10,
+                        help='interpreter launches for the startup benchmark (default: %(default)s)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='workers for the batch benchmark (default: CPU count)')
+    parser.add_argument('--latency-ms', type=float, default=5.0,
+                        help='simulated round-trip per open/stat for the network mount '
+                             'benchmark (default: %(default)s)')
+    parser.add_argument('--concurrency', type=int, default=tool.DEFAULT_ASYNC_CONCURRENCY,
+                        help='files in flight for the async run (default: %(default)s)')
+    parser.add_argument('--quick', action='store_true',
+                        help='small run for smoke testing')
+    parser.add_argument('--output', default=None,
+                        help='write the JSON result here (default: stdout)')
+    parser.add_argument('--workdir', default=None,
+                        help='fixture directory (default: a temporary directory)')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.files, args.audio_kb, args.preview_repeat, args.startup_repeat = 5, 256, 2, 3
+    sizes = COVER_SIZES[:2] if args.quick else COVER_SIZES
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='mp3cover-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        covers = [make_cover(os.path.join(workdir, f'cover_{size}.{fmt.lower()}'), size, fmt)
+                  for size in sizes for fmt in COVER_FORMATS]
+        audio_bytes = args.audio_kb * 1024
+
+        output = {'environment': environment(), 'params': vars(args)}
+        output['startup'] = bench_startup(args.startup_repeat)
+        output['write'] = bench_write(workdir, covers, args.files, audio_bytes)
+        output['preview'] = bench_preview(covers, args.preview_repeat, workdir)
+        output['batch'] = isolated(bench_batch, workdir, covers[0], args.files * 4,
+                                   audio_bytes, args.workers)
+        output['latency'] = bench_latency(workdir, covers[0], args.files * 4, 64 * 1024,
+                                          args.workers, args.latency_ms / 1000, args.concurrency)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
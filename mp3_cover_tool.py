@@ -1,22 +1,3312 @@
   #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from tkinterdnd2 import DND_FILES, TkinterDnD
+# Tk, tkinterdnd2 ve Pillow burada import edilmez: headless komutlar her
+# dosya için ayrı process olarak çalışabilir. GUI modülleri _load_gui_modules()
+# ile, Pillow sadece transcode / önizleme yapan fonksiyonların içinde yüklenir.
 import os
+from mutagen import MutagenError
 from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, APIC, error
-from PIL import Image, ImageTk, ImageFilter, ImageEnhance
+from mutagen.id3 import ID3, APIC
 import io
+import sys
+import csv
+import json
+import argparse
+import base64
+import queue
 import threading
 import time
+import hashlib
+import fnmatch
+import select
+import struct
+import stat
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from functools import partial
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+
+try:
+    import resource
+except ImportError:
+    # Windows: peak RSS bilgisi yok
+    resource = None
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: journal kilidi yok
+    fcntl = None
+
+# Desteklenen uzantılar
+MP3_EXTENSIONS = ('.mp3',)
+
+# Uzantı -> cover'ı taşıyan tag konteyneri
+CONTAINER_TYPES = {
+    '.mp3': 'id3',
+    '.flac': 'flac',
+    '.m4a': 'mp4',
+    '.m4b': 'mp4',
+    '.mp4': 'mp4',
+    '.ogg': 'vorbis',
+    '.oga': 'vorbis',
+    '.opus': 'vorbis'
+}
+AUDIO_EXTENSIONS = tuple(CONTAINER_TYPES)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+# Uzantı -> MIME type
+IMAGE_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp'
+}
+
+
+# Resim seti rolleri -> APIC / FLAC picture type ve tag'deki açıklama
+PICTURE_ROLES = {
+    'front': 3,
+    'back': 4,
+    'leaflet': 5,
+    'media': 6,
+    'artist': 8,
+    'band': 10
+}
+PICTURE_DESCS = {3: u'Cover', 4: u'Back', 5: u'Leaflet', 6: u'Media', 8: u'Artist', 10: u'Band'}
+
+# Decode edilen format -> MIME type
+FORMAT_MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'BMP': 'image/bmp'
+}
+
+# Tag sığmadığında yeniden yazarken bırakılacak padding (sonraki cover değişikliği için)
+DEFAULT_PADDING_RESERVE = 64 * 1024
+
+# GUI ilerleme çubuğu için yazma aşamaları (%)
+WRITE_STAGES = {
+    'read': 10,
+    'load': 30,
+    'tag': 60,
+    'save': 80,
+    'done': 100
+}
+
+# GUI iş kuyruğu: aynı anda çalışan dosya sayısı ve sayfa başına satır
+GUI_JOB_WORKERS = min(4, os.cpu_count() or 1)
+QUEUE_PAGE_SIZE = 100
+
+# Atomik yazma: kaç temp dosyada bir fsync + rename yapılacağı
+DEFAULT_FSYNC_BATCH = 32
+
+# Stream kopyalama parça boyutu (copy_file_range/sendfile yoksa)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Watch modu: klasör son olaydan kaç saniye sonra işlenir, polling aralığı
+DEFAULT_SETTLE = 2.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Düşük bellek modu: worker başına bütçe, decode edilecek en fazla piksel
+# ve bütçenin dışında her worker'ın kendi taban RSS'i (interpreter + modüller)
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+DEFAULT_MAX_PIXELS = 40 * 1000 * 1000
+WORKER_BASE_RSS = 64 * 1024 * 1024
+
+# Async mod (ağ mount'ları): toplam eşzamanlı dosya, mount başına üst sınır
+# ve önceden okunacak cover sayısı
+DEFAULT_ASYNC_CONCURRENCY = 64
+DEFAULT_MOUNT_CONCURRENCY = 16
+DEFAULT_READ_AHEAD = 4
+
+# Dry-run planı: kalibrasyon yoksa kullanılan maliyet modeli
+# (dosya başına açma + tag işleme, yeniden yazma hızı, yerinde yazma süresi)
+DEFAULT_COST_MODEL = {
+    'file_overhead': 0.002,
+    'write_bps': 200 * 1024 * 1024,
+    'in_place_seconds': 0.001
+}
+
+# Normalizasyon varsayılanları
+DEFAULT_NORMALIZE = {
+    'max_size': 1000,       # en uzun kenar (px)
+    'format': 'jpeg',       # 'jpeg', 'png' veya 'keep'
+    'quality': 90,          # JPEG başlangıç kalitesi
+    'min_quality': 60,      # max_bytes için inilebilecek en düşük kalite
+    'progressive': True,    # progressive / baseline JPEG
+    'max_bytes': None,      # hedef boyut (None -> sınırsız)
+    'max_pixels': None,     # küçültmeden sonra decode edilebilecek en fazla piksel
+    'crop': None            # (sol, üst, sağ, alt) kenar oranları, ör. CoverAnalyzer'dan
+}
+
+
+def guess_image_mime(image_path):
+    """Dosya uzantısından MIME type tahmin et"""
+    img_extension = os.path.splitext(image_path)[1].lower()
+    return IMAGE_MIME_TYPES.get(img_extension, 'image/jpeg')
+
+
+def sniff_image_mime(data, image_path=''):
+    """Magic byte'lardan MIME type bul, bulunamazsa uzantıya bak"""
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data.startswith(b'BM'):
+        return 'image/bmp'
+    return guess_image_mime(image_path)
+
+
+def _encode_image(image, fmt, options, quality, size):
+    """Resmi verilen boyut/kalitede yeniden encode et"""
+    from PIL import Image
+    
+    if max(image.size) > size:
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    if fmt == 'JPEG':
+        # EXIF / ICC vb. metadata bilerek aktarılmıyor
+        image.save(out, 'JPEG', quality=quality, optimize=True,
+                   progressive=options['progressive'])
+    else:
+        image.save(out, 'PNG', optimize=True)
+    return out.getvalue()
+
+
+def normalize_cover(data, **options):
+    """Cover'ı boyutlandır, yeniden encode et ve EXIF'i temizle
+    
+    (data, mime) döner; MIME type decode edilen formattan seçilir.
+    """
+    from PIL import Image
+    
+    options = dict(DEFAULT_NORMALIZE, **options)
+    image = Image.open(io.BytesIO(data))
+    source_format = image.format
+    original_size = image.size
+    has_alpha = image.mode in ('RGBA', 'LA') or \
+        (image.mode == 'P' and 'transparency' in image.info)
+    
+    # Hedef format
+    if options['format'] == 'png':
+        fmt = 'PNG'
+    elif options['format'] == 'keep' and (source_format == 'PNG' or has_alpha):
+        fmt = 'PNG'
+    else:
+        fmt = 'JPEG'
+        
+    # JPEG'ler DCT ölçeklemesiyle hedefe yakın (ama küçük olmayan) boyutta decode edilir
+    image.draft(None, (options['max_size'], options['max_size']))
+    check_pixels(image.size, options['max_pixels'])
+    image.load()
+    crop = options['crop']
+    if crop:
+        # Oranlar draft() sonrası boyuta uygulanır
+        width, height = image.size
+        image = image.crop((round(crop[0] * width), round(crop[1] * height),
+                            round(crop[2] * width), round(crop[3] * height)))
+    if fmt == 'JPEG':
+        if has_alpha:
+            # Şeffaf alanları beyaz zemine oturt
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        
+    # Orijinal zaten uygunsa ve daha küçükse dokunma
+    already_ok = (source_format == fmt and not crop and 'exif' not in image.info
+                  and max(original_size) <= options['max_size']
+                  and (options['max_bytes'] is None or len(data) <= options['max_bytes']))
+    
+    quality = options['quality']
+    size = min(options['max_size'], max(image.size))
+    encoded = _encode_image(image, fmt, options, quality, size)
+    
+    # Boyut hedefi: önce JPEG kalitesini, sonra çözünürlüğü düşür
+    max_bytes = options['max_bytes']
+    while max_bytes and len(encoded) > max_bytes and size > 64:
+        if fmt == 'JPEG' and quality - 5 >= options['min_quality']:
+            quality -= 5
+        else:
+            size = int(size * 0.85)
+        encoded = _encode_image(image, fmt, options, quality, size)
+        
+    if already_ok and len(data) <= len(encoded):
+        return data, FORMAT_MIME_TYPES[fmt]
+    return encoded, FORMAT_MIME_TYPES[fmt]
+
+
+class InjectionCancelled(Exception):
+    """Kullanıcı işlemi iptal etti"""
+
+
+class MemoryBudgetExceeded(Exception):
+    """İş düşük bellek modunun bütçesine veya piksel sınırına sığmıyor"""
+
+
+def check_pixels(size, max_pixels, hint=""):
+    """(genişlik, yükseklik) piksel sınırını aşıyorsa MemoryBudgetExceeded"""
+    if max_pixels and size[0] * size[1] > max_pixels:
+        raise MemoryBudgetExceeded(f"{size[0]}x{size[1]} image exceeds the "
+                                   f"{max_pixels} pixel limit{hint}")
+
+
+def decode_thumbnail(image_path, size=300):
+    """Resmi sadece size px önizleme için gereken çözünürlükte decode et
+    
+    JPEG draft() ile DCT aşamasında 1/2-1/8 ölçekli decode edilir; PNG/WebP
+    gibi formatlarda ölçekli decode yok, tam çözünürlükte açılır.
+    (image, info) döner; info decode süresini ve decode buffer'ının
+    tahmini boyutunu (buffer_bytes = genişlik x yükseklik x band) içerir.
+    """
+    from PIL import Image
+    
+    start = time.perf_counter()
+    image = Image.open(image_path)
+    original_size = image.size
+    
+    # JPEG: decode sırasında 1/2, 1/4, 1/8 ölçekleme (thumbnail'in reducing_gap'i kadar pay)
+    if image.format == 'JPEG':
+        image.draft('RGB', (size * 2, size * 2))
+    buffer_bytes = image.width * image.height * len(image.getbands())
+    
+    # Paletli resimler NEAREST ile küçülmesin
+    if image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        buffer_bytes += image.width * image.height * len(image.getbands())
+        
+    # Boyutlandır: load + tamsayı reduce() + LANCZOS tek adımda
+    image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    
+    # Retro efekt uygula
+    image = image.convert('RGB')
+    
+    return image, {
+        'source': 'decode',
+        'original_size': original_size,
+        'buffer_bytes': buffer_bytes,
+        'decode_ms': (time.perf_counter() - start) * 1000
+    }
+
+
+def default_cache_dir(name):
+    """XDG cache klasörü altında uygulama alt klasörü"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'mp3_cover_tool', name)
+
+
+def default_journal_path():
+    """Atomik yazma journal'larının varsayılan taban yolu (bkz. RunJournal)"""
+    directory = default_cache_dir('journal')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, 'inject.jsonl')
+
+
+class ThumbnailCache:
+    """Önizleme thumbnail cache'i: bellekte LRU + diskte PNG
+    
+    Anahtar: (gerçek yol, mtime, boyut, önizleme boyutu); resim değişince
+    eski thumbnail kendiliğinden geçersiz olur.
+    """
+    
+    def __init__(self, cache_dir=None, max_items=64):
+        self.cache_dir = cache_dir or default_cache_dir('thumbnails')
+        self.max_items = max_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            # Disk cache kullanılamıyor, sadece bellek
+            self.cache_dir = None
+            
+    @staticmethod
+    def key_for(image_path, size):
+        st = os.stat(image_path)
+        raw = f"{os.path.realpath(image_path)}|{st.st_mtime_ns}|{st.st_size}|{size}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, image_path, size=300):
+        """(thumbnail, info) döner; info['source'] memory/disk/decode"""
+        start = time.perf_counter()
+        key = self.key_for(image_path, size)
+        
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                return image, {'source': 'memory', 'buffer_bytes': 0,
+                               'decode_ms': (time.perf_counter() - start) * 1000}
+            
+        disk_path = os.path.join(self.cache_dir, key + '.png') if self.cache_dir else None
+        if disk_path and os.path.exists(disk_path):
+            from PIL import Image
+            image = Image.open(disk_path)
+            image.load()
+            info = {'source': 'disk',
+                    'buffer_bytes': image.width * image.height * len(image.getbands()),
+                    'decode_ms': (time.perf_counter() - start) * 1000}
+        else:
+            image, info = decode_thumbnail(image_path, size)
+            if disk_path:
+                try:
+                    tmp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    image.save(tmp_path, 'PNG')
+                    os.replace(tmp_path, disk_path)
+                except OSError:
+                    pass
+                
+        with self._lock:
+            self._memory[key] = image
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return image, info
+
+
+def render_preview(image_path, size=300, border_size=10, border_color=(255, 0, 110),
+                   cache=None):
+    """Önizleme resmini hazırla (Tk'ye dokunmaz, worker thread'de çalışabilir)
+    
+    (bordered_image, info) döner.
+    """
+    from PIL import Image
+    
+    if cache is not None:
+        image, info = cache.get(image_path, size)
+    else:
+        image, info = decode_thumbnail(image_path, size)
+    
+    # Retro border ekle (neon pink)
+    bordered_image = Image.new('RGB', 
+                             (image.width + border_size*2, 
+                              image.height + border_size*2), 
+                             border_color)
+    bordered_image.paste(image, (border_size, border_size))
+    return bordered_image, info
+
+
+class CoverEntry:
+    """Okunmuş (gerekirse normalize edilmiş) cover verisi ve hazır APIC frame'i"""
+    
+    def __init__(self, source, data, mime, original_size=None):
+        self.source = source
+        self.data = data
+        self.mime = mime
+        self.original_size = len(data) if original_size is None else original_size
+        self.digest = hashlib.sha1(data).hexdigest()
+        self.read_elapsed = 0.0
+        self._frames = {}
+        
+    @property
+    def size(self):
+        return len(self.data)
+    
+    @property
+    def saved(self):
+        """Normalizasyonla kazanılan byte (gömülen her dosya için)"""
+        return self.original_size - self.size
+    
+    def apic(self):
+        """APIC frame'i bir kez oluştur, sonra tekrar kullan"""
+        if 'apic' not in self._frames:
+            self._frames['apic'] = APIC(
+                encoding=3,
+                mime=self.mime,
+                type=3,
+                desc=u'Cover',
+                data=self.data
+            )
+        return self._frames['apic']
+    
+    def picture(self):
+        """FLAC Picture bloğu (Vorbis comment'lerde de aynısı kullanılır)"""
+        if 'picture' not in self._frames:
+            self._frames['picture'] = make_flac_picture(3, self.mime, u'Cover', self.data)
+        return self._frames['picture']
+    
+    def vorbis_picture(self):
+        """METADATA_BLOCK_PICTURE değeri (base64 Picture bloğu)"""
+        if 'vorbis' not in self._frames:
+            self._frames['vorbis'] = base64.b64encode(self.picture().write()).decode('ascii')
+        return self._frames['vorbis']
+    
+    def mp4_cover(self):
+        """MP4 'covr' atom değeri"""
+        if 'mp4' not in self._frames:
+            self._frames['mp4'] = make_mp4_cover(self.mime, self.data)
+        return self._frames['mp4']
+    
+    def __getstate__(self):
+        # Worker'lara gönderirken frame'leri tekrar pickle etme, data zaten var
+        state = self.__dict__.copy()
+        state['_frames'] = {}
+        return state
+
+
+def make_flac_picture(picture_type, mime, desc, data):
+    """FLAC Picture bloğu oluştur (boyutlar header'dan)"""
+    from mutagen.flac import Picture
+    picture = Picture()
+    picture.type = picture_type
+    picture.mime = mime
+    picture.desc = desc
+    picture.width, picture.height = (size or 0 for size in image_dimensions(data))
+    picture.depth = 24
+    picture.data = data
+    return picture
+
+
+def make_mp4_cover(mime, data):
+    """MP4 'covr' değeri; MP4'te resim tipi yok, sadece format"""
+    from mutagen.mp4 import MP4Cover, AtomDataType
+    image_format = {'image/png': AtomDataType.PNG, 'image/gif': AtomDataType.GIF,
+                    'image/bmp': AtomDataType.BMP}.get(mime, AtomDataType.JPEG)
+    return MP4Cover(data, imageformat=image_format)
+
+
+class CoverSet:
+    """Bir track'e tek save'de gömülecek resim seti: [(picture type, CoverEntry)]
+    
+    layout() mevcut resimlerle birleştirir: tanımlanan tiplerin eski
+    resimleri atılır, tanımlanmayan tipler (ör. elle eklenmiş bir artist
+    resmi) korunur; aynı payload tag'e bir kez yazılır. CoverEntry'nin
+    write_cover / state / sonuç tarafından kullanılan alanlarını taşır.
+    """
+    
+    def __init__(self, pictures):
+        self.pictures = sorted(pictures, key=lambda item: item[0])
+        self.types = {picture_type for picture_type, entry in self.pictures}
+        roles = {value: key for key, value in PICTURE_ROLES.items()}
+        self.source = ";".join(f"{roles[picture_type]}={entry.source}"
+                               for picture_type, entry in self.pictures)
+        unique = {}
+        for picture_type, entry in self.pictures:
+            unique.setdefault(entry.digest, entry)
+        self.size = sum(entry.size for entry in unique.values())
+        self.saved = sum(entry.saved for entry in unique.values())
+        self.original_size = sum(entry.original_size for entry in unique.values())
+        self.digest = hashlib.sha1(";".join(f"{picture_type}:{entry.digest}" for picture_type, entry
+                                            in self.pictures).encode('ascii')).hexdigest()
+        
+    def layout(self, existing=()):
+        """Tag'de olması gereken resimler ve atılan kopya sayısı
+        
+        existing ve dönen liste (type, mime, desc, data) tuple'larıdır.
+        Açıklamalar (ID3'te frame anahtarı) tekil tutulur.
+        """
+        records = []
+        seen = set()
+        descs = set()
+        dropped = 0
+        candidates = [(picture_type, entry.mime, PICTURE_DESCS[picture_type], entry.data,
+                       entry.digest) for picture_type, entry in self.pictures]
+        candidates += [(picture_type, mime, desc, data, hashlib.sha1(data).hexdigest())
+                       for picture_type, mime, desc, data in existing
+                       if picture_type not in self.types]
+        for picture_type, mime, desc, data, digest in candidates:
+            if digest in seen:
+                dropped += 1
+                continue
+            seen.add(digest)
+            base, n = desc, 2
+            while desc in descs:
+                desc = f"{base} ({n})"
+                n += 1
+            descs.add(desc)
+            records.append((picture_type, mime, desc, data))
+        return records, dropped
+
+
+def load_cover(image_path, normalize=None, max_pixels=None, max_image_bytes=None):
+    """Resmi diskten oku, istenirse normalize et ve CoverEntry oluştur
+    
+    max_image_bytes'tan büyük dosyalar okunmadan, max_pixels'i aşan
+    resimler sadece header'a bakılarak reddedilir. normalize açıksa büyük
+    JPEG'ler decode sırasında küçültülür; sınır buna göre kontrol edilir.
+    """
+    start = time.perf_counter()
+    if max_image_bytes and os.path.getsize(image_path) > max_image_bytes:
+        raise MemoryBudgetExceeded(f"image is larger than {max_image_bytes} bytes")
+    with open(image_path, 'rb') as img_file:
+        img_data = img_file.read()
+    if normalize is None:
+        width, height = image_dimensions(img_data) if max_pixels else (None, None)
+        if width:
+            check_pixels((width, height), max_pixels, " (use --normalize to downscale)")
+        entry = CoverEntry(image_path, img_data, sniff_image_mime(img_data, image_path))
+    else:
+        if max_pixels:
+            normalize = dict(normalize, max_pixels=max_pixels)
+        data, mime = normalize_cover(img_data, **normalize)
+        entry = CoverEntry(image_path, data, mime, original_size=len(img_data))
+    entry.read_elapsed = time.perf_counter() - start
+    return entry
+
+
+class CoverCache:
+    """Content-addressed cover cache
+    
+    Anahtar: (gerçek yol, mtime, boyut) -> içerik digest'i.
+    Aynı içerikteki farklı dosyalar tek bir entry'yi paylaşır.
+    Entry'ler toplam byte bütçesine göre LRU ile atılır.
+    normalize verilirse cache normalize edilmiş veriyi tutar.
+    max_pixels / max_image_bytes load_cover'a aktarılır (düşük bellek modu).
+    analyzer (CoverAnalyzer) verilirse kenar boşlukları kırpılır ve resim
+    kareye tamamlanır; normalize kapalıysa format korunarak yeniden encode edilir.
+    """
+    
+    def __init__(self, max_bytes=256 * 1024 * 1024, normalize=None, max_pixels=None,
+                 max_image_bytes=None, analyzer=None):
+        self.max_bytes = max_bytes
+        self.normalize = normalize
+        self.analyzer = analyzer
+        self.max_pixels = max_pixels
+        self.max_image_bytes = max_image_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self._keys = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+    @staticmethod
+    def key_for(image_path):
+        st = os.stat(image_path)
+        return (os.path.realpath(image_path), st.st_mtime_ns, st.st_size)
+    
+    def get(self, image_path):
+        """Cover'ı cache'den ver, yoksa bir kez oku (thread-safe)"""
+        with self._lock:
+            return self._get(image_path)
+        
+    def _get(self, image_path):
+        key = self.key_for(image_path)
+        digest = self._keys.get(key)
+        if digest is not None and digest in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(digest)
+            return self._entries[digest]
+        
+        self.misses += 1
+        normalize = self.normalize
+        crop = self.analyzer.crop_for(image_path) if self.analyzer is not None else None
+        if crop:
+            normalize = dict(normalize or {'format': 'keep', 'max_size': 1 << 16}, crop=crop)
+        entry = load_cover(image_path, normalize=normalize, max_pixels=self.max_pixels,
+                           max_image_bytes=self.max_image_bytes)
+        self.bytes_read += key[2]
+        self._keys[key] = entry.digest
+        
+        if entry.digest in self._entries:
+            # Aynı içerik başka bir yoldan zaten yüklenmiş
+            self._entries.move_to_end(entry.digest)
+            return self._entries[entry.digest]
+        
+        self._entries[entry.digest] = entry
+        self.current_bytes += entry.size
+        self._evict()
+        return entry
+    
+    def _evict(self):
+        # En az kullanılanları bütçe altına inene kadar at (son eklenen hariç)
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.current_bytes -= old.size
+            
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'bytes_read': self.bytes_read
+        }
+
+
+def read_id3_header(fileobj):
+    """ID3v2 header'ını (10 byte) oku; tag yoksa None
+    
+    total_size: header + frame'ler + padding (+ v2.4 footer), yani
+    MPEG verisinin başladığı offset.
+    """
+    header = fileobj.read(10)
+    if len(header) < 10 or header[:3] != b'ID3':
+        return None
+    flags = header[5]
+    # Syncsafe integer: her byte'ın 7 biti
+    size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+    footer = 10 if header[3] >= 4 and flags & 0x10 else 0
+    return {
+        'version': (header[3], header[4]),
+        'flags': flags,
+        'size': size,
+        'total_size': 10 + size + footer
+    }
+
+
+def read_id3_tag(mp3_path):
+    """Sadece ID3v2 tag byte'larını oku ve parse et (MPEG akışına dokunmadan)
+    
+    (header, ID3) döner; tag yoksa (None, None).
+    """
+    with open(mp3_path, 'rb') as f:
+        header = read_id3_header(f)
+        if header is None:
+            return None, None
+        f.seek(0)
+        tag_data = f.read(header['total_size'])
+    return header, ID3(io.BytesIO(tag_data))
+
+
+def read_embedded_covers(mp3_path):
+    """Dosyadaki gömülü resimleri oku
+    
+    MP3'te APIC frame'leri (audio info taranmaz), diğer konteynerlerde
+    FLAC Picture nesneleri döner; hepsinde .type, .mime ve .data vardır.
+    """
+    kind = container_type(mp3_path)
+    if kind == 'id3':
+        header, tags = read_id3_tag(mp3_path)
+        return tags.getall('APIC') if tags is not None else []
+    audio = open_container(mp3_path, kind)
+    if kind == 'flac':
+        return list(audio.pictures)
+    if audio.tags is None:
+        return []
+    if kind == 'vorbis':
+        return _vorbis_pictures(audio.tags)
+    
+    from mutagen.flac import Picture
+    pictures = []
+    for data in audio.tags.get('covr', []):
+        picture = Picture()
+        picture.type = 3
+        picture.mime = _mp4_cover_mime(data)
+        picture.data = bytes(data)
+        pictures.append(picture)
+    return pictures
+
+
+def pick_front_cover(frames):
+    """Front cover (type 3) yoksa ilk resmi seç"""
+    for frame in frames:
+        if frame.type == 3:
+            return frame
+    return frames[0] if frames else None
+
+
+def _jpeg_dimensions(data):
+    """JPEG segmentlerini SOF marker'ına kadar atla"""
+    offset = 2
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            raise ValueError("invalid JPEG marker")
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Dolgu byte'ı
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Uzunluğu olmayan marker'lar
+            offset += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + struct.unpack('>H', data[offset + 2:offset + 4])[0]
+    raise ValueError("no SOF marker in JPEG data")
+
+
+def image_dimensions(data):
+    """Resim boyutunu sadece header'dan oku; okunamazsa (None, None)
+    
+    JPEG / PNG / GIF / BMP Pillow yüklenmeden parse edilir.
+    """
+    try:
+        if data.startswith(b'\xff\xd8'):
+            return _jpeg_dimensions(data)
+        if data.startswith(b'\x89PNG\r\n\x1a\n') and data[12:16] == b'IHDR':
+            return struct.unpack('>II', data[16:24])
+        if data[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', data[6:10])
+        if data.startswith(b'BM'):
+            if struct.unpack('<I', data[14:18])[0] == 12:
+                # OS/2 BITMAPCOREHEADER
+                return struct.unpack('<HH', data[18:22])
+            width, height = struct.unpack('<ii', data[18:26])
+            return width, abs(height)
+        from PIL import Image
+        return Image.open(io.BytesIO(data)).size
+    except Exception:
+        return None, None
+
+
+def audit_file(mp3_path, max_bytes=None, max_px=None):
+    """Tek dosya için cover durumu: ok / missing / oversized / error"""
+    result = {
+        'mp3': mp3_path,
+        'status': 'ok',
+        'error': None,
+        'tag_size': 0,
+        'pictures': 0,
+        'picture_bytes': 0,
+        'front_bytes': 0,
+        'front_digest': None,
+        'mime': None,
+        'width': None,
+        'height': None
+    }
+    try:
+        header, tags = read_id3_tag(mp3_path)
+    except Exception as e:
+        result.update(status='error', error=f"{type(e).__name__}: {e}")
+        return result
+    
+    frames = tags.getall('APIC') if tags is not None else []
+    result['tag_size'] = header['total_size'] if header else 0
+    result['pictures'] = len(frames)
+    result['picture_bytes'] = sum(len(frame.data) for frame in frames)
+    
+    front = pick_front_cover(frames)
+    if front is None:
+        result['status'] = 'missing'
+        return result
+    
+    width, height = image_dimensions(front.data)
+    result.update(front_bytes=len(front.data), front_digest=hashlib.sha1(front.data).hexdigest(),
+                  mime=front.mime, width=width, height=height)
+    if max_bytes and len(front.data) > max_bytes:
+        result['status'] = 'oversized'
+    elif max_px and width and max(width, height) > max_px:
+        result['status'] = 'oversized'
+    return result
+
+
+def run_audit(mp3_paths, workers=None, max_bytes=None, max_px=None):
+    """Birçok dosyayı denetle (sonuçları sırayla yield eder)"""
+    mp3_paths = list(mp3_paths)
+    audit = partial(audit_file, max_bytes=max_bytes, max_px=max_px)
+    pool_size = workers or os.cpu_count() or 1
+    if pool_size == 1 or len(mp3_paths) <= 1:
+        yield from map(audit, mp3_paths)
+        return
+    # multiprocessing'i sadece gerçekten pool gerektiğinde yükle
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, min(256, len(mp3_paths) // (pool_size * 4)))
+    with ProcessPoolExecutor(max_workers=pool_size) as executor:
+        yield from executor.map(audit, mp3_paths, chunksize=chunksize)
+
+
+class CoverIndex:
+    """Kütüphane çapında cover index'i (SQLite)
+    
+    Her track için path, mtime, tag boyutu, front cover digest'i, boyutları
+    ve byte boyutu saklanır. update() sadece yeni/değişmiş dosyaları okur.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tracks (
+            path TEXT PRIMARY KEY,
+            dir TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            tag_size INTEGER,
+            pictures INTEGER,
+            picture_bytes INTEGER,
+            cover_digest TEXT,
+            cover_mime TEXT,
+            cover_bytes INTEGER,
+            width INTEGER,
+            height INTEGER,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS tracks_dir ON tracks (dir);
+        CREATE INDEX IF NOT EXISTS tracks_digest ON tracks (cover_digest);
+    """
+    
+    def __init__(self, db_path):
+        import sqlite3
+        
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(self.SCHEMA)
+        
+    def close(self):
+        self.db.close()
+        
+    def update(self, roots, workers=None):
+        """Klasörleri dolaş, sadece yeni/değişmiş dosyaları yeniden oku
+        
+        {'scanned', 'unchanged', 'removed'} döner.
+        """
+        stats = {'scanned': 0, 'unchanged': 0, 'removed': 0}
+        for root_dir in roots:
+            root_dir = os.path.abspath(root_dir)
+            prefix = root_dir.rstrip(os.sep) + os.sep
+            known = {row['path']: (row['size'], row['mtime_ns']) for row in self.db.execute(
+                "SELECT path, size, mtime_ns FROM tracks WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix))}
+            
+            todo = {}
+            for mp3_path in iter_mp3_files(root_dir):
+                try:
+                    st = os.stat(mp3_path)
+                except OSError:
+                    continue
+                if known.pop(mp3_path, None) == (st.st_size, st.st_mtime_ns):
+                    stats['unchanged'] += 1
+                else:
+                    todo[mp3_path] = st
+                    
+            rows = []
+            for result in run_audit(todo, workers=workers):
+                st = todo[result['mp3']]
+                rows.append((result['mp3'], os.path.dirname(result['mp3']), st.st_size,
+                             st.st_mtime_ns, result['tag_size'], result['pictures'],
+                             result['picture_bytes'], result['front_digest'], result['mime'],
+                             result['front_bytes'] or None, result['width'], result['height'],
+                             result['error']))
+            with self.db:
+                self.db.executemany("INSERT OR REPLACE INTO tracks VALUES "
+                                    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                # Diskten silinmiş dosyalar
+                self.db.executemany("DELETE FROM tracks WHERE path = ?",
+                                    [(path,) for path in known])
+            stats['scanned'] += len(rows)
+            stats['removed'] += len(known)
+        return stats
+    
+    def missing(self):
+        """Cover'ı olmayan track'ler"""
+        return [row['path'] for row in self.db.execute(
+            "SELECT path FROM tracks WHERE cover_digest IS NULL AND error IS NULL ORDER BY path")]
+    
+    def smaller_than(self, px):
+        """En uzun kenarı px'ten küçük cover'lar"""
+        return [dict(row) for row in self.db.execute(
+            "SELECT path, width, height FROM tracks WHERE width IS NOT NULL "
+            "AND MAX(width, height) < ? ORDER BY path", (px,))]
+    
+    def larger_than(self, max_bytes):
+        """max_bytes'tan büyük cover'lar"""
+        return [dict(row) for row in self.db.execute(
+            "SELECT path, cover_bytes FROM tracks WHERE cover_bytes > ? ORDER BY path",
+            (max_bytes,))]
+    
+    def album_mismatches(self):
+        """Albümün (klasörün) geri kalanından farklı cover taşıyan track'ler"""
+        mismatches = []
+        dirs = [row['dir'] for row in self.db.execute(
+            "SELECT dir FROM tracks GROUP BY dir "
+            "HAVING COUNT(DISTINCT COALESCE(cover_digest, '')) > 1 ORDER BY dir")]
+        for album_dir in dirs:
+            rows = self.db.execute("SELECT path, cover_digest FROM tracks WHERE dir = ?",
+                                   (album_dir,)).fetchall()
+            counts = {}
+            for row in rows:
+                counts[row['cover_digest']] = counts.get(row['cover_digest'], 0) + 1
+            majority = max(counts, key=counts.get)
+            mismatches.extend({'path': row['path'], 'cover_digest': row['cover_digest'],
+                               'album_digest': majority}
+                              for row in rows if row['cover_digest'] != majority)
+        return mismatches
+    
+    def dedup_report(self, top=20):
+        """Aynı cover'ın birden fazla dosyaya gömülmesiyle harcanan byte'lar"""
+        totals = self.db.execute(
+            "SELECT COUNT(*) AS tracks, COALESCE(SUM(cover_bytes), 0) AS cover_bytes, "
+            "COALESCE(SUM(picture_bytes), 0) AS picture_bytes FROM tracks").fetchone()
+        groups = self.db.execute(
+            "SELECT cover_digest, COUNT(*) AS copies, MAX(cover_bytes) AS bytes, "
+            "(COUNT(*) - 1) * MAX(cover_bytes) AS duplicate_bytes FROM tracks "
+            "WHERE cover_digest IS NOT NULL GROUP BY cover_digest "
+            "ORDER BY duplicate_bytes DESC").fetchall()
+        return {
+            'tracks': totals['tracks'],
+            'cover_bytes': totals['cover_bytes'],
+            'picture_bytes': totals['picture_bytes'],
+            'unique_covers': len(groups),
+            'unique_cover_bytes': sum(row['bytes'] for row in groups),
+            'duplicate_bytes': sum(row['duplicate_bytes'] for row in groups),
+            'top': [dict(row) for row in groups[:top] if row['copies'] > 1]
+        }
+
+
+def available_memory():
+    """Kullanılabilir RAM (byte): /proc/meminfo MemAvailable, yoksa sysconf"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def workers_for_memory(budget, available=None):
+    """Kullanılabilir RAM'e sığan worker sayısı (en az 1, en fazla CPU sayısı)"""
+    cpus = os.cpu_count() or 1
+    available = available_memory() if available is None else available
+    if not available:
+        return cpus
+    # %20'yi sisteme ve ana process'e bırak
+    return max(1, min(cpus, int(available * 0.8) // (budget + WORKER_BASE_RSS)))
+
+
+def reset_peak_rss():
+    """Bu process'in peak RSS sayacını sıfırla (Linux, /proc/self/clear_refs)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """Peak RSS (byte): sıfırlanabilen VmHWM, yoksa process ömrü boyunca ru_maxrss"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döner
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class StageTimer:
+    """Dosya başına aşama süreleri ve byte sayıları"""
+    
+    def __init__(self):
+        self.durations = {}
+        self.bytes = {}
+        self._last = time.perf_counter()
+        
+    def mark(self, stage, nbytes=0):
+        """Son mark'tan bu yana geçen süreyi stage'e yaz"""
+        now = time.perf_counter()
+        self.durations[stage] = self.durations.get(stage, 0.0) + now - self._last
+        self.bytes[stage] = self.bytes.get(stage, 0) + nbytes
+        self._last = now
+
+
+def copy_file_range_all(src_fd, dst_fd, offset, count):
+    """src_fd[offset:offset+count] -> dst_fd (mevcut pozisyon)
+    
+    Veriyi Python belleğine almadan kopyalar: önce copy_file_range,
+    olmazsa sendfile, en son sabit boyutlu parçalarla read/write.
+    """
+    remaining = count
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, remaining, offset + count - remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            # Farklı dosya sistemleri / desteklenmeyen kernel
+            pass
+    if remaining > 0 and hasattr(os, 'sendfile'):
+        try:
+            while remaining > 0:
+                copied = os.sendfile(dst_fd, src_fd, offset + count - remaining, remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            pass
+    while remaining > 0:
+        chunk = os.pread(src_fd, min(COPY_CHUNK_SIZE, remaining), offset + count - remaining)
+        if not chunk:
+            raise IOError("unexpected end of file while copying audio data")
+        os.write(dst_fd, chunk)
+        remaining -= len(chunk)
+
+
+class AtomicWriter:
+    """Yeni tag + orijinal audio'yu aynı klasörde temp dosyaya yazar,
+    fsync'leri batch halinde yapıp orijinalin üzerine atomik rename eder
+    
+    Journal (JSON lines) her dosya için begin / synced / commit / abort
+    kaydı tutar; yarıda kalan bir çalışma recover_journal ile tamamlanır
+    ya da geri alınır. Orijinal dosya rename anına kadar hiç değişmez.
+    stage / flush thread'ler arasında paylaşılabilir; on_flush(results)
+    her batch'ten sonra (başarısız olsa da) o batch'in sonuçlarıyla çağrılır.
+    """
+    
+    def __init__(self, fsync_batch=DEFAULT_FSYNC_BATCH, journal=None, on_flush=None):
+        self.fsync_batch = max(1, fsync_batch)
+        self.journal = journal
+        self.on_flush = on_flush
+        self.pending = []
+        self._lock = threading.RLock()
+        
+    def _log(self, **entry):
+        if not self.journal:
+            return
+        # O_APPEND + tek write: worker process'ler aynı journal'a yazabilir
+        fd = os.open(self.journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(entry) + "\n").encode('utf-8'))
+        finally:
+            os.close(fd)
+            
+    def write(self, target, tag_data, audio_offset):
+        """Temp dosyayı yaz (fsync yok); temp yolunu döner"""
+        st = os.stat(target)
+        directory = os.path.dirname(target)
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(target) + '.',
+                                        suffix='.tmp', dir=directory)
+        self._log(op='begin', target=target, tmp=tmp_path)
+        try:
+            with os.fdopen(fd, 'wb') as out, open(target, 'rb') as src:
+                out.write(tag_data)
+                out.flush()
+                copy_file_range_all(src.fileno(), out.fileno(), audio_offset,
+                                    st.st_size - audio_offset)
+            os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+            try:
+                os.chown(tmp_path, st.st_uid, st.st_gid)
+            except OSError:
+                pass
+        except BaseException:
+            self.discard(tmp_path, target)
+            raise
+        return tmp_path
+    
+    def discard(self, tmp_path, target):
+        """Temp dosyayı sil ve journal'a abort yaz (orijinal olduğu gibi kalır)"""
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        self._log(op='abort', target=target, tmp=tmp_path)
+    
+    def stage(self, tmp_path, target, result):
+        """Rename'i bekleyen dosyalara ekle, batch dolunca flush et"""
+        with self._lock:
+            self.pending.append((tmp_path, target, result))
+            if len(self.pending) >= self.fsync_batch:
+                self.flush()
+            
+    def flush(self):
+        """Bekleyen temp'leri fsync et, rename et, klasörleri fsync et"""
+        with self._lock:
+            pending, self.pending = self.pending, []
+            if not pending:
+                return
+            try:
+                self._flush(pending)
+            finally:
+                if self.on_flush:
+                    self.on_flush([result for tmp_path, target, result in pending])
+                    
+    def _flush(self, pending):
+        start = time.perf_counter()
+        
+        try:
+            for tmp_path, target, result in pending:
+                fd = os.open(tmp_path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self._log(op='synced', target=target, tmp=tmp_path,
+                          size=os.path.getsize(tmp_path))
+        except BaseException as e:
+            # fsync başarısız: hiçbiri rename edilmez, FAILED raporlanan dosya
+            # sonradan recover ile de değişmesin diye hepsi abort edilir
+            for tmp_path, target, result in pending:
+                result.update(ok=False, error=f"{type(e).__name__}: {e}")
+                self.discard(tmp_path, target)
+            raise
+            
+        directories = set()
+        for tmp_path, target, result in pending:
+            try:
+                os.replace(tmp_path, target)
+            except OSError as e:
+                result.update(ok=False, error=f"{type(e).__name__}: {e}")
+                self.discard(tmp_path, target)
+                continue
+            directories.add(os.path.dirname(target))
+            st = os.stat(target)
+            result.update(bytes=st.st_size, mtime_ns=st.st_mtime_ns)
+            
+        # Rename'lerin kendisi de kalıcı olsun
+        for directory in directories:
+            fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+                
+        share = (time.perf_counter() - start) / len(pending)
+        for tmp_path, target, result in pending:
+            if result['ok']:
+                self._log(op='commit', target=target, tmp=tmp_path)
+                result['stages']['sync'] = share
+
+
+def _open_journal_entries(journal):
+    """Journal'da begin / synced olup commit / abort görmemiş kayıtlar (tmp -> kayıt)"""
+    open_entries = OrderedDict()
+    with open(journal, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Crash anında yarım yazılmış son satır
+                continue
+            if entry['op'] in ('begin', 'synced'):
+                open_entries[entry['tmp']] = entry
+            else:
+                open_entries.pop(entry['tmp'], None)
+    return open_entries
+
+
+def recover_journal(journal, rollback=False):
+    """Yarıda kalmış atomik yazmaları toparla
+    
+    fsync'i tamamlanmış (synced) ama rename edilmemiş temp dosyalar
+    resume modunda yerine taşınır; diğer tüm temp'ler silinir.
+    rollback=True ise hepsi silinir, orijinaller olduğu gibi kalır.
+    """
+    stats = {'resumed': 0, 'rolled_back': 0}
+    if not os.path.exists(journal):
+        return stats
+    
+    for tmp_path, entry in _open_journal_entries(journal).items():
+        if not os.path.exists(tmp_path):
+            continue
+        if (not rollback and entry['op'] == 'synced'
+                and os.path.getsize(tmp_path) == entry['size']):
+            os.replace(tmp_path, entry['target'])
+            fd = os.open(os.path.dirname(entry['target']), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            stats['resumed'] += 1
+        else:
+            os.unlink(tmp_path)
+            stats['rolled_back'] += 1
+            
+    os.remove(journal)
+    return stats
+
+
+def _run_journals(journal):
+    """Taban journal'a ait tüm dosyalar: eski tek journal + RunJournal'lar"""
+    directory, name = os.path.split(os.path.abspath(journal))
+    stem, ext = os.path.splitext(name)
+    paths = []
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                if item.name == name or (item.name.startswith(stem + '.')
+                                         and item.name.endswith(ext)):
+                    paths.append(item.path)
+    except OSError:
+        pass
+    return sorted(paths)
+
+
+def _lock_stale_journal(path):
+    """Sahibi çalışmayan journal'ı kilitle; fd ya da (canlı/silinmiş ise) None"""
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except OSError:
+        return None
+    if fcntl is None:
+        # Windows: canlı çalışma ayırt edilemez
+        return fd
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # Kilidi beklerken başka bir recover dosyayı silmiş olabilir
+        if os.fstat(fd).st_ino == os.stat(path).st_ino:
+            return fd
+    except OSError:
+        pass
+    os.close(fd)
+    return None
+
+
+def recover_stale_journals(journal, rollback=False):
+    """Taban journal'a ait, sahibi çalışmayan bütün journal'ları recover_journal ile toparla
+    
+    Çalışan bir inject / watch kendi journal'ını kilitli tuttuğu için atlanır.
+    """
+    stats = {'resumed': 0, 'rolled_back': 0}
+    for path in _run_journals(journal):
+        fd = _lock_stale_journal(path)
+        if fd is None:
+            continue
+        try:
+            found = recover_journal(path, rollback=rollback)
+        finally:
+            os.close(fd)
+        for key in stats:
+            stats[key] += found[key]
+    return stats
+
+
+class RunJournal:
+    """Tek bir çalışmanın journal'ı: taban adın yanında çalışmaya özel dosya
+    
+    Dosya çalışma boyunca flock ile kilitli tutulur, başka process'lerin
+    recover_stale_journals'ı ona dokunmaz. close() bu çalışmada açık kalmış
+    temp'leri abort eder (resume etmez) ve journal'ı siler.
+    """
+    
+    def __init__(self, journal):
+        directory, name = os.path.split(os.path.abspath(journal))
+        stem, ext = os.path.splitext(name)
+        os.makedirs(directory, exist_ok=True)
+        # Kilit alınmadan önce recover'ın desenine uymayan bir adla oluştur
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{stem}.', suffix='.new', dir=directory)
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        token = os.path.basename(tmp_path)[len(stem) + 2:-len('.new')]
+        self.path = os.path.join(directory, f"{stem}.{os.getpid()}-{token}{ext}")
+        os.rename(tmp_path, self.path)
+        self.fd = fd
+        
+    def close(self):
+        """Açık kalan temp'leri abort et, journal'ı sil ve kilidi bırak"""
+        if self.fd is None:
+            return
+        try:
+            writer = AtomicWriter(journal=self.path)
+            for tmp_path, entry in _open_journal_entries(self.path).items():
+                writer.discard(tmp_path, entry['target'])
+            os.remove(self.path)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+
+def _open_run_journal(atomic, report):
+    """Eski çalışmaları toparla, bu çalışmanın journal'ını aç
+
+    (atomic, RunJournal) döner; atomic'in journal'ı artık çalışmaya özeldir.
+    """
+    if not (atomic and atomic.get('journal')):
+        return atomic, None
+    report.recovered = recover_stale_journals(atomic['journal'])
+    journal = RunJournal(atomic['journal'])
+    return dict(atomic, journal=journal.path), journal
+
+
+def _make_result(mp3_path, image_path, **fields):
+    """Tek dosya sonucu (process'ler arası taşınabilir dict)"""
+    result = {
+        'mp3': mp3_path,
+        'image': image_path,
+        'ok': True,
+        'error': None,
+        'bytes': 0,
+        'mtime_ns': 0,
+        'cover_bytes': 0,
+        'cover_saved': 0,
+        'cover_digest': None,
+        'write_mode': None,
+        'old_tag_size': 0,
+        'padding': 0,
+        'picture_bytes_before': None,
+        'picture_bytes_after': None,
+        'pictures_deduped': 0,
+        'stages': {},
+        'stage_bytes': {},
+        'py_peak_bytes': None,
+        'peak_rss': None,
+        'latency': None,
+        'elapsed': 0.0
+    }
+    result.update(fields)
+    return result
+
+
+def front_cover_matches(tags, cover):
+    """Tag'deki tek front cover yazılacak cover ile aynı mı?"""
+    frames = tags.getall('APIC')
+    if len(frames) != 1:
+        return False
+    frame = frames[0]
+    return (frame.type == 3 and frame.mime == cover.mime and frame.desc == u'Cover'
+            and hashlib.sha1(frame.data).hexdigest() == cover.digest)
+
+
+def container_type(path):
+    """Uzantıdan tag konteyneri: 'id3', 'flac', 'mp4' ya da 'vorbis'"""
+    return CONTAINER_TYPES.get(os.path.splitext(path)[1].lower(), 'id3')
+
+
+def open_container(path, kind=None):
+    """Dosyayı konteynerine uygun mutagen sınıfıyla aç (audio verisi okunmaz)"""
+    kind = kind or container_type(path)
+    if kind == 'id3':
+        return MP3(path)
+    if kind == 'flac':
+        from mutagen.flac import FLAC
+        return FLAC(path)
+    if kind == 'mp4':
+        from mutagen.mp4 import MP4
+        return MP4(path)
+    # .ogg içinde Vorbis de Opus da olabilir
+    import mutagen
+    from mutagen.oggvorbis import OggVorbis
+    from mutagen.oggopus import OggOpus
+    audio = mutagen.File(path, options=[OggVorbis, OggOpus])
+    if audio is None:
+        raise ValueError("not an Ogg Vorbis or Opus file")
+    return audio
+
+
+def _vorbis_pictures(tags):
+    """METADATA_BLOCK_PICTURE değerlerini Picture nesnelerine çevir"""
+    from mutagen.flac import Picture
+    pictures = []
+    for value in tags.get('metadata_block_picture', []):
+        try:
+            pictures.append(Picture(base64.b64decode(value)))
+        except Exception:
+            # Bozuk değer: yok say
+            continue
+    return pictures
+
+
+def _picture_matches(picture, cover):
+    return (picture.type == 3 and picture.mime == cover.mime and picture.desc == u'Cover'
+            and hashlib.sha1(picture.data).hexdigest() == cover.digest)
+
+
+def read_pictures(target, kind):
+    """Gömülü resimler [(type, mime, desc, data)]; target FLAC'ta audio, diğerlerinde tags"""
+    if kind == 'id3':
+        return [(int(frame.type), frame.mime, frame.desc, frame.data)
+                for frame in target.getall('APIC')]
+    if kind == 'flac':
+        return [(p.type, p.mime, p.desc, p.data) for p in target.pictures]
+    if kind == 'vorbis':
+        return [(p.type, p.mime, p.desc, p.data) for p in _vorbis_pictures(target)]
+    return [(3, _mp4_cover_mime(cover), u'', bytes(cover))
+            for cover in target.get('covr', [])]
+
+
+def _mp4_cover_mime(cover):
+    from mutagen.mp4 import AtomDataType
+    return {AtomDataType.PNG: 'image/png', AtomDataType.GIF: 'image/gif',
+            AtomDataType.BMP: 'image/bmp'}.get(cover.imageformat, 'image/jpeg')
+
+
+def write_pictures(target, kind, records):
+    """Gömülü resimleri records ile değiştir (sadece bellekte)"""
+    if kind == 'id3':
+        target.delall('APIC')
+        for picture_type, mime, desc, data in records:
+            target.add(APIC(encoding=3, mime=mime, type=picture_type, desc=desc, data=data))
+    elif kind == 'flac':
+        target.clear_pictures()
+        for record in records:
+            target.add_picture(make_flac_picture(*record))
+    elif kind == 'mp4':
+        # Tip bilgisi yok: sıra korunur, ilk resim front cover olarak gösterilir
+        target['covr'] = [make_mp4_cover(mime, data) for picture_type, mime, desc, data in records]
+    else:
+        for key in ('coverart', 'coverartmime'):
+            if key in target:
+                del target[key]
+        target['metadata_block_picture'] = [
+            base64.b64encode(make_flac_picture(*record).write()).decode('ascii')
+            for record in records]
+
+
+def _picture_signature(records, kind):
+    if kind == 'mp4':
+        return [(mime, hashlib.sha1(data).hexdigest()) for t, mime, desc, data in records]
+    return sorted((t, mime, desc, hashlib.sha1(data).hexdigest())
+                  for t, mime, desc, data in records)
+
+
+def _picture_target(audio, kind):
+    return audio if kind == 'flac' else audio.tags
+
+
+def cover_matches(target, cover, kind):
+    """Dosyadaki resimler yazılacak cover (ya da CoverSet) ile aynı mı? (tüm konteynerler)
+    
+    target: FLAC'ta audio, diğerlerinde tags (bkz. _picture_target).
+    """
+    if isinstance(cover, CoverSet):
+        existing = read_pictures(target, kind)
+        return (_picture_signature(existing, kind)
+                == _picture_signature(cover.layout(existing)[0], kind))
+    if kind == 'id3':
+        return front_cover_matches(target, cover)
+    if kind == 'flac':
+        return len(target.pictures) == 1 and _picture_matches(target.pictures[0], cover)
+    if kind == 'mp4':
+        covers = target.get('covr', [])
+        return (len(covers) == 1 and covers[0].imageformat == cover.mp4_cover().imageformat
+                and hashlib.sha1(bytes(covers[0])).hexdigest() == cover.digest)
+    pictures = _vorbis_pictures(target)
+    return (len(pictures) == 1 and 'coverart' not in target
+            and _picture_matches(pictures[0], cover))
+
+
+def set_cover(target, cover, kind):
+    """Mevcut cover'ları kaldırıp yenisini ekle (sadece bellekte)
+    
+    CoverSet'te tanımlanmayan tipler korunur. (gömülü resim byte'ları,
+    atılan kopya sayısı) döner.
+    """
+    if isinstance(cover, CoverSet):
+        records, dropped = cover.layout(read_pictures(target, kind))
+        write_pictures(target, kind, records)
+        return sum(len(record[3]) for record in records), dropped
+    if kind == 'id3':
+        target.delall('APIC')
+        target.add(cover.apic())
+    elif kind == 'flac':
+        target.clear_pictures()
+        target.add_picture(cover.picture())
+    elif kind == 'mp4':
+        target['covr'] = [cover.mp4_cover()]
+    else:
+        # Eski, standart dışı COVERART alanları da temizlenir
+        for key in ('coverart', 'coverartmime'):
+            if key in target:
+                del target[key]
+        target['metadata_block_picture'] = [cover.vorbis_picture()]
+    return cover.size, 0
+
+
+def rendered_tag_size(tags):
+    """Tag'in padding'siz boyutu (header dahil); dosyaya dokunmaz"""
+    buffer = io.BytesIO()
+    tags.save(buffer, padding=lambda info: 0)
+    return len(buffer.getvalue())
+
+
+def check_memory_budget(cover, old_tag_size, memory_budget):
+    """Eski tag + cover + yeni tag bütçeye sığmıyorsa MemoryBudgetExceeded (audio hiç okunmaz)"""
+    needed = old_tag_size + 2 * cover.size + COPY_CHUNK_SIZE
+    if memory_budget and needed > memory_budget:
+        raise MemoryBudgetExceeded(f"tag and cover need ~{needed} bytes, "
+                                   f"budget is {memory_budget}")
+
+
+def write_cover(mp3_path, cover, padding_reserve=DEFAULT_PADDING_RESERVE, force=False,
+                progress=None, writer=None, memory_budget=None):
+    """Hazır CoverEntry / CoverSet'i tek bir ses dosyasına göm; yazma modları README'de"""
+    start = time.perf_counter()
+    progress = progress or (lambda stage: None)
+    timer = StageTimer()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    kind = container_type(mp3_path)
+    if memory_budget:
+        header = None
+        if kind == 'id3':
+            with open(mp3_path, 'rb') as f:
+                header = read_id3_header(f)
+        check_memory_budget(cover, header['total_size'] if header else 0, memory_budget)
+    
+    # Dosyayı yükle
+    progress('load')
+    audio = open_container(mp3_path, kind)
+    
+    if audio.tags is None:
+        audio.add_tags()
+        old_tag_size = 0
+    else:
+        old_tag_size = audio.tags.size if kind == 'id3' else 0
+    # ID3 dışındaki konteynerlerde metadata her zaman var, padding'e sığarsa yerinde yazılır
+    can_patch = bool(old_tag_size) or kind != 'id3'
+    timer.mark('load', old_tag_size)
+        
+    plan = {'mode': 'skipped', 'padding': 0}
+    target = _picture_target(audio, kind)
+    pictures_before = sum(len(record[3]) for record in read_pictures(target, kind))
+    pictures_after, deduped = pictures_before, 0
+    
+    progress('tag')
+    if force or not cover_matches(target, cover, kind):
+        # Mevcut cover art'ları yenisiyle değiştir
+        pictures_after, deduped = set_cover(target, cover, kind)
+        timer.mark('tag', cover.size)
+        
+        # Kaydet
+        def padding(info):
+            # info.padding: mevcut alan - gereken alan (negatifse sığmıyor)
+            if can_patch and info.padding >= 0:
+                plan['mode'] = 'in_place'
+                plan['padding'] = info.padding
+                return info.padding
+            plan['mode'] = 'rewrite'
+            plan['padding'] = padding_reserve
+            return padding_reserve
+        
+        progress('save')
+        streamed = (kind == 'id3' and writer is None and memory_budget is not None
+                    and rendered_tag_size(audio.tags) > old_tag_size)
+        if streamed:
+            # Tag sığmıyor: tek dosyalık writer, rename hemen stage() içinde
+            writer = AtomicWriter(fsync_batch=1)
+        if writer is None:
+            # Callback'e sormadan kaydeden konteynerler (Opus) yeniden yazılmış sayılır
+            plan['mode'] = 'rewrite'
+            audio.save(padding=padding)
+        elif kind != 'id3':
+            # Tag'in yeri konteynere göre değişir: dosyayı olduğu gibi temp'e
+            # kopyala (kernel'de), mutagen tag'i temp üzerinde güncellesin
+            target = os.path.realpath(mp3_path)
+            tmp_path = writer.write(target, b'', 0)
+            try:
+                audio.save(tmp_path, padding=padding)
+            except BaseException:
+                writer.discard(tmp_path, target)
+                raise
+            plan['mode'] = 'atomic'
+        else:
+            # Sadece tag'i bellekte üret, audio verisi temp dosyaya kernel'de kopyalanır
+            tag_buffer = io.BytesIO()
+            audio.tags.save(tag_buffer, padding=lambda info: padding_reserve)
+            target = os.path.realpath(mp3_path)
+            with open(target, 'rb') as f:
+                header = read_id3_header(f)
+            tmp_path = writer.write(target, tag_buffer.getvalue(),
+                                    header['total_size'] if header else 0)
+            plan['mode'] = 'stream' if streamed else 'atomic'
+            plan['padding'] = padding_reserve
+    else:
+        timer.mark('tag')
+    
+    progress('done')
+    st = os.stat(mp3_path)
+    if plan['mode'] == 'in_place':
+        timer.mark('save', old_tag_size)
+    elif plan['mode'] in ('rewrite', 'atomic', 'stream'):
+        timer.mark('save', st.st_size)
+    result = _make_result(
+        mp3_path, cover.source,
+        bytes=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        cover_bytes=cover.size,
+        cover_saved=cover.saved,
+        cover_digest=cover.digest,
+        write_mode=plan['mode'],
+        old_tag_size=old_tag_size,
+        padding=plan['padding'],
+        picture_bytes_before=pictures_before,
+        picture_bytes_after=pictures_after,
+        pictures_deduped=deduped,
+        stages=timer.durations,
+        stage_bytes=timer.bytes,
+        py_peak_bytes=tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+        elapsed=time.perf_counter() - start
+    )
+    if plan['mode'] in ('atomic', 'stream'):
+        writer.stage(tmp_path, target, result)
+    return result
+
+
+class _PaddingProbe(Exception):
+    """plan'da mutagen'in padding hesabını yazmadan yakalamak için"""
+
+    def __init__(self, info):
+        super().__init__(info)
+        self.info = info
+
+
+class _ReadOnlyFile:
+    """mutagen save'e verilen salt okunur dosya: boş write kontrolü geçer, gerçek write hata"""
+
+    def __init__(self, f):
+        self._f = f
+        self.name = f.name
+
+    def read(self, size=-1):
+        return self._f.read(size)
+
+    def seek(self, offset, whence=0):
+        return self._f.seek(offset, whence)
+
+    def tell(self):
+        return self._f.tell()
+
+    def write(self, data):
+        if data:
+            raise io.UnsupportedOperation("plan does not write")
+        return 0
+
+    def truncate(self, size=None):
+        raise io.UnsupportedOperation("plan does not write")
+
+    def flush(self):
+        pass
+
+
+def probe_padding(audio, path):
+    """audio.save'in padding callback'ine vereceği PaddingInfo (çağrılmazsa None)"""
+    def padding(info):
+        raise _PaddingProbe(info)
+    with open(path, 'rb') as f:
+        try:
+            audio.save(_ReadOnlyFile(f), padding=padding)
+        except _PaddingProbe as probe:
+            return probe.info
+        except io.UnsupportedOperation:
+            # Opus gibi padding'i kendi koruyan konteyner: callback'e sormadan yazmaya çalıştı
+            return None
+    return None
+
+
+def plan_cover(mp3_path, cover, padding_reserve=DEFAULT_PADDING_RESERVE, force=False,
+               atomic=False, memory_budget=None):
+    """write_cover'ın bu dosyada ne yapacağını yazmadan hesapla (MP3 dışında byte'lar yaklaşık)"""
+    kind = container_type(mp3_path)
+    st = os.stat(mp3_path)
+    plan = {
+        'mp3': mp3_path,
+        'image': cover.source,
+        'container': kind,
+        'mode': None,
+        'exact': True,
+        'file_bytes': st.st_size,
+        'old_tag_size': 0,
+        'old_padding': 0,
+        'old_picture_bytes': 0,
+        'new_picture_bytes': 0,
+        'cover_bytes': cover.size,
+        'new_tag_size': None,
+        'bytes_written': 0,
+        'est_seconds': 0.0,
+        'error': None
+    }
+    
+    header = None
+    if kind == 'id3':
+        with open(mp3_path, 'rb') as f:
+            header = read_id3_header(f)
+    old_tag_size = header['total_size'] if header else 0
+    plan['old_tag_size'] = old_tag_size
+    try:
+        check_memory_budget(cover, old_tag_size, memory_budget)
+    except MemoryBudgetExceeded as e:
+        plan.update(mode='error', error=f"{type(e).__name__}: {e}")
+        return plan
+    
+    if kind != 'id3':
+        audio = open_container(mp3_path, kind)
+        if audio.tags is None:
+            audio.add_tags()
+        target = _picture_target(audio, kind)
+        plan['old_picture_bytes'] = sum(len(record[3]) for record in read_pictures(target, kind))
+        if not force and cover_matches(target, cover, kind):
+            plan['mode'] = 'skipped'
+            plan['new_picture_bytes'] = plan['old_picture_bytes']
+        else:
+            plan['new_picture_bytes'] = set_cover(target, cover, kind)[0]
+            # write_cover'daki padding callback'i aynı PaddingInfo ile karar verir;
+            # byte'lar metadata bölgesinden yaklaşık
+            info = probe_padding(audio, mp3_path)
+            plan['exact'] = False
+            if info is not None and info.padding >= 0:
+                plan['mode'] = 'in_place'
+                plan['bytes_written'] = st.st_size - info.size
+            else:
+                plan['mode'] = 'rewrite'
+                plan['bytes_written'] = (st.st_size + cover.size if info is None
+                                         else st.st_size - info.padding + padding_reserve)
+            if atomic:
+                plan['mode'] = 'atomic'
+                plan['bytes_written'] += st.st_size
+        return plan
+    
+    try:
+        # write_cover'ın load adımı: MPEG frame sync'i bulunamayan dosya inject'te de açılamaz
+        tags = open_container(mp3_path, kind).tags
+    except MutagenError as e:
+        plan.update(mode='error', error=f"{type(e).__name__}: {e}")
+        return plan
+    if tags is None:
+        tags = ID3()
+    else:
+        plan['old_padding'] = max(0, old_tag_size - rendered_tag_size(tags))
+    plan['old_picture_bytes'] = sum(len(record[3]) for record in read_pictures(tags, kind))
+    if not force and cover_matches(tags, cover, kind):
+        plan['mode'] = 'skipped'
+        plan['new_picture_bytes'] = plan['old_picture_bytes']
+        return plan
+    
+    plan['new_picture_bytes'] = set_cover(tags, cover, kind)[0]
+    new_tag_size = rendered_tag_size(tags)
+    plan['new_tag_size'] = new_tag_size
+    audio_bytes = st.st_size - old_tag_size
+    if atomic:
+        plan['mode'] = 'atomic'
+    elif old_tag_size and new_tag_size <= old_tag_size:
+        plan['mode'] = 'in_place'
+        plan['bytes_written'] = old_tag_size
+        return plan
+    else:
+        plan['mode'] = 'stream' if memory_budget else 'rewrite'
+    plan['bytes_written'] = new_tag_size + padding_reserve + audio_bytes
+    return plan
+
+
+def estimate_seconds(plan, model=DEFAULT_COST_MODEL):
+    """Plan satırının tek worker'daki tahmini süresi"""
+    mode = plan['mode']
+    if mode in ('unchanged', 'error'):
+        return 0.0
+    seconds = model['file_overhead']
+    if mode == 'in_place':
+        seconds += model['in_place_seconds']
+    elif mode != 'skipped':
+        seconds += plan['bytes_written'] / model['write_bps']
+    return seconds
+
+
+def cost_model_from_events(events_path):
+    """Önceki inject --events log'undan maliyet modeli çıkar
+    
+    Açma + tag süresinin medyanı, tam yazmalarda save (+ sync) byte/s'i ve
+    yerinde yazmaların medyan süresi; örneği olmayan değerler varsayılan kalır.
+    """
+    overhead, in_place, written, write_time = [], [], 0, 0.0
+    with open(events_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get('event') != 'file' or not event.get('ok'):
+                continue
+            stages = event.get('stages') or {}
+            if 'load' in stages:
+                overhead.append(stages['load'] + stages.get('tag', 0.0))
+            mode = event.get('write_mode')
+            if mode == 'in_place' and 'save' in stages:
+                in_place.append(stages['save'])
+            elif mode in ('rewrite', 'atomic', 'stream') and 'save' in stages:
+                written += (event.get('stage_bytes') or {}).get('save', 0)
+                write_time += stages['save'] + stages.get('sync', 0.0)
+                
+    model = dict(DEFAULT_COST_MODEL)
+    if overhead:
+        model['file_overhead'] = sorted(overhead)[len(overhead) // 2]
+    if in_place:
+        model['in_place_seconds'] = sorted(in_place)[len(in_place) // 2]
+    if written and write_time > 0:
+        model['write_bps'] = written / write_time
+    return model
+
+
+def inject_cover(mp3_path, image_path, cache=None, **write_options):
+    """Tek bir MP3 dosyasına cover art göm (GUI'den bağımsız)"""
+    if write_options.get('progress'):
+        write_options['progress']('read')
+    cover = cache.get(image_path) if cache is not None else load_cover(image_path)
+    return write_cover(mp3_path, cover, **write_options)
+
+
+def _failed_result(mp3_path, image_path, e):
+    return _make_result(mp3_path, image_path, ok=False,
+                        error=f"{type(e).__name__}: {e}")
+
+
+def _split_unchanged(state, cover, mp3_paths, force=False):
+    """inject / async / watch / plan'ın ortak skip kuralı -> (yazılacaklar, değişmemişler)"""
+    if state is None or force:
+        return list(mp3_paths), []
+    todo, unchanged = [], []
+    for mp3_path in mp3_paths:
+        (unchanged if state.is_current(mp3_path, cover.digest) else todo).append(mp3_path)
+    return todo, unchanged
+
+
+def _unchanged_result(mp3_path, cover):
+    return _make_result(mp3_path, cover.source, write_mode='unchanged',
+                        cover_digest=cover.digest)
+
+
+class InjectionState:
+    """Kalıcı durum dosyası: path -> (size, mtime, gömülü cover digest'i)
+    
+    Dosya son yazımdan beri değişmediyse ve aynı cover isteniyorsa
+    MP3'ü açmaya bile gerek kalmaz; yeniden çalıştırma bir stat turuna iner.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+                
+    def is_current(self, mp3_path, digest):
+        entry = self.entries.get(os.path.abspath(mp3_path))
+        if entry is None or entry['digest'] != digest:
+            return False
+        try:
+            st = os.stat(mp3_path)
+        except OSError:
+            return False
+        return entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns
+    
+    def record(self, result):
+        """Başarılı sonucu kaydet"""
+        if not result['ok'] or not result['cover_digest'] or not result['mtime_ns']:
+            return
+        self.entries[os.path.abspath(result['mp3'])] = {
+            'size': result['bytes'],
+            'mtime_ns': result['mtime_ns'],
+            'digest': result['cover_digest']
+        }
+        self.dirty = True
+        
+    def save(self):
+        """Atomik olarak diske yaz"""
+        if not self.dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def _inject_group(cover, mp3_paths, write_options, atomic=None, measure_rss=True):
+    """Worker process içinde aynı cover'ı paylaşan MP3'leri işle
+    
+    atomic verilirse ({'fsync_batch', 'journal'}) dosyalar AtomicWriter ile
+    yazılır; grup bitmeden son batch da flush edilir.
+    write_options'ta memory_budget varsa her dosyanın peak RSS'i ölçülür
+    (measure_rss=False: thread'lerde process geneli RSS anlamsız).
+    """
+    writer = AtomicWriter(**atomic) if atomic else None
+    track_rss = (measure_rss and bool(write_options.get('memory_budget'))
+                 and reset_peak_rss())
+    results = []
+    try:
+        for mp3_path in mp3_paths:
+            try:
+                results.append(write_cover(mp3_path, cover, writer=writer, **write_options))
+            except Exception as e:
+                results.append(_failed_result(mp3_path, cover.source, e))
+            if track_rss:
+                results[-1]['peak_rss'] = peak_rss()
+                reset_peak_rss()
+    finally:
+        if writer is not None:
+            try:
+                writer.flush()
+            except Exception:
+                # fsync başarısız: flush bekleyen dosyaları abort edip FAILED işaretledi
+                pass
+    return results
+
+
+def _group_jobs(jobs, chunk_size):
+    """Job'ları resme göre grupla ve chunk'lara böl"""
+    groups = OrderedDict()
+    for mp3_path, image_path in jobs:
+        groups.setdefault(image_path, []).append(mp3_path)
+    for image_path, mp3_paths in groups.items():
+        for i in range(0, len(mp3_paths), chunk_size):
+            yield image_path, mp3_paths[i:i + chunk_size]
+
+
+def parse_picture_arg(text):
+    """'rol=yol' -> (rol, yol); rol PICTURE_ROLES'tan biri olmalı"""
+    role, sep, path = text.partition('=')
+    role = role.strip().lower()
+    if not sep or role not in PICTURE_ROLES or not path.strip():
+        raise ValueError(f"expected ROLE=FILE with ROLE one of {', '.join(PICTURE_ROLES)}: {text!r}")
+    return role, path.strip()
+
+
+def picture_spec(image_path, pictures):
+    """Job'un image alanı + ek roller -> yol ya da type sırasına göre ((rol, yol), ...)"""
+    if not pictures:
+        return image_path
+    roles = dict(pictures)
+    if isinstance(image_path, tuple):
+        # Manifest satırının kendi rolleri --picture'dan önceliklidir
+        roles.update(image_path)
+    elif image_path is not None:
+        roles.setdefault('front', image_path)
+    return tuple(sorted(roles.items(), key=lambda item: PICTURE_ROLES[item[0]]))
+
+
+def jobs_from_manifest(manifest_path):
+    """Manifest dosyasından (mp3, image) çiftlerini oku
+    
+    Her satır: mp3_yolu,resim_yolu  (CSV, '#' ile başlayan satırlar yorum).
+    Sonraki sütunlar 'rol=resim_yolu' olabilir (back=back.jpg, artist=...);
+    o zaman job'un image alanı bir resim setidir (bkz. picture_spec).
+    Göreli yollar manifest dosyasının klasörüne göre çözülür.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    with open(manifest_path, newline='', encoding='utf-8') as f:
+        for line_no, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].lstrip().startswith('#'):
+                continue
+            if len(row) < 2:
+                raise ValueError(f"{manifest_path}:{line_no}: expected 'mp3,image'")
+            mp3_path, image_path = (os.path.join(base_dir, p.strip()) for p in row[:2])
+            pictures = []
+            for column in row[2:]:
+                if not column.strip():
+                    continue
+                try:
+                    role, path = parse_picture_arg(column)
+                except ValueError as e:
+                    raise ValueError(f"{manifest_path}:{line_no}: {e}") from None
+                pictures.append((role, os.path.join(base_dir, path)))
+            jobs.append((mp3_path, picture_spec(image_path, pictures)))
+    return jobs
+
+
+def iter_mp3_files(root_dir, extensions=MP3_EXTENSIONS):
+    """Klasör ağacındaki tüm MP3 (ya da extensions) dosyalarını sıralı dolaş"""
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(extensions):
+                yield os.path.join(dirpath, name)
+
+
+def expand_mp3_paths(paths, extensions=MP3_EXTENSIONS):
+    """Dosya ve klasör listesini MP3 (ya da extensions) yollarına aç (klasörler recursive)"""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from iter_mp3_files(path, extensions)
+        elif path.lower().endswith(extensions):
+            yield path
+
+
+class CoverAnalyzer:
+    """Klasördeki aday resimleri NumPy ile puanlayıp gerçek front cover'ı seç
+    
+    Her aday SAMPLE x SAMPLE gri tonlamaya küçültülerek decode edilir
+    (JPEG'de draft ile) ve hepsi tek bir dizide, birlikte ölçülür:
+    düz renkli kenar şeritleri (letterbox / scan boşluğu), Laplacian
+    varyansı (netlik) ve 64 bitlik ortalama hash (aynı resmin kopyaları).
+    Ölçümler (yol, mtime, boyut) anahtarıyla cache_path'e JSON olarak
+    yazılır; değişmeyen resim bir daha decode edilmez.
+    Puan: kenarlar kırpıldıktan sonra kareye yakınlık, çözünürlük, klasördeki
+    en net adaya göre netlik ve dosya adı ipuçları (back, booklet, cd ...).
+    Kopyalardan sadece en büyüğü yarışır. NumPy yoksa ImportError.
+    """
+    
+    SAMPLE = 128
+    # Satır/sütun bu std'nin altındaysa ve kenar rengine yakınsa boşluk sayılır
+    FLAT_STD = 6.0
+    FLAT_DELTA = 16.0
+    MAX_BORDER = 0.45
+    # Hamming mesafesi bu kadar veya azsa aynı resim
+    DUPLICATE_BITS = 10
+    # Bundan uzun/geniş içerik kareye kırpılmaz (ör. iki sayfalık booklet)
+    SQUARE_CROP_MIN_RATIO = 0.6
+    BACK_HINTS = ('back', 'booklet', 'cd', 'disc', 'disk', 'inlay', 'inside', 'tray',
+                  'rear', 'label', 'spine', 'insert')
+    
+    def __init__(self, rules=(), cache_path=None):
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("cover analysis needs NumPy (pip install numpy)") from None
+        self._np = numpy
+        self.rules = tuple(rule.lower() for rule in rules)
+        self.cache_path = cache_path
+        self.features = {}
+        self.decoded = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding='utf-8') as f:
+                self.features = json.load(f)
+                
+    def measure(self, image_paths):
+        """Resimlerin ölçümleri (yol -> dict); okunamayanlar dönmez"""
+        with self._lock:
+            found, todo = {}, []
+            for path in image_paths:
+                real = os.path.realpath(path)
+                try:
+                    st = os.stat(real)
+                except OSError:
+                    continue
+                cached = self.features.get(real)
+                if cached and cached['mtime_ns'] == st.st_mtime_ns and cached['size'] == st.st_size:
+                    found[path] = cached
+                else:
+                    todo.append((path, real, st))
+            if todo:
+                for (path, real, st), features in zip(todo, self._measure_batch(
+                        [path for path, real, st in todo])):
+                    if features is not None:
+                        features.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+                        self.features[real] = found[path] = features
+                        self.dirty = True
+            return found
+        
+    def _measure_batch(self, paths):
+        from PIL import Image
+        
+        np = self._np
+        n = self.SAMPLE
+        grays = np.zeros((len(paths), n, n), dtype=np.float32)
+        sizes = [None] * len(paths)
+        for i, path in enumerate(paths):
+            try:
+                with Image.open(path) as image:
+                    sizes[i] = image.size
+                    image.draft('L', (n, n))
+                    grays[i] = np.asarray(image.convert('L').resize((n, n), Image.BILINEAR))
+            except Exception:
+                continue
+        self.decoded += sum(1 for size in sizes if size)
+        
+        # Kenar boşlukları: her yönden kesintisiz düz satır/sütun sayısı
+        def leading_flat(lines):
+            means, stds = lines.mean(axis=2), lines.std(axis=2)
+            flat = (stds < self.FLAT_STD) & (np.abs(means - means[:, :1]) < self.FLAT_DELTA)
+            count = np.where(flat.all(axis=1), 0, np.argmin(flat, axis=1))
+            return np.minimum(count, int(n * self.MAX_BORDER)) / n
+        
+        top = leading_flat(grays)
+        bottom = leading_flat(grays[:, ::-1, :])
+        left = leading_flat(grays.transpose(0, 2, 1))
+        right = leading_flat(grays.transpose(0, 2, 1)[:, ::-1, :])
+        
+        # Laplacian varyansı (netlik)
+        laplacian = (4 * grays[:, 1:-1, 1:-1] - grays[:, :-2, 1:-1] - grays[:, 2:, 1:-1]
+                     - grays[:, 1:-1, :-2] - grays[:, 1:-1, 2:])
+        sharpness = laplacian.var(axis=(1, 2))
+        
+        # Ortalama hash kırpılmış içerikten: 8x8 blok ortalamaları, ortalamanın üstü 1
+        # (çerçeveli scan ile aynı resmin temiz hali eşleşsin)
+        blocks = np.zeros((len(paths), 8, 8), dtype=np.float32)
+        for i in range(len(paths)):
+            y0, y1 = int(top[i] * n), n - int(bottom[i] * n)
+            x0, x1 = int(left[i] * n), n - int(right[i] * n)
+            content = grays[i, y0:y1, x0:x1]
+            rows = np.linspace(0, content.shape[0], 9).astype(int)[:-1]
+            cols = np.linspace(0, content.shape[1], 9).astype(int)[:-1]
+            sums = np.add.reduceat(np.add.reduceat(content, rows, axis=0), cols, axis=1)
+            counts = np.outer(np.diff(np.append(rows, content.shape[0])),
+                              np.diff(np.append(cols, content.shape[1])))
+            blocks[i] = sums / counts
+        bits = (blocks > blocks.mean(axis=(1, 2), keepdims=True)).reshape(len(paths), 64)
+        hashes = np.packbits(bits, axis=1)
+        
+        results = []
+        for i, size in enumerate(sizes):
+            if size is None:
+                results.append(None)
+                continue
+            results.append({
+                'width': size[0],
+                'height': size[1],
+                'border': [float(left[i]), float(top[i]), float(1 - right[i]), float(1 - bottom[i])],
+                'sharpness': float(sharpness[i]),
+                'hash': hashes[i].tobytes().hex()
+            })
+        return results
+    
+    def _content(self, features):
+        """Kenarlar kırpıldıktan sonraki (genişlik, yükseklik) piksel"""
+        l, t, r, b = features['border']
+        return features['width'] * (r - l), features['height'] * (b - t)
+    
+    def crop_box(self, features):
+        """Kenar boşluğu + kareye kırpma kutusu (oranlar); gerek yoksa None"""
+        l, t, r, b = features['border']
+        width, height = self._content(features)
+        if width <= 0 or height <= 0:
+            return None
+        ratio = min(width, height) / max(width, height)
+        if self.SQUARE_CROP_MIN_RATIO <= ratio < 0.98:
+            # Uzun kenarı ortadan kırp
+            if width > height:
+                trim = (width - height) / features['width'] / 2
+                l, r = l + trim, r - trim
+            else:
+                trim = (height - width) / features['height'] / 2
+                t, b = t + trim, b - trim
+        box = (round(l, 4), round(t, 4), round(r, 4), round(b, 4))
+        return None if box == (0, 0, 1, 1) else box
+    
+    def score(self, image_paths):
+        """Adayları puanla: [(puan, yol, ölçümler, kopyası olduğu yol)] (büyükten küçüğe)"""
+        np = self._np
+        measured = self.measure(image_paths)
+        paths = [path for path in image_paths if path in measured]
+        if not paths:
+            return []
+        features = [measured[path] for path in paths]
+        
+        content = np.array([self._content(f) for f in features], dtype=np.float64)
+        squareness = content.min(axis=1) / np.maximum(content.max(axis=1), 1)
+        resolution = np.minimum(content.min(axis=1) / 1000.0, 1.0)
+        sharpness = np.array([f['sharpness'] for f in features])
+        sharpness = sharpness / max(sharpness.max(), 1e-9)
+        names = [os.path.splitext(os.path.basename(path))[0].lower() for path in paths]
+        hints = np.array([
+            (1.0 if any(fnmatch.fnmatchcase(name, rule) for rule in self.rules) else 0.0)
+            - (1.5 if any(word in name for word in self.BACK_HINTS) else 0.0)
+            for name in names])
+        quality = resolution + sharpness
+        
+        # Kopyalar: her grupta çözünürlük + netliği en iyi olan kalır ve
+        # grubun en iyi dosya adı ipucunu alır ("front.jpg" bulanık olsa bile)
+        bits = np.unpackbits(np.array([bytearray.fromhex(f['hash']) for f in features],
+                                      dtype=np.uint8), axis=1)
+        distance = (bits[:, None, :] != bits[None, :, :]).sum(axis=2)
+        duplicate_of = [None] * len(paths)
+        group_hints = hints.copy()
+        for i in range(len(paths)):
+            same = np.flatnonzero(distance[i] <= self.DUPLICATE_BITS)
+            best = max(same, key=lambda j: (quality[j], -j))
+            if best != i:
+                duplicate_of[i] = paths[best]
+            group_hints[best] = max(group_hints[best], hints[same].max())
+        scores = 3.0 * squareness + quality + group_hints
+        
+        ranked = [(float(scores[i]), paths[i], features[i], duplicate_of[i])
+                  for i in range(len(paths))]
+        ranked.sort(key=lambda item: (item[3] is None, item[0]), reverse=True)
+        return ranked
+    
+    def best(self, image_paths):
+        """En yüksek puanlı, kopya olmayan aday; aday yoksa None"""
+        ranked = self.score(image_paths)
+        return ranked[0][1] if ranked else None
+    
+    def crop_for(self, image_path):
+        """Resmin kırpma kutusu (normalize_cover 'crop' seçeneği) ya da None"""
+        features = self.measure([image_path]).get(image_path)
+        return self.crop_box(features) if features else None
+    
+    def save(self):
+        """Ölçümleri atomik olarak diske yaz"""
+        if not self.cache_path or not self.dirty:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.features, f)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+
+
+class CoverResolver:
+    """Her MP3 için cover'ı klasöründeki resimlerden seç
+    
+    Kurallar sırayla denenir: dosya adı (uzantısız) rules'taki bir
+    fnmatch pattern'ine uyan ilk resim; hiçbiri yoksa ve fallback_largest
+    açıksa klasördeki en büyük resim. Sonuç klasör başına bir kez
+    hesaplanır, 20 parçalık bir albüm tek bir dizin listelemesi demektir.
+    analyzer (CoverAnalyzer) verilirse klasördeki bütün adaylar birlikte
+    puanlanır ve kazanan seçilir; kurallar sadece puana eklenen bir ipucudur.
+    """
+    
+    DEFAULT_RULES = ('cover', 'folder', 'front', 'album', 'albumart*', '*cover*', '*front*')
+    
+    def __init__(self, rules=DEFAULT_RULES, fallback_largest=True, analyzer=None):
+        self.rules = tuple(rule.lower() for rule in rules)
+        self.fallback_largest = fallback_largest
+        self.analyzer = analyzer
+        self.listings = 0
+        self._dirs = {}
+        self._lock = threading.Lock()
+        
+    def resolve(self, mp3_path):
+        """MP3'ün cover resmi yolu; bulunamazsa None"""
+        directory = os.path.dirname(os.path.abspath(mp3_path))
+        with self._lock:
+            if directory not in self._dirs:
+                self._dirs[directory] = self._resolve_dir(directory)
+            return self._dirs[directory]
+        
+    def forget(self, directory):
+        """Klasöre yeni resim geldi: sonraki resolve() yeniden listelesin"""
+        with self._lock:
+            self._dirs.pop(os.path.abspath(directory), None)
+            
+    def _resolve_dir(self, directory):
+        self.listings += 1
+        images = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                        images.append((entry.name, entry.stat().st_size))
+        except OSError:
+            return None
+        
+        if self.analyzer is not None and images:
+            return self.analyzer.best([os.path.join(directory, name)
+                                       for name, size in sorted(images)])
+        
+        # Aynı ada sahip uzantılar arasında IMAGE_EXTENSIONS sırası geçerli
+        images.sort(key=lambda item: (os.path.splitext(item[0])[0].lower(),
+                                      IMAGE_EXTENSIONS.index(os.path.splitext(item[0])[1].lower())))
+        for rule in self.rules:
+            for name, size in images:
+                if fnmatch.fnmatchcase(os.path.splitext(name)[0].lower(), rule):
+                    return os.path.join(directory, name)
+                
+        if self.fallback_largest and images:
+            name, size = max(images, key=lambda item: item[1])
+            return os.path.join(directory, name)
+        return None
+
+
+def jobs_from_directory(root_dir, image_path=None, resolver=None):
+    """Klasör ağacındaki her ses dosyası (AUDIO_EXTENSIONS) için job oluştur
+    
+    image_path verilirse hepsi aynı resmi alır, yoksa resolver her dosyanın
+    kendi klasöründen cover seçer (bulunamazsa image None kalır).
+    """
+    paths = iter_mp3_files(root_dir, AUDIO_EXTENSIONS)
+    if image_path is not None:
+        return [(mp3_path, image_path) for mp3_path in paths]
+    return [(mp3_path, resolver.resolve(mp3_path)) for mp3_path in paths]
+
+
+class StageStats:
+    """Aşama süreleri için toplam, percentile ve log-ölçekli histogram"""
+    
+    # Histogram kova sınırları (ms)
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 30000)
+    
+    def __init__(self):
+        self.samples = {}
+        self.bytes = {}
+        
+    def add(self, stage, seconds, nbytes=0):
+        self.samples.setdefault(stage, []).append(seconds)
+        self.bytes[stage] = self.bytes.get(stage, 0) + nbytes
+        
+    def add_result(self, result):
+        """Dosya sonucundaki tüm aşamaları ekle"""
+        for stage, seconds in result['stages'].items():
+            self.add(stage, seconds, result['stage_bytes'].get(stage, 0))
+            
+    @staticmethod
+    def _percentile(ordered, pct):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+    
+    def histogram(self, stage):
+        """{'<1ms': n, '<2ms': n, ..., '>=30000ms': n}"""
+        counts = OrderedDict((f"<{limit}ms", 0) for limit in self.BUCKETS_MS)
+        counts[f">={self.BUCKETS_MS[-1]}ms"] = 0
+        for seconds in self.samples.get(stage, []):
+            ms = seconds * 1000
+            for limit in self.BUCKETS_MS:
+                if ms < limit:
+                    counts[f"<{limit}ms"] += 1
+                    break
+            else:
+                counts[f">={self.BUCKETS_MS[-1]}ms"] += 1
+        return counts
+    
+    def summary(self):
+        """JSON'a çevrilebilir aşama özeti"""
+        output = OrderedDict()
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            output[stage] = {
+                'count': len(ordered),
+                'total_s': round(sum(ordered), 6),
+                'bytes': self.bytes.get(stage, 0),
+                'p50_ms': round(self._percentile(ordered, 50) * 1000, 3),
+                'p95_ms': round(self._percentile(ordered, 95) * 1000, 3),
+                'p99_ms': round(self._percentile(ordered, 99) * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+                'histogram': self.histogram(stage)
+            }
+        return output
+    
+    def status_line(self):
+        """Status bar için kısa özet (aşama başına p50/p95/max)"""
+        parts = []
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            parts.append(f"{stage.upper()} {self._percentile(ordered, 50) * 1000:.1f}/"
+                         f"{self._percentile(ordered, 95) * 1000:.1f}/{ordered[-1] * 1000:.1f}")
+        return "P50/P95/MAX MS: " + " - ".join(parts) if parts else ""
+    
+    def format_histograms(self, width=20):
+        """GUI mesaj kutusu için aşama başına metin histogramı (boş kovalar atlanır)"""
+        blocks = []
+        for stage in self.samples:
+            counts = [(bucket, count) for bucket, count in self.histogram(stage).items() if count]
+            peak = max(count for bucket, count in counts)
+            lines = [stage.upper()]
+            for bucket, count in counts:
+                bar = '#' * max(1, round(width * count / peak))
+                lines.append(f"  {bucket:>9} {bar:<{width}} {count}")
+            blocks.append("\n".join(lines))
+        return "\n".join(blocks)
+    
+    def format_table(self):
+        """CLI için aşama tablosu"""
+        lines = [f"{'STAGE':<7} {'COUNT':>7} {'TOTAL S':>9} {'P50 MS':>8} {'P99 MS':>8} "
+                 f"{'MB':>9}  HISTOGRAM"]
+        for stage, info in self.summary().items():
+            histogram = " ".join(f"{bucket}:{count}" for bucket, count in info['histogram'].items()
+                                 if count)
+            lines.append(f"{stage:<7} {info['count']:>7} {info['total_s']:>9.3f} "
+                         f"{info['p50_ms']:>8.2f} {info['p99_ms']:>8.2f} "
+                         f"{info['bytes'] / (1024 * 1024):>9.2f}  {histogram}")
+        return "\n".join(lines)
+
+
+class JsonLinesLog:
+    """Event'leri JSON-lines dosyasına yazan callback"""
+    
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+        
+    def __call__(self, event):
+        self.file.write(json.dumps(event) + "\n")
+        
+    def close(self):
+        self.file.close()
+
+
+@contextmanager
+def profiling(mode=None, output=None, top=25):
+    """İsteğe bağlı cProfile / tracemalloc yakalama
+    
+    Sadece çağıran process'i ölçer; batch için workers=1 ile kullanılmalı.
+    Özet stderr'e, ham veri (pstats / tracemalloc snapshot) output'a yazılır.
+    """
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(top)
+    elif mode == 'tracemalloc':
+        tracemalloc.start(25)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if output:
+                snapshot.dump(output)
+            print(f">>> TRACEMALLOC PEAK: {peak} bytes <<<", file=sys.stderr)
+            for entry in snapshot.statistics('lineno')[:top]:
+                print(entry, file=sys.stderr)
+    else:
+        yield
+
+
+class BatchReport:
+    """Batch sonuçları ve throughput istatistikleri"""
+    
+    def __init__(self):
+        self.results = []
+        self.ok = 0
+        self.failed = 0
+        self.bytes = 0
+        self.cover_saved = 0
+        self.picture_bytes_before = 0
+        self.picture_bytes_after = 0
+        self.pictures_deduped = 0
+        self.in_place = 0
+        self.rewritten = 0
+        self.skipped = 0
+        self.unchanged = 0
+        self.elapsed = 0.0
+        self.cover_cache = {}
+        self.stages = StageStats()
+        self.recovered = None
+        self.workers = None
+        self.peak_rss = None
+        self.mounts = None
+        
+    def add(self, result):
+        """Tek bir dosya sonucunu ekle"""
+        self.results.append(result)
+        if result['peak_rss'] is not None:
+            self.peak_rss = max(self.peak_rss or 0, result['peak_rss'])
+        if result['ok']:
+            self.ok += 1
+            self.stages.add_result(result)
+            if result['picture_bytes_before'] is not None:
+                self.picture_bytes_before += result['picture_bytes_before']
+                self.picture_bytes_after += result['picture_bytes_after']
+                self.pictures_deduped += result['pictures_deduped']
+            mode = result['write_mode']
+            if mode == 'skipped':
+                self.skipped += 1
+            elif mode == 'unchanged':
+                self.unchanged += 1
+            else:
+                self.bytes += result['bytes']
+                self.cover_saved += result['cover_saved']
+                if mode == 'in_place':
+                    self.in_place += 1
+                else:
+                    self.rewritten += 1
+        else:
+            self.failed += 1
+            
+    @property
+    def files_per_sec(self):
+        return self.ok / self.elapsed if self.elapsed else 0.0
+    
+    @property
+    def mb_per_sec(self):
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+    
+    def failures(self):
+        return [r for r in self.results if not r['ok']]
+    
+    def summary(self):
+        """JSON'a çevrilebilir özet"""
+        return {
+            'ok': self.ok,
+            'failed': self.failed,
+            'bytes': self.bytes,
+            'cover_bytes_saved': self.cover_saved,
+            'picture_bytes': {'before': self.picture_bytes_before,
+                              'after': self.picture_bytes_after,
+                              'duplicates_dropped': self.pictures_deduped},
+            'patched_in_place': self.in_place,
+            'rewritten': self.rewritten,
+            'skipped_same_cover': self.skipped,
+            'skipped_unchanged': self.unchanged,
+            'elapsed': round(self.elapsed, 3),
+            'files_per_sec': round(self.files_per_sec, 2),
+            'mb_per_sec': round(self.mb_per_sec, 2),
+            'cover_cache': self.cover_cache,
+            'stages': self.stages.summary(),
+            'recovered': self.recovered,
+            'workers': self.workers,
+            'peak_rss': self.peak_rss,
+            'mounts': self.mounts,
+            'failures': [{'mp3': r['mp3'], 'error': r['error']} for r in self.failures()]
+        }
+
+
+def _load_cover(cache, image_path):
+    """Cover'ı (ya da resim setini) cache'den al
+    
+    image_path bir yol ya da ((rol, yol), ...) tuple'ıdır (bkz. picture_spec).
+    (cover veya CoverSet, diskten okunan [(yol, CoverEntry)]) döner.
+    """
+    if image_path is None:
+        raise FileNotFoundError("no cover image found next to the MP3")
+    if isinstance(image_path, tuple):
+        pictures, fresh = [], []
+        for role, path in image_path:
+            entry, read = _load_cover(cache, path)
+            pictures.append((PICTURE_ROLES[role], entry))
+            fresh.extend(read)
+        return CoverSet(pictures), fresh
+    misses = cache.misses
+    cover = cache.get(image_path)
+    return cover, [(image_path, cover)] if cache.misses > misses else []
+
+
+def _record_cover_read(report, on_event, image_path, cover):
+    report.stages.add('read', cover.read_elapsed, cover.original_size)
+    if on_event:
+        on_event({'event': 'cover', 'image': image_path,
+                  'elapsed': cover.read_elapsed,
+                  'bytes': cover.original_size, 'encoded_bytes': cover.size})
+
+
+def _get_cover(cache, image_path, report, on_event=None):
+    """Cover'ı cache'den al; ilk okumaysa 'read' aşamasına ve event log'a yaz"""
+    cover, fresh = _load_cover(cache, image_path)
+    for path, entry in fresh:
+        _record_cover_read(report, on_event, path, entry)
+    return cover
+
+
+def _emit_results(results, report, state, on_event, on_result):
+    for result in results:
+        report.add(result)
+        if state is not None:
+            state.record(result)
+        if on_event:
+            on_event(dict(result, event='file'))
+        if on_result:
+            on_result(result)
+
+
+def run_batch(jobs, workers=None, on_result=None, cache=None, state=None,
+              padding_reserve=DEFAULT_PADDING_RESERVE, force=False, on_event=None,
+              atomic=None, memory_budget=None):
+    """(mp3, image) job listesini process pool üzerinde çalıştır; BatchReport döner"""
+    jobs = list(jobs)
+    cache = cache if cache is not None else CoverCache()
+    write_options = {'padding_reserve': padding_reserve, 'force': force,
+                     'memory_budget': memory_budget}
+    report = BatchReport()
+    start = time.perf_counter()
+    
+    def emit(results):
+        _emit_results(results, report, state, on_event, on_result)
+                
+    def tasks(chunk_size):
+        for image_path, mp3_paths in _group_jobs(jobs, chunk_size):
+            try:
+                cover = _get_cover(cache, image_path, report, on_event)
+            except Exception as e:
+                emit([_failed_result(p, image_path, e) for p in mp3_paths])
+                continue
+            mp3_paths, unchanged = _split_unchanged(state, cover, mp3_paths, force)
+            emit([_unchanged_result(p, cover) for p in unchanged])
+            if mp3_paths:
+                yield cover, mp3_paths
+    
+    if workers is None and memory_budget:
+        workers = workers_for_memory(memory_budget)
+    pool_size = workers or os.cpu_count() or 1
+    report.workers = pool_size
+    atomic, journal = _open_run_journal(atomic, report)
+    try:
+        if pool_size == 1 or len(jobs) <= 1:
+            for cover, mp3_paths in tasks(len(jobs) or 1):
+                emit(_inject_group(cover, mp3_paths, write_options, atomic))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            from concurrent.futures.process import BrokenProcessPool
+            chunk_size = max(1, min(64, len(jobs) // (pool_size * 4)))
+            executor = ProcessPoolExecutor(max_workers=pool_size)
+            pending = {}
+            
+            def collect(futures):
+                for future in futures:
+                    cover, mp3_paths = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except BrokenProcessPool as e:
+                        # Worker öldü (OOM kill, decoder segfault): o an pool'daki
+                        # chunk'lar FAILED, kalan işler yeni pool'da devam eder
+                        results = [_failed_result(p, cover.source, e) for p in mp3_paths]
+                    emit(results)
+                    
+            try:
+                for cover, mp3_paths in tasks(chunk_size):
+                    try:
+                        future = executor.submit(_inject_group, cover, mp3_paths, write_options,
+                                                 atomic)
+                    except BrokenProcessPool:
+                        executor.shutdown(wait=False)
+                        executor = ProcessPoolExecutor(max_workers=pool_size)
+                        future = executor.submit(_inject_group, cover, mp3_paths, write_options,
+                                                 atomic)
+                    pending[future] = (cover, mp3_paths)
+                    # Kuyrukta bekleyen iş sayısını sınırla (bellek)
+                    if len(pending) >= pool_size * 2:
+                        collect(wait(list(pending), return_when=FIRST_COMPLETED)[0])
+                collect(as_completed(list(pending)))
+            finally:
+                executor.shutdown()
+    finally:
+        if journal is not None:
+            journal.close()
+            
+    report.elapsed = time.perf_counter() - start
+    report.cover_cache = cache.stats()
+    if state is not None:
+        state.save()
+    return report
+
+
+def _device_of(directory):
+    """Klasörün bulunduğu mount (st_dev); stat edilemezse None"""
+    try:
+        return os.stat(directory).st_dev
+    except OSError:
+        return None
+
+
+def _inject_one(cover, mp3_path, write_options, writer, state):
+    """Async modda thread içinde tek dosya: state kontrolü (stat) + yazma"""
+    if not _split_unchanged(state, cover, [mp3_path], write_options['force'])[0]:
+        return [_unchanged_result(mp3_path, cover)]
+    if writer is None:
+        return _inject_group(cover, [mp3_path], write_options, measure_rss=False)
+    try:
+        result = write_cover(mp3_path, cover, writer=writer, **write_options)
+    except Exception as e:
+        return [_failed_result(mp3_path, cover.source, e)]
+    # Rename bekleyen dosyanın sonucu mount'un writer'ı flush edince gelir
+    return [] if result['write_mode'] == 'atomic' else [result]
+
+
+def run_batch_async(jobs, concurrency=DEFAULT_ASYNC_CONCURRENCY,
+                    per_mount=DEFAULT_MOUNT_CONCURRENCY, read_ahead=DEFAULT_READ_AHEAD,
+                    on_result=None, cache=None, state=None,
+                    padding_reserve=DEFAULT_PADDING_RESERVE, force=False, on_event=None,
+                    atomic=None, memory_budget=None):
+    """run_batch'in asyncio + thread pool sürümü: NFS/SMB gibi gecikmesi yüksek mount'lar için"""
+    import asyncio
+    
+    jobs = list(jobs)
+    cache = cache if cache is not None else CoverCache()
+    write_options = {'padding_reserve': padding_reserve, 'force': force,
+                     'memory_budget': memory_budget}
+    report = BatchReport()
+    report.workers = concurrency
+    start = time.perf_counter()
+        
+    def emit(results):
+        _emit_results(results, report, state, on_event, on_result)
+        
+    async def main(executor):
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(concurrency)
+        mounts = {}
+        devices = {}
+        writers = {}
+        covers = asyncio.Queue(maxsize=max(1, read_ahead))
+        
+        async def read_covers():
+            for image_path, mp3_paths in _group_jobs(jobs, len(jobs) or 1):
+                cover = error = None
+                try:
+                    cover, fresh = await loop.run_in_executor(executor, _load_cover,
+                                                              cache, image_path)
+                    for path, entry in fresh:
+                        _record_cover_read(report, on_event, path, entry)
+                except Exception as e:
+                    error = e
+                await covers.put((image_path, mp3_paths, cover, error))
+            await covers.put(None)
+            
+        async def inject(cover, mp3_path):
+            try:
+                directory = os.path.dirname(os.path.abspath(mp3_path))
+                if directory not in devices:
+                    devices[directory] = loop.run_in_executor(executor, _device_of, directory)
+                device = await devices[directory]
+                mount = mounts.setdefault(device, asyncio.Semaphore(per_mount))
+                if atomic and device not in writers:
+                    # Aynı mount'taki dosyalar fsync batch'lerini paylaşır
+                    writers[device] = AtomicWriter(
+                        **atomic, on_flush=lambda results: loop.call_soon_threadsafe(emit, results))
+                async with mount:
+                    results = await loop.run_in_executor(executor, _inject_one, cover, mp3_path,
+                                                         write_options, writers.get(device), state)
+            finally:
+                limit.release()
+            emit(results)
+            
+        reader = asyncio.ensure_future(read_covers())
+        running = set()
+        try:
+            while True:
+                item = await covers.get()
+                if item is None:
+                    break
+                image_path, mp3_paths, cover, error = item
+                if error is not None:
+                    emit([_failed_result(p, image_path, error) for p in mp3_paths])
+                    continue
+                for mp3_path in mp3_paths:
+                    await limit.acquire()
+                    task = asyncio.ensure_future(inject(cover, mp3_path))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+            if running:
+                await asyncio.gather(*running)
+            for writer in writers.values():
+                try:
+                    await loop.run_in_executor(executor, writer.flush)
+                except Exception:
+                    # Batch FAILED işaretlendi ve on_flush ile raporlandı
+                    pass
+        finally:
+            reader.cancel()
+            for task in running:
+                task.cancel()
+        report.mounts = len(mounts)
+        
+    atomic, journal = _open_run_journal(atomic, report)
+    # Cover okuma + stat için birkaç ek thread
+    executor = ThreadPoolExecutor(max_workers=concurrency + 2)
+    try:
+        asyncio.run(main(executor))
+    finally:
+        # Ctrl+C: o an çalışan mutagen çağrıları bitsin, yarım dosya kalmasın
+        executor.shutdown(wait=True, cancel_futures=True)
+        if journal is not None:
+            journal.close()
+        
+    report.elapsed = time.perf_counter() - start
+    report.cover_cache = cache.stats()
+    if state is not None:
+        state.save()
+    return report
+
+
+def _plan_group(cover, mp3_paths, plan_options):
+    """Worker process içinde aynı cover'ı paylaşan dosyaları planla"""
+    plans = []
+    for mp3_path in mp3_paths:
+        try:
+            plans.append(plan_cover(mp3_path, cover, **plan_options))
+        except Exception as e:
+            plans.append({'mp3': mp3_path, 'image': cover.source, 'mode': 'error',
+                          'error': f"{type(e).__name__}: {e}"})
+    return plans
+
+
+PLAN_FIELDS = ('mp3', 'image', 'container', 'mode', 'exact', 'file_bytes', 'old_tag_size',
+               'old_padding', 'old_picture_bytes', 'new_picture_bytes', 'cover_bytes',
+               'new_tag_size', 'bytes_written', 'est_seconds', 'error')
+
+
+def run_plan(jobs, workers=None, cache=None, state=None, model=DEFAULT_COST_MODEL,
+             padding_reserve=DEFAULT_PADDING_RESERVE, force=False, atomic=None,
+             memory_budget=None):
+    """Batch'in dry-run planı: (dosya planları, toplamlar) döner
+    
+    Parametreler run_batch ile aynıdır, hiçbir dosya yazılmaz. Cover'lar
+    (normalize dahil) ana process'te bir kez okunur; tag'ler worker'larda.
+    est_seconds tek worker süresidir, toplam süre worker sayısına bölünür.
+    """
+    jobs = list(jobs)
+    cache = cache if cache is not None else CoverCache()
+    plan_options = {'padding_reserve': padding_reserve, 'force': force,
+                    'atomic': bool(atomic), 'memory_budget': memory_budget}
+    if workers is None and memory_budget:
+        workers = workers_for_memory(memory_budget)
+    pool_size = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    
+    plans = []
+    groups = []
+    for image_path, mp3_paths in _group_jobs(jobs, max(1, min(256, len(jobs) // (pool_size * 4)))):
+        try:
+            cover = _load_cover(cache, image_path)[0]
+        except Exception as e:
+            plans.extend({'mp3': p, 'image': image_path, 'mode': 'error',
+                          'error': f"{type(e).__name__}: {e}"} for p in mp3_paths)
+            continue
+        mp3_paths, unchanged = _split_unchanged(state, cover, mp3_paths, force)
+        plans.extend({'mp3': p, 'image': cover.source, 'mode': 'unchanged'} for p in unchanged)
+        if mp3_paths:
+            groups.append((cover, mp3_paths))
+            
+    if pool_size == 1 or len(groups) <= 1:
+        for cover, mp3_paths in groups:
+            plans.extend(_plan_group(cover, mp3_paths, plan_options))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=pool_size) as executor:
+            futures = [executor.submit(_plan_group, cover, mp3_paths, plan_options)
+                       for cover, mp3_paths in groups]
+            for future in futures:
+                plans.extend(future.result())
+                
+    totals = {'files': len(plans), 'bytes_written': 0, 'inexact': 0, 'est_seconds': 0.0,
+              'old_picture_bytes': 0, 'new_picture_bytes': 0}
+    totals.update((mode, 0) for mode in ('in_place', 'rewrite', 'stream', 'atomic',
+                                         'skipped', 'unchanged', 'error'))
+    for plan in plans:
+        for field in PLAN_FIELDS:
+            plan.setdefault(field, None)
+        plan['est_seconds'] = round(estimate_seconds(plan, model), 6)
+        totals[plan['mode']] += 1
+        totals['bytes_written'] += plan['bytes_written'] or 0
+        totals['old_picture_bytes'] += plan['old_picture_bytes'] or 0
+        totals['new_picture_bytes'] += plan['new_picture_bytes'] or 0
+        totals['est_seconds'] += plan['est_seconds']
+        if plan['exact'] is False:
+            totals['inexact'] += 1
+    totals['workers'] = pool_size
+    totals['est_wall_seconds'] = round(totals['est_seconds'] / pool_size, 3)
+    totals['est_seconds'] = round(totals['est_seconds'], 3)
+    totals['plan_seconds'] = round(time.perf_counter() - start, 3)
+    totals['cost_model'] = model
+    return plans, totals
+
+
+class InotifyWatcher:
+    """Linux inotify (ctypes) ile klasör ağacını izler
+    
+    wait(timeout) uzantısı ilgilendiren dosyaların yollarını döner; olay
+    yoksa select() içinde bloklanır, boşta CPU harcamaz. Yeni gelen alt
+    klasörler de izlenir ve içlerinde zaten bulunan dosyalar raporlanır.
+    """
+    
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT = struct.Struct('iIII')
+    
+    def __init__(self, roots, extensions):
+        import ctypes
+        import ctypes.util
+        
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.extensions = extensions
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            self._raise_errno()
+        self._dirs = {}
+        try:
+            for root in self.roots:
+                self._add_tree(root, strict=True)
+        except OSError:
+            self.close()
+            raise
+            
+    def _raise_errno(self):
+        errno = self._ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    
+    def _add_tree(self, directory, strict=False):
+        """Klasörü ve alt klasörlerini izlemeye al; içlerindeki dosyaları döner"""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd < 0:
+                if strict:
+                    # ör. ENOSPC: max_user_watches doldu -> çağıran polling'e geçer
+                    self._raise_errno()
+                continue
+            self._dirs[wd] = dirpath
+            found.extend(os.path.join(dirpath, name) for name in filenames
+                         if name.lower().endswith(self.extensions))
+        return found
+    
+    def wait(self, timeout=None):
+        """Olay bekle (timeout=None -> süresiz); değişen dosya yollarını döner"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        
+        paths = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = self.EVENT.unpack_from(data, offset)
+            name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b'\0')
+            offset += self.EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                # Kernel kuyruğu taştı, olay kaçırılmış olabilir: her şeyi yeniden tara
+                for root in self.roots:
+                    paths.extend(self._add_tree(root))
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    paths.extend(self._add_tree(path))
+            elif path.lower().endswith(self.extensions):
+                paths.append(path)
+        return paths
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """inotify olmayan sistemler ve ağ paylaşımları için periyodik tarama
+    
+    Her turda sadece klasörlerin mtime'ına bakılır; mtime'ı değişen
+    klasörler listelenip yeni ya da boyutu/mtime'ı değişen dosyalar
+    raporlanır. Yazılmaya devam eden dosyaları WatchDaemon takip eder.
+    """
+    
+    def __init__(self, roots, extensions, interval=DEFAULT_POLL_INTERVAL):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.extensions = extensions
+        self.interval = interval
+        self._dirs = {}
+        for root in self.roots:
+            self._scan_dir(root)
+        self._next = time.monotonic() + interval
+        
+    def _scan_dir(self, directory):
+        """Klasörü listele; yeni/değişen dosyaları (yeni alt klasörler dahil) döner"""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            self._dirs.pop(directory, None)
+            return []
+        
+        known = self._dirs[directory][1] if directory in self._dirs else {}
+        files = {}
+        changed = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in self._dirs:
+                        changed.extend(self._scan_dir(entry.path))
+                elif entry.name.lower().endswith(self.extensions):
+                    st = entry.stat()
+                    files[entry.name] = (st.st_size, st.st_mtime_ns)
+                    if known.get(entry.name) != files[entry.name]:
+                        changed.append(entry.path)
+            except OSError:
+                continue
+        self._dirs[directory] = (mtime_ns, files)
+        return changed
+    
+    def wait(self, timeout=None):
+        """Sonraki taramaya kadar (en fazla timeout) bekle; değişen dosyaları döner"""
+        delay = max(0.0, self._next - time.monotonic())
+        if timeout is not None and timeout < delay:
+            time.sleep(timeout)
+            return []
+        time.sleep(delay)
+        self._next = time.monotonic() + self.interval
+        
+        changed = []
+        for directory, (mtime_ns, files) in list(self._dirs.items()):
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._dirs.pop(directory, None)
+                continue
+            if current != mtime_ns:
+                changed.extend(self._scan_dir(directory))
+        return changed
+    
+    def close(self):
+        pass
+
+
+def open_watcher(roots, extensions, poll_interval=None):
+    """inotify dene, olmazsa (Linux değil, watch limiti dolu) polling'e düş"""
+    if poll_interval is None:
+        try:
+            return InotifyWatcher(roots, extensions)
+        except OSError:
+            poll_interval = DEFAULT_POLL_INTERVAL
+    return PollingWatcher(roots, extensions, poll_interval)
+
+
+def _ignore_sigint():
+    """Pool worker'ları Ctrl+C'yi yok saysın; kapanışı ana process yönetir"""
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+class WatchDaemon:
+    """Klasörleri izleyip yeni gelen MP3'lere cover gömen uzun süreli servis
+    
+    Olaylar albüm klasörü başına toplanır: klasör settle saniye boyunca
+    sessiz kaldığında ve bekleyen dosyaların boyutu/mtime'ı sabitlendiğinde
+    (yarım kopyalanan dosyalar) tek bir iş olarak sınırlı bir process
+    pool'a gönderilir. Klasöre resim gelirse oradaki tüm MP3'ler yeniden
+    ele alınır (aynı cover zaten gömülüyse dosya yazılmaz). Daemon'un kendi
+    yazdığı dosyalardan gelen olaylar yok sayılır. Her dosyanın son olaydan
+    tag'lenmesine kadar geçen süre 'latency' aşaması olarak raporlanır.
+    """
+    
+    def __init__(self, watcher, image_path=None, resolver=None, workers=None,
+                 settle=DEFAULT_SETTLE, on_result=None, on_event=None, cache=None, state=None,
+                 padding_reserve=DEFAULT_PADDING_RESERVE, force=False, atomic=None,
+                 memory_budget=None):
+        self.watcher = watcher
+        self.image_path = image_path
+        self.resolver = resolver or CoverResolver()
+        if workers is None and memory_budget:
+            workers = workers_for_memory(memory_budget)
+        self.workers = workers or os.cpu_count() or 1
+        self.settle = settle
+        self.on_result = on_result
+        self.on_event = on_event
+        self.cache = cache if cache is not None else CoverCache()
+        self.state = state
+        self.force = force
+        self.atomic = atomic
+        self.write_options = {'padding_reserve': padding_reserve, 'force': force,
+                              'memory_budget': memory_budget}
+        self.report = BatchReport()
+        self.report.workers = self.workers
+        self.pending = {}
+        self.ready = deque()
+        self.inflight = {}
+        self.arrivals = {}
+        # Kendi yazdığımız dosyalar: path -> ((boyut, mtime), son geçerlilik)
+        self.written = {}
+        self.busy = set()
+        
+    def _is_own_write(self, path, key, consume=False):
+        """key daemon'un bu dosyaya son yazmasıyla aynı mı; eşleşen kayıt consume ile atılır"""
+        entry = self.written.get(path)
+        if entry is None:
+            return False
+        if entry[1] < time.monotonic():
+            del self.written[path]
+            return False
+        if consume and entry[0] == key:
+            del self.written[path]
+        return entry[0] == key
+    
+    def _expire_written(self):
+        """Olayı hiç gelmeyen kayıtları debounce penceresi geçince at"""
+        now = time.monotonic()
+        for path in [p for p, (key, expires) in self.written.items() if expires < now]:
+            del self.written[path]
+        
+    def add(self, paths):
+        """Watcher'dan gelen yolları klasörlerine topla"""
+        now = time.monotonic()
+        for path in paths:
+            directory = os.path.dirname(path)
+            is_image = path.lower().endswith(IMAGE_EXTENSIONS)
+            if is_image:
+                if self.image_path:
+                    continue
+                self.resolver.forget(directory)
+            else:
+                key = _stat_key(path)
+                if key is None or self._is_own_write(path, key):
+                    # Silinmiş ya da az önce kendimizin yazdığı dosya
+                    continue
+            entry = self.pending.setdefault(directory, {'files': {}, 'rescan': False})
+            if is_image:
+                entry['rescan'] = True
+            else:
+                entry['files'][path] = key
+                if path not in self.busy:
+                    # İşlenen dosyanın olayları büyük ihtimalle bizim yazmamız
+                    self.arrivals[path] = now
+            entry['deadline'] = now + self.settle
+            
+    def check_pending(self):
+        """Sessiz kalan ve dosyaları sabitlenen klasörleri hazır kuyruğuna al"""
+        now = time.monotonic()
+        self._expire_written()
+        for directory, entry in list(self.pending.items()):
+            if entry['deadline'] > now:
+                continue
+            # Hâlâ yazılan (boyutu/mtime'ı değişen) ya da pool'da işlenen dosya varsa bekle
+            growing = False
+            for path, key in list(entry['files'].items()):
+                current = _stat_key(path)
+                if current is None or (path not in self.busy
+                                       and self._is_own_write(path, current, consume=True)):
+                    # Silinmiş ya da olayları kendi yazmamızdan gelmiş
+                    del entry['files'][path]
+                    self.arrivals.pop(path, None)
+                elif current != key or path in self.busy:
+                    entry['files'][path] = current
+                    growing = True
+            if growing:
+                entry['deadline'] = now + self.settle
+                continue
+            
+            del self.pending[directory]
+            paths = set(entry['files'])
+            if entry['rescan']:
+                try:
+                    with os.scandir(directory) as it:
+                        for item in it:
+                            if item.name.lower().endswith(AUDIO_EXTENSIONS) and item.is_file():
+                                paths.add(item.path)
+                                self.arrivals.setdefault(item.path, entry['deadline'] - self.settle)
+                except OSError:
+                    pass
+            if paths:
+                self.ready.append(sorted(paths))
+                
+    def dispatch(self, executor):
+        """Hazır klasörleri pool'a gönder (aynı anda en fazla workers * 2 iş)"""
+        while self.ready and len(self.inflight) < self.workers * 2:
+            mp3_paths = self.ready.popleft()
+            image_path = self.image_path or self.resolver.resolve(mp3_paths[0])
+            try:
+                cover = _get_cover(self.cache, image_path, self.report, self.on_event)
+            except Exception as e:
+                self.emit([_failed_result(p, image_path, e) for p in mp3_paths])
+                continue
+            mp3_paths, unchanged = _split_unchanged(self.state, cover, mp3_paths, self.force)
+            self.emit([_unchanged_result(p, cover) for p in unchanged])
+            if not mp3_paths:
+                continue
+            self.busy.update(mp3_paths)
+            if executor is None:
+                self.emit(_inject_group(cover, mp3_paths, self.write_options, self.atomic))
+            else:
+                future = executor.submit(_inject_group, cover, mp3_paths, self.write_options,
+                                         self.atomic)
+                self.inflight[future] = mp3_paths
+                
+    def collect(self, block=False):
+        """Biten işlerin sonuçlarını topla"""
+        if not self.inflight:
+            return
+        done, _ = wait(list(self.inflight), timeout=None if block else 0)
+        for future in done:
+            mp3_paths = self.inflight.pop(future)
+            try:
+                results = future.result()
+            except Exception as e:
+                # Worker process öldü (ör. BrokenProcessPool)
+                results = [_failed_result(p, None, e) for p in mp3_paths]
+            self.emit(results)
+            
+    def emit(self, results):
+        now = time.monotonic()
+        for result in results:
+            self.busy.discard(result['mp3'])
+            arrival = self.arrivals.pop(result['mp3'], None)
+            if arrival is not None:
+                result['latency'] = now - arrival
+                if result['ok']:
+                    self.report.stages.add('latency', result['latency'])
+            if result['ok'] and result['mtime_ns']:
+                self.written[result['mp3']] = ((result['bytes'], result['mtime_ns']),
+                                               now + max(2 * self.settle, 1.0))
+            self.report.add(result)
+            if self.state is not None:
+                self.state.record(result)
+            if self.on_event:
+                self.on_event(dict(result, event='file'))
+            if self.on_result:
+                self.on_result(result)
+                
+    def _timeout(self):
+        """Sonraki iş zamanına kadar bekleme süresi; iş yoksa None (süresiz)"""
+        timeout = None
+        if self.pending:
+            timeout = max(0.0, min(e['deadline'] for e in self.pending.values()) - time.monotonic())
+        if self.inflight or self.ready:
+            # Pool sonuçlarını kısa aralıklarla topla
+            timeout = 0.05 if timeout is None else min(timeout, 0.05)
+        return timeout
+    
+    def run(self, scan_existing=False):
+        """Ctrl+C / SIGTERM'e kadar çalış; BatchReport döner"""
+        start = time.perf_counter()
+        self.atomic, journal = _open_run_journal(self.atomic, self.report)
+        if scan_existing:
+            self.add(p for root in self.watcher.roots for p in expand_mp3_paths([root], AUDIO_EXTENSIONS))
+            
+        executor = None
+        try:
+            if self.workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                executor = ProcessPoolExecutor(max_workers=self.workers,
+                                               initializer=_ignore_sigint)
+            while True:
+                self.add(self.watcher.wait(self._timeout()))
+                self.check_pending()
+                self.dispatch(executor)
+                self.collect()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # Kuyrukta bekleyenler işlenmez, başlamış işler bitirilir
+            self.collect(block=True)
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            self.report.elapsed = time.perf_counter() - start
+            self.report.cover_cache = self.cache.stats()
+            if journal is not None:
+                journal.close()
+            if self.state is not None:
+                self.state.save()
+        return self.report
+
+
+def _load_gui_modules():
+    """Tk, tkinterdnd2 ve ImageTk'yi yükleyip modül global'lerine bağla
+    
+    Sadece GUI açılırken çağrılır; RetroMP3CoverTool bu isimleri kullanır.
+    """
+    global tk, filedialog, messagebox, ttk, DND_FILES, TkinterDnD, ImageTk
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+    from tkinterdnd2 import DND_FILES, TkinterDnD
+    from PIL import ImageTk
+
 
 class RetroMP3CoverTool:
     def __init__(self, root):
         self.root = root
         self.root.title("🎵 MP3 COVER TOOL 🎵")
-        self.root.geometry("800x700")
+        self.root.geometry("800x880")
         self.root.configure(bg='#0a0a0a')
         self.root.resizable(True, True)
         
@@ -25,6 +3315,27 @@ class RetroMP3CoverTool:
         self.image_file = None
         self.preview_image = None
         self.animation_running = False
+        self.cover_cache = CoverCache(max_bytes=64 * 1024 * 1024)
+        self.thumbnail_cache = ThumbnailCache()
+        self.cover_resolver = CoverResolver()
+        
+        # İş kuyruğu: her eleman {'mp3', 'state', 'error'}
+        self.job_queue = []
+        self.queued_paths = set()
+        self.queue_page = 0
+        self.queue_refresh_pending = False
+        self.run_state = None
+        
+        # Arka plan işleri (Tk sadece ana thread'de, sonuçlar root.after ile döner)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.job_executor = ThreadPoolExecutor(max_workers=GUI_JOB_WORKERS)
+        self.cancel_event = threading.Event()
+        self.progress_queue = queue.Queue()
+        self.result_queue = queue.Queue()
+        self.job_running = False
+        self.preview_token = 0
+        self.embedded_token = 0
+        self.embedded_image = None
         
         # Renkler (Cyberpunk/Retro palette)
         self.colors = {
@@ -46,6 +3357,7 @@ class RetroMP3CoverTool:
         self.setup_ui()
         self.setup_drag_drop()
         self.start_background_animation()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def setup_fonts(self):
         """Custom font ayarları"""
@@ -69,6 +3381,9 @@ class RetroMP3CoverTool:
         # İçerik bölümü
         self.create_content()
         
+        # İş kuyruğu bölümü
+        self.create_queue_panel()
+        
         # Alt durum bölümü
         self.create_status_bar()
         
@@ -152,6 +3467,23 @@ class RetroMP3CoverTool:
                                      justify='center')
         self.preview_label.pack(expand=True)
         
+        # Seçili MP3'te gömülü olan cover
+        embedded_title = tk.Label(panel, 
+                                 text="[ CURRENT COVER ]",
+                                 font=self.fonts['small'],
+                                 fg=self.colors['neon_blue'],
+                                 bg=self.colors['panel'])
+        embedded_title.pack()
+        
+        self.embedded_label = tk.Label(panel, 
+                                      text="NO MP3 SELECTED",
+                                      font=self.fonts['small'],
+                                      fg=self.colors['text_dim'],
+                                      bg=self.colors['accent'],
+                                      compound='top',
+                                      justify='center')
+        self.embedded_label.pack(fill='x', padx=20, pady=(5, 20))
+        
         return panel
         
     def create_mp3_section(self, parent):
@@ -173,7 +3505,7 @@ class RetroMP3CoverTool:
         self.mp3_drop_area.pack_propagate(False)
         
         self.mp3_drop_label = tk.Label(self.mp3_drop_area, 
-                                      text="DRAG & DROP MP3 FILE HERE\n>>> OR CLICK BUTTON BELOW <<<",
+                                      text="DRAG & DROP MP3 FILES / FOLDERS HERE\n>>> OR CLICK BUTTON BELOW <<<",
                                       font=self.fonts['body'],
                                       fg=self.colors['text_dim'],
                                       bg=self.colors['accent'],
@@ -182,7 +3514,7 @@ class RetroMP3CoverTool:
         
         # Seçilen dosya bilgisi
         self.mp3_info_label = tk.Label(section, 
-                                      text="STATUS: NO FILE SELECTED",
+                                      text="STATUS: NO FILES QUEUED",
                                       font=self.fonts['small'],
                                       fg=self.colors['text_dim'],
                                       bg=self.colors['panel'])
@@ -190,7 +3522,7 @@ class RetroMP3CoverTool:
         
         # Seçim butonu
         self.mp3_button = tk.Button(section, 
-                                   text="[ SELECT MP3 ]",
+                                   text="[ ADD MP3 ]",
                                    font=self.fonts['button'],
                                    fg=self.colors['bg'],
                                    bg=self.colors['neon_blue'],
@@ -198,7 +3530,19 @@ class RetroMP3CoverTool:
                                    bd=2,
                                    command=self.select_mp3,
                                    cursor='hand2')
-        self.mp3_button.pack(anchor='w')
+        self.mp3_button.pack(side='left')
+        
+        # Klasör ekleme butonu
+        self.mp3_folder_button = tk.Button(section, 
+                                          text="[ ADD FOLDER ]",
+                                          font=self.fonts['button'],
+                                          fg=self.colors['bg'],
+                                          bg=self.colors['neon_blue'],
+                                          relief='raised',
+                                          bd=2,
+                                          command=self.select_mp3_folder,
+                                          cursor='hand2')
+        self.mp3_folder_button.pack(side='left', padx=(10, 0))
         
         return section
         
@@ -246,7 +3590,21 @@ class RetroMP3CoverTool:
                                      bd=2,
                                      command=self.select_image,
                                      cursor='hand2')
-        self.image_button.pack(anchor='w')
+        self.image_button.pack(side='left')
+        
+        # Otomatik cover: her MP3'ün klasöründeki cover/folder/front.*
+        self.auto_cover_var = tk.BooleanVar(value=False)
+        self.auto_cover_check = tk.Checkbutton(section, 
+                                              text="AUTO (FOLDER ART)",
+                                              variable=self.auto_cover_var,
+                                              command=self.check_ready,
+                                              font=self.fonts['small'],
+                                              fg=self.colors['neon_green'],
+                                              bg=self.colors['panel'],
+                                              selectcolor=self.colors['accent'],
+                                              activebackground=self.colors['panel'],
+                                              activeforeground=self.colors['neon_green'])
+        self.auto_cover_check.pack(side='left', padx=(10, 0))
         
         return section
         
@@ -268,6 +3626,83 @@ class RetroMP3CoverTool:
                                        state='disabled')
         self.process_button.pack(fill='x')
         
+    def create_queue_panel(self):
+        """İş kuyruğu - sayfalı görünüm (satır başına widget yok)"""
+        panel = tk.Frame(self.main_container, bg=self.colors['panel'], relief='raised', bd=2)
+        panel.pack(fill='x', pady=(20, 0))
+        
+        header = tk.Frame(panel, bg=self.colors['panel'])
+        header.pack(fill='x', padx=20, pady=(10, 5))
+        
+        # Başlık
+        title = tk.Label(header, 
+                        text="[ 03 ] JOB QUEUE",
+                        font=self.fonts['subtitle'],
+                        fg=self.colors['neon_purple'],
+                        bg=self.colors['panel'])
+        title.pack(side='left')
+        
+        self.queue_info_label = tk.Label(header, 
+                                        text="0 ITEMS",
+                                        font=self.fonts['small'],
+                                        fg=self.colors['text_dim'],
+                                        bg=self.colors['panel'])
+        self.queue_info_label.pack(side='left', padx=10)
+        
+        # Sayfa ve temizleme butonları
+        self.queue_buttons = []
+        for text, command in (("[ CLEAR ]", self.clear_queue),
+                              ("[ > ]", lambda: self.change_queue_page(1)),
+                              ("[ < ]", lambda: self.change_queue_page(-1))):
+            button = tk.Button(header, 
+                              text=text,
+                              font=self.fonts['small'],
+                              fg=self.colors['bg'],
+                              bg=self.colors['neon_purple'],
+                              relief='raised',
+                              bd=1,
+                              command=command,
+                              cursor='hand2')
+            button.pack(side='right', padx=(5, 0))
+            self.queue_buttons.append(button)
+        self.clear_button = self.queue_buttons[0]
+        
+        self.queue_page_label = tk.Label(header, 
+                                        text="PAGE 1/1",
+                                        font=self.fonts['small'],
+                                        fg=self.colors['text_dim'],
+                                        bg=self.colors['panel'])
+        self.queue_page_label.pack(side='right', padx=10)
+        
+        # Kuyruk listesi (sadece görünen sayfa eklenir)
+        style = ttk.Style(self.root)
+        style.configure('Retro.Treeview',
+                        background=self.colors['accent'],
+                        fieldbackground=self.colors['accent'],
+                        foreground=self.colors['text'],
+                        font=self.fonts['small'])
+        style.configure('Retro.Treeview.Heading',
+                        background=self.colors['panel'],
+                        foreground=self.colors['neon_purple'],
+                        font=self.fonts['small'])
+        self.queue_view = ttk.Treeview(panel, 
+                                      style='Retro.Treeview',
+                                      columns=('index', 'state', 'file'),
+                                      show='headings',
+                                      height=6)
+        for column, text, width, stretch in (('index', '#', 60, False),
+                                             ('state', 'STATE', 90, False),
+                                             ('file', 'FILE', 500, True)):
+            self.queue_view.heading(column, text=text)
+            self.queue_view.column(column, width=width, stretch=stretch)
+        self.queue_view.tag_configure('done', foreground=self.colors['success'])
+        self.queue_view.tag_configure('skipped', foreground=self.colors['neon_blue'])
+        self.queue_view.tag_configure('failed', foreground=self.colors['error'])
+        self.queue_view.tag_configure('cancelled', foreground=self.colors['warning'])
+        self.queue_view.tag_configure('running', foreground=self.colors['neon_pink'])
+        self.queue_view.pack(fill='x', padx=20, pady=(0, 10))
+        self.queue_view.bind('<<TreeviewSelect>>', self.on_queue_select)
+        
     def create_status_bar(self):
         """Alt durum çubuğu"""
         status_frame = tk.Frame(self.main_container, bg=self.colors['accent'], 
@@ -283,7 +3718,33 @@ class RetroMP3CoverTool:
                                     font=self.fonts['small'],
                                     fg=self.colors['neon_green'],
                                     bg=self.colors['accent'])
-        self.status_label.pack(pady=10)
+        self.status_label.pack(side='left', padx=10, pady=10)
+        
+        # İptal butonu
+        self.cancel_button = tk.Button(status_frame, 
+                                      text="[ CANCEL ]",
+                                      font=self.fonts['small'],
+                                      fg=self.colors['bg'],
+                                      bg=self.colors['warning'],
+                                      relief='raised',
+                                      bd=1,
+                                      command=self.cancel_job,
+                                      cursor='hand2',
+                                      state='disabled')
+        self.cancel_button.pack(side='right', padx=10)
+        
+        # İlerleme çubuğu
+        style = ttk.Style(self.root)
+        style.configure('Retro.Horizontal.TProgressbar',
+                        troughcolor=self.colors['bg'],
+                        background=self.colors['neon_pink'])
+        self.progress_bar = ttk.Progressbar(status_frame, 
+                                           style='Retro.Horizontal.TProgressbar',
+                                           orient='horizontal',
+                                           mode='determinate',
+                                           maximum=100,
+                                           length=160)
+        self.progress_bar.pack(side='right', padx=(10, 0))
         
     def setup_drag_drop(self):
         """Drag & drop ayarları"""
@@ -304,58 +3765,193 @@ class RetroMP3CoverTool:
         self.animation_running = True
         self.animate_separator()
         
-    def animate_separator(self):
-        """Separator animasyonu"""
+    def animate_separator(self, index=0):
+        """Separator animasyonu (Tk main loop içinde, root.after ile)"""
         if not self.animation_running:
             return
             
         colors = [self.colors['neon_green'], self.colors['neon_blue'], 
                  self.colors['neon_purple'], self.colors['neon_pink']]
         
-        def cycle_colors():
-            for color in colors:
-                if not self.animation_running:
-                    break
-                self.separator_frame.configure(bg=color)
-                time.sleep(0.5)
+        self.separator_frame.configure(bg=colors[index % len(colors)])
+        self.root.after(500, self.animate_separator, index + 1)
+        
+    def run_in_background(self, func, on_done, on_error):
+        """func'ı worker thread'de çalıştır, sonucu ana thread'e root.after ile getir"""
+        future = self.executor.submit(func)
+        
+        def poll():
+            if not future.done():
+                self.root.after(50, poll)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                on_error(e)
+            else:
+                on_done(result)
                 
-        def run_animation():
-            while self.animation_running:
-                cycle_colors()
+        self.root.after(50, poll)
+        return future
+        
+    def set_busy(self, busy):
+        """İşlem sırasında butonları kilitle"""
+        self.job_running = busy
+        self.cancel_button.config(state='normal' if busy else 'disabled')
+        self.mp3_button.config(state='disabled' if busy else 'normal')
+        self.mp3_folder_button.config(state='disabled' if busy else 'normal')
+        self.clear_button.config(state='disabled' if busy else 'normal')
+        self.image_button.config(state='disabled' if busy else 'normal')
+        self.auto_cover_check.config(state='disabled' if busy else 'normal')
+        if busy:
+            self.process_button.config(state='disabled')
+        else:
+            self.check_ready()
+            
+    def add_to_queue(self, mp3_paths):
+        """MP3 yollarını kuyruğa ekle (aynı dosya iki kez eklenmez)"""
+        added = 0
+        for path in mp3_paths:
+            if path in self.queued_paths:
+                continue
+            self.queued_paths.add(path)
+            self.job_queue.append({'mp3': path, 'state': 'queued', 'error': None})
+            added += 1
+            self.mp3_file = path
+            
+        if not added:
+            self.update_status("NO NEW MP3 FILES FOUND")
+            return
+        
+        self.show_embedded_cover(self.mp3_file)
+        self.mp3_info_label.config(text=f"STATUS: {len(self.job_queue)} FILE(S) QUEUED", 
+                                 fg=self.colors['success'])
+        self.update_status(f"QUEUED: {added} MP3 FILE(S)")
+        self.schedule_queue_refresh()
+        self.check_ready()
+        
+    def queue_paths_in_background(self, paths):
+        """Dosya/klasör listesini arka planda aç, sonra kuyruğa ekle"""
+        self.update_status("SCANNING >>> COLLECTING MP3 FILES...")
+        self.run_in_background(lambda: list(expand_mp3_paths(paths, AUDIO_EXTENSIONS)),
+                               self.add_to_queue,
+                               lambda e: self.show_error(f"SCAN FAILED: {str(e)}"))
+        
+    def clear_queue(self):
+        """Kuyruğu temizle"""
+        if self.job_running:
+            return
+        self.job_queue = []
+        self.queued_paths = set()
+        self.queue_page = 0
+        self.mp3_file = None
+        self.mp3_info_label.config(text="STATUS: NO FILES QUEUED", fg=self.colors['text_dim'])
+        self.schedule_queue_refresh()
+        self.check_ready()
+        
+    def on_queue_select(self, event):
+        """Kuyrukta seçilen MP3'ün gömülü cover'ını göster"""
+        selection = self.queue_view.selection()
+        if not selection:
+            return
+        index = int(self.queue_view.item(selection[0], 'values')[0]) - 1
+        if 0 <= index < len(self.job_queue):
+            self.mp3_file = self.job_queue[index]['mp3']
+            self.show_embedded_cover(self.mp3_file)
+            
+    def show_embedded_cover(self, mp3_path):
+        """MP3'teki mevcut cover'ı göster (sadece tag okunur, arka planda)"""
+        self.embedded_token += 1
+        token = self.embedded_token
+        
+        def load():
+            front = pick_front_cover(read_embedded_covers(mp3_path))
+            if front is None:
+                return None
+            image, info = decode_thumbnail(io.BytesIO(front.data), 150)
+            width, height = info['original_size']
+            return image, f"{front.mime.upper()} {width}x{height} {len(front.data) // 1024} KB"
+        
+        def done(embedded):
+            if token != self.embedded_token:
+                return
+            filename = os.path.basename(mp3_path)[:30]
+            if embedded is None:
+                self.embedded_image = None
+                self.embedded_label.configure(image='', text=f"{filename}\n>>> NO COVER ART <<<")
+                return
+            image, text = embedded
+            self.embedded_image = ImageTk.PhotoImage(image)
+            self.embedded_label.configure(image=self.embedded_image, text=f"{filename}\n{text}")
+            
+        def failed(e):
+            if token == self.embedded_token:
+                self.embedded_image = None
+                self.embedded_label.configure(image='', text=f"TAG READ ERROR: {str(e)[:40]}")
                 
-        thread = threading.Thread(target=run_animation, daemon=True)
-        thread.start()
+        self.run_in_background(load, done, failed)
+        
+    def change_queue_page(self, delta):
+        """Kuyruk sayfası değiştir"""
+        pages = max(1, -(-len(self.job_queue) // QUEUE_PAGE_SIZE))
+        self.queue_page = min(max(0, self.queue_page + delta), pages - 1)
+        self.refresh_queue_view()
+        
+    def schedule_queue_refresh(self):
+        """Kuyruk görünümünü en fazla 200ms'de bir yenile"""
+        if not self.queue_refresh_pending:
+            self.queue_refresh_pending = True
+            self.root.after(200, self.refresh_queue_view)
+            
+    def refresh_queue_view(self):
+        """Sadece görünen sayfanın satırlarını çiz"""
+        self.queue_refresh_pending = False
+        total = len(self.job_queue)
+        pages = max(1, -(-total // QUEUE_PAGE_SIZE))
+        self.queue_page = min(self.queue_page, pages - 1)
+        first = self.queue_page * QUEUE_PAGE_SIZE
+        
+        self.queue_view.delete(*self.queue_view.get_children())
+        for index, item in enumerate(self.job_queue[first:first + QUEUE_PAGE_SIZE], first):
+            self.queue_view.insert('', 'end', 
+                                  values=(index + 1, item['state'].upper(), item['error'] or item['mp3']),
+                                  tags=(item['state'],))
+            
+        counts = {}
+        for item in self.job_queue:
+            counts[item['state']] = counts.get(item['state'], 0) + 1
+        details = ", ".join(f"{count} {state.upper()}" for state, count in sorted(counts.items()))
+        self.queue_info_label.config(text=f"{total} ITEMS" + (f" >>> {details}" if details else ""))
+        self.queue_page_label.config(text=f"PAGE {self.queue_page + 1}/{pages}")
+        
+    def cancel_job(self):
+        """Çalışan işi iptal et"""
+        self.cancel_event.set()
+        self.update_status("CANCELLING...")
         
     def on_mp3_drag_enter(self, event):
         """MP3 drag enter"""
         self.mp3_drop_area.configure(bg=self.colors['neon_blue'])
         self.mp3_drop_label.configure(bg=self.colors['neon_blue'], 
                                      fg=self.colors['bg'],
-                                     text=">>> DROP MP3 FILE NOW <<<")
+                                     text=">>> DROP MP3 FILES NOW <<<")
         
     def on_mp3_drag_leave(self, event):
         """MP3 drag leave"""
         self.mp3_drop_area.configure(bg=self.colors['accent'])
         self.mp3_drop_label.configure(bg=self.colors['accent'], 
                                      fg=self.colors['text_dim'],
-                                     text="DRAG & DROP MP3 FILE HERE\n>>> OR CLICK BUTTON BELOW <<<")
+                                     text="DRAG & DROP MP3 FILES / FOLDERS HERE\n>>> OR CLICK BUTTON BELOW <<<")
         
     def on_mp3_drop(self, event):
-        """MP3 drop"""
+        """MP3 drop (birden fazla dosya ve klasör)"""
         self.on_mp3_drag_leave(event)
         
+        if self.job_running:
+            return
         files = self.root.tk.splitlist(event.data)
         if files:
-            file_path = files[0]
-            if file_path.lower().endswith('.mp3'):
-                self.mp3_file = file_path
-                filename = os.path.basename(file_path)
-                self.mp3_info_label.config(text=f"STATUS: {filename[:30]}...", 
-                                         fg=self.colors['success'])
-                self.update_status(f"MP3 LOADED: {filename}")
-                self.check_ready()
-            else:
-                self.show_error("ERROR: NOT AN MP3 FILE!")
+            self.queue_paths_in_background(files)
                 
     def on_image_drag_enter(self, event):
         """Image drag enter"""
@@ -378,8 +3974,7 @@ class RetroMP3CoverTool:
         files = self.root.tk.splitlist(event.data)
         if files:
             file_path = files[0]
-            valid_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
-            if file_path.lower().endswith(valid_extensions):
+            if file_path.lower().endswith(IMAGE_EXTENSIONS):
                 self.image_file = file_path
                 filename = os.path.basename(file_path)
                 self.image_info_label.config(text=f"STATUS: {filename[:30]}...", 
@@ -391,19 +3986,22 @@ class RetroMP3CoverTool:
                 self.show_error("ERROR: UNSUPPORTED IMAGE FORMAT!")
                 
     def select_mp3(self):
-        """MP3 seçimi"""
-        file_path = filedialog.askopenfilename(
-            title="SELECT MP3 FILE",
-            filetypes=[("MP3 files", "*.mp3"), ("All files", "*.*")]
+        """MP3 seçimi (çoklu)"""
+        file_paths = filedialog.askopenfilenames(
+            title="SELECT MP3 FILES",
+            filetypes=[("Audio files", " ".join('*' + ext for ext in AUDIO_EXTENSIONS)),
+                       ("MP3 files", "*.mp3"), ("All files", "*.*")]
         )
         
-        if file_path:
-            self.mp3_file = file_path
-            filename = os.path.basename(file_path)
-            self.mp3_info_label.config(text=f"STATUS: {filename[:30]}...", 
-                                     fg=self.colors['success'])
-            self.update_status(f"MP3 SELECTED: {filename}")
-            self.check_ready()
+        if file_paths:
+            self.queue_paths_in_background(file_paths)
+            
+    def select_mp3_folder(self):
+        """Klasördeki tüm MP3'leri kuyruğa ekle"""
+        folder = filedialog.askdirectory(title="SELECT MP3 FOLDER")
+        
+        if folder:
+            self.queue_paths_in_background([folder])
             
     def select_image(self):
         """Resim seçimi"""
@@ -427,89 +4025,195 @@ class RetroMP3CoverTool:
             self.check_ready()
             
     def show_preview(self):
-        """Önizleme göster"""
-        try:
-            # Resmi yükle
-            image = Image.open(self.image_file)
-            
-            # Retro efekt uygula
-            image = image.convert('RGB')
-            
-            # Boyutlandır
-            image.thumbnail((300, 300), Image.Resampling.LANCZOS)
-            
-            # Retro border ekle
-            border_size = 10
-            border_color = (255, 0, 110)  # Neon pink
-            bordered_image = Image.new('RGB', 
-                                     (image.width + border_size*2, 
-                                      image.height + border_size*2), 
-                                     border_color)
-            bordered_image.paste(image, (border_size, border_size))
-            
+        """Önizleme göster (decode arka planda)"""
+        self.preview_token += 1
+        token = self.preview_token
+        image_file = self.image_file
+        self.preview_label.configure(image='', text="LOADING PREVIEW...")
+        
+        def done(preview):
+            # Bu arada başka bir resim seçildiyse eski sonucu at
+            if token != self.preview_token:
+                return
+            image, info = preview
             # Tkinter için hazırla
-            self.preview_image = ImageTk.PhotoImage(bordered_image)
+            self.preview_image = ImageTk.PhotoImage(image)
             self.preview_label.configure(image=self.preview_image, text="")
+            self.update_status(f"PREVIEW: {info['decode_ms']:.1f} MS, "
+                               f"~{info['buffer_bytes'] / (1024 * 1024):.1f} MB DECODE BUFFER "
+                               f"({info['source'].upper()})")
             
-        except Exception as e:
-            self.show_error(f"PREVIEW ERROR: {str(e)}")
+        def failed(e):
+            if token == self.preview_token:
+                self.preview_label.configure(text="PREVIEW FAILED")
+                self.show_error(f"PREVIEW ERROR: {str(e)}")
+                
+        self.run_in_background(lambda: render_preview(image_file, cache=self.thumbnail_cache),
+                               done, failed)
             
     def check_ready(self):
         """Hazır durumu kontrol et"""
-        if self.mp3_file and self.image_file:
+        if self.job_queue and (self.image_file or self.auto_cover_var.get()):
             self.process_button.config(state='normal')
             self.update_status("READY TO INJECT >>> PRESS THE BUTTON!")
         else:
             self.process_button.config(state='disabled')
             
     def add_cover_art(self):
-        """Cover art ekle"""
-        try:
-            self.update_status("PROCESSING >>> INJECTING COVER ART...")
-            self.root.update()
-            
-            # MP3 yükle
-            audio = MP3(self.mp3_file)
-            
-            if audio.tags is None:
-                audio.add_tags()
-            
-            # Resmi oku
-            with open(self.image_file, 'rb') as img_file:
-                img_data = img_file.read()
-            
-            # MIME type
-            img_extension = os.path.splitext(self.image_file)[1].lower()
-            mime_type = {
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.png': 'image/png',
-                '.gif': 'image/gif',
-                '.bmp': 'image/bmp'
-            }.get(img_extension, 'image/jpeg')
-            
-            # Mevcut cover art'ları temizle
-            audio.tags.delall('APIC')
-            
-            # Yeni cover art ekle
-            audio.tags.add(
-                APIC(
-                    encoding=3,
-                    mime=mime_type,
-                    type=3,
-                    desc=u'Cover',
-                    data=img_data
-                )
-            )
+        """Kuyruktaki MP3'lere cover art ekle (arka planda, sınırlı worker pool)"""
+        if self.job_running:
+            return
+        
+        pending = [i for i, item in enumerate(self.job_queue)
+                   if item['state'] in ('queued', 'failed', 'cancelled')]
+        if not pending:
+            self.update_status("NOTHING TO DO >>> ALL QUEUED FILES ARE DONE")
+            return
+        
+        for i in pending:
+            self.job_queue[i]['state'] = 'queued'
+            self.job_queue[i]['error'] = None
             
-            # Kaydet
-            audio.save()
+        self.cancel_event.clear()
+        self.progress_bar['value'] = 0
+        self.set_busy(True)
+        self.run_state = {
+            'cover': None,
+            'pending': deque(pending),
+            'running': {},
+            'total': len(pending),
+            'finished': 0,
+            'counts': {'done': 0, 'skipped': 0, 'failed': 0, 'cancelled': 0},
+            'stages': StageStats()
+        }
+        if self.auto_cover_var.get():
+            # Her klasörün cover'ı worker'larda çözülür (klasör başına bir kez)
+            self.cover_resolver = CoverResolver()
+            self.start_jobs(None)
+            return
+        
+        self.update_status("PROCESSING >>> LOADING COVER...")
+        
+        # Cover bir kez okunur, tüm kuyruk aynı CoverEntry'yi kullanır
+        image_file = self.image_file
+        self.run_in_background(lambda: self.cover_cache.get(image_file),
+                               self.start_jobs, self.on_inject_error)
+        
+    def start_jobs(self, cover):
+        """Cover hazır, worker'lara dağıtmaya başla"""
+        self.run_state['cover'] = cover
+        self.dispatch_jobs()
+        self.root.after(50, self.poll_jobs)
+        
+    def dispatch_jobs(self):
+        """Kuyruktan worker pool'a iş ver (en fazla 2x worker iş havada)"""
+        run = self.run_state
+        while run['pending'] and len(run['running']) < GUI_JOB_WORKERS * 2:
+            index = run['pending'].popleft()
+            item = self.job_queue[index]
+            item['state'] = 'running'
+            run['running'][index] = 0.0
+            self.job_executor.submit(self.run_job, index, item['mp3'], run['cover'])
+        self.schedule_queue_refresh()
             
-            self.update_status("SUCCESS >>> COVER ART INJECTED!")
-            self.show_success("MISSION ACCOMPLISHED!\nCover art successfully injected into MP3!")
+    def run_job(self, index, mp3_path, cover):
+        """Tek dosya işi (worker thread, Tk'ye dokunmaz)"""
+        def progress(stage):
+            # 'done' geldiğinde dosya zaten yazılmıştır, iptal edilemez
+            if stage != 'done' and self.cancel_event.is_set():
+                raise InjectionCancelled()
+            self.progress_queue.put((index, stage))
             
+        try:
+            if cover is None:
+                cover = _load_cover(self.cover_cache, self.cover_resolver.resolve(mp3_path))[0]
+            result = write_cover(mp3_path, cover, progress=progress)
+        except InjectionCancelled:
+            self.result_queue.put((index, 'cancelled', None, None))
         except Exception as e:
-            self.show_error(f"INJECTION FAILED: {str(e)}")
+            self.result_queue.put((index, 'failed', f"{type(e).__name__}: {e}", None))
+        else:
+            state = 'skipped' if result['write_mode'] == 'skipped' else 'done'
+            self.result_queue.put((index, state, None, result))
+            
+    def poll_jobs(self):
+        """Worker sonuçlarını topla, ilerlemeyi göster, yeni iş ver (ana thread)"""
+        run = self.run_state
+        
+        while True:
+            try:
+                index, stage = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if index in run['running']:
+                run['running'][index] = WRITE_STAGES.get(stage, 0) / 100
+                
+        while True:
+            try:
+                index, state, error, result = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if result is not None:
+                run['stages'].add_result(result)
+            run['running'].pop(index, None)
+            self.job_queue[index]['state'] = state
+            self.job_queue[index]['error'] = error
+            run['counts'][state] += 1
+            run['finished'] += 1
+            
+        if self.cancel_event.is_set():
+            # Henüz başlamamış işler hiç çalışmaz
+            while run['pending']:
+                index = run['pending'].popleft()
+                self.job_queue[index]['state'] = 'cancelled'
+                run['counts']['cancelled'] += 1
+                run['finished'] += 1
+        else:
+            self.dispatch_jobs()
+            
+        self.schedule_queue_refresh()
+        done_fraction = run['finished'] + sum(run['running'].values())
+        self.progress_bar['value'] = 100 * done_fraction / run['total']
+        
+        if run['pending'] or run['running']:
+            self.update_status(f"PROCESSING >>> {run['finished']}/{run['total']} FILES")
+            self.root.after(50, self.poll_jobs)
+        else:
+            self.on_jobs_finished()
+            
+    def on_jobs_finished(self):
+        """Kuyruk bitti (ana thread)"""
+        run = self.run_state
+        counts = run['counts']
+        self.set_busy(False)
+        self.schedule_queue_refresh()
+        
+        summary = (f"{counts['done']} INJECTED, {counts['skipped']} SKIPPED, "
+                   f"{counts['failed']} FAILED, {counts['cancelled']} CANCELLED")
+        timings = run['stages'].status_line()
+        histograms = run['stages'].format_histograms()
+        if counts['cancelled']:
+            self.update_status(f"CANCELLED >>> {summary}")
+        elif counts['failed']:
+            self.update_status(f"FINISHED WITH ERRORS >>> {summary}")
+            self.show_error(f"{counts['failed']} FILE(S) FAILED - SEE JOB QUEUE"
+                            + (f"\n\n{histograms}" if histograms else ""))
+        else:
+            self.update_status(f"SUCCESS >>> {summary}")
+            self.show_success(f"MISSION ACCOMPLISHED!\n{summary}"
+                              + (f"\n\n{histograms}" if histograms else ""))
+        if timings:
+            # Mesaj kutusundan sonra status bar'da aşama süreleri kalsın
+            self.update_status(timings)
+        
+    def on_inject_error(self, e):
+        """Cover yüklenemedi (ana thread)"""
+        self.set_busy(False)
+        self.progress_bar['value'] = 0
+        for index in self.run_state['pending']:
+            self.job_queue[index]['state'] = 'queued'
+        self.schedule_queue_refresh()
+        self.show_error(f"INJECTION FAILED: {str(e)}")
             
     def update_status(self, message):
         """Durum güncelle"""
@@ -524,18 +4228,476 @@ class RetroMP3CoverTool:
         """Başarı mesajı"""
         messagebox.showinfo("SUCCESS", message)
         
+    def on_close(self):
+        """Pencere kapatılıyor"""
+        self.animation_running = False
+        self.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.job_executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+        
     def __del__(self):
         """Destructor"""
         self.animation_running = False
 
+def add_source_arguments(parser):
+    """inject ve plan'ın ortak job kaynağı seçenekleri"""
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--manifest', help="CSV file with 'mp3,image' rows")
+    source.add_argument('--dir', help='directory tree to scan for audio files')
+    parser.add_argument('--image', help='cover image used for every audio file in --dir')
+    parser.add_argument('--auto-cover', action='store_true',
+                        help='pick each file\'s cover from image files in its own directory')
+    parser.add_argument('--cover-names', default=','.join(CoverResolver.DEFAULT_RULES),
+                        help='comma separated file name patterns tried in order by --auto-cover '
+                             '(default: %(default)s)')
+    parser.add_argument('--no-largest', action='store_true',
+                        help='with --auto-cover, do not fall back to the largest image')
+    parser.add_argument('--picture', action='append', default=[], metavar='ROLE=FILE',
+                        help='also embed FILE as ROLE (' + ', '.join(PICTURE_ROLES) + ') in the '
+                             'same save; pictures of other types are kept and identical images '
+                             'are stored once (repeatable)')
+
+
+def jobs_from_args(parser, args, analyzer=None):
+    """add_source_arguments seçenekleri -> (mp3, image) job listesi"""
+    try:
+        pictures = [parse_picture_arg(text) for text in args.picture]
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.dir:
+        jobs = jobs_from_manifest(args.manifest)
+    elif args.auto_cover:
+        jobs = jobs_from_directory(args.dir, resolver=resolver_from_args(args, analyzer))
+    elif args.image:
+        jobs = jobs_from_directory(args.dir, args.image)
+    elif pictures:
+        jobs = [(path, None) for path in iter_mp3_files(args.dir, AUDIO_EXTENSIONS)]
+    else:
+        parser.error('--dir requires --image, --auto-cover or --picture')
+    if pictures:
+        jobs = [(mp3_path, picture_spec(image_path, pictures)) for mp3_path, image_path in jobs]
+    return jobs
+
+
+def add_write_arguments(parser):
+    """inject ve watch'un ortak cover / yazma seçenekleri"""
+    parser.add_argument('--cache-mb', type=int, default=256,
+                        help='byte budget of the cover cache in MB (default: 256)')
+    parser.add_argument('--normalize', action='store_true',
+                        help='resize and re-encode covers before embedding')
+    parser.add_argument('--max-size', type=int, default=DEFAULT_NORMALIZE['max_size'],
+                        help='longest cover edge in pixels (default: %(default)s)')
+    parser.add_argument('--format', choices=('jpeg', 'png', 'keep'),
+                        default=DEFAULT_NORMALIZE['format'],
+                        help='output format of normalized covers (default: %(default)s)')
+    parser.add_argument('--quality', type=int, default=DEFAULT_NORMALIZE['quality'],
+                        help='JPEG quality (default: %(default)s)')
+    parser.add_argument('--baseline', action='store_true',
+                        help='write baseline instead of progressive JPEG')
+    parser.add_argument('--max-cover-kb', type=int, default=None,
+                        help='target upper bound for a normalized cover in KB')
+    parser.add_argument('--analyze', action='store_true',
+                        help='score candidate images with NumPy (borders, sharpness, duplicates), '
+                             'pick the real front cover and square-crop it')
+    parser.add_argument('--padding-kb', type=int, default=DEFAULT_PADDING_RESERVE // 1024,
+                        help='padding reserved when a tag has to be rewritten (default: %(default)s)')
+    parser.add_argument('--state', help='state file used to skip unchanged files on re-runs')
+    parser.add_argument('--force', action='store_true',
+                        help='write even if the same cover is already embedded')
+    parser.add_argument('--atomic', action='store_true',
+                        help='write each file to a temp file and rename it over the original')
+    parser.add_argument('--fsync-batch', type=int, default=DEFAULT_FSYNC_BATCH,
+                        help='with --atomic, fsync and rename this many files at once '
+                             '(default: %(default)s)')
+    parser.add_argument('--journal', metavar='FILE',
+                        help='with --atomic, journal base name; each run writes its own locked '
+                             'journal next to it and recovers the ones of dead runs at start-up '
+                             '(default: ~/.cache/mp3_cover_tool/journal/inject.jsonl)')
+    parser.add_argument('--memory-budget-mb', type=int, default=None, metavar='MB',
+                        help='low-memory mode: per-worker byte budget; oversized jobs fail, '
+                             'rewrites are streamed and -j defaults to what fits in free RAM '
+                             f'(suggested: {DEFAULT_MEMORY_BUDGET // (1024 * 1024)})')
+    parser.add_argument('--max-megapixels', type=float, default=None,
+                        help='refuse covers above this many pixels after JPEG downscaling '
+                             f'(default: {DEFAULT_MAX_PIXELS // 1000000} in low-memory mode)')
+
+
+def build_arg_parser():
+    """CLI argümanları"""
+    parser = argparse.ArgumentParser(
+        prog='mp3_cover_tool',
+        description='Retro MP3 Cover Tool - headless batch mode')
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    inject = sub.add_parser('inject', help='inject cover art into many audio files (MP3, FLAC, M4A, Ogg/Opus)')
+    add_source_arguments(inject)
+    inject.add_argument('-j', '--workers', type=int, default=None,
+                        help='worker processes (default: CPU count, or what fits in free RAM '
+                             'with --memory-budget-mb)')
+    inject.add_argument('--async-io', action='store_true',
+                        help='keep many files in flight with asyncio + threads instead of a '
+                             'process pool (for NFS/SMB and other high-latency mounts)')
+    inject.add_argument('--concurrency', type=int, default=DEFAULT_ASYNC_CONCURRENCY,
+                        help='with --async-io, files in flight (default: %(default)s)')
+    inject.add_argument('--per-mount', type=int, default=DEFAULT_MOUNT_CONCURRENCY,
+                        help='with --async-io, files in flight per mount (default: %(default)s)')
+    inject.add_argument('--read-ahead', type=int, default=DEFAULT_READ_AHEAD,
+                        help='with --async-io, cover images read ahead (default: %(default)s)')
+    add_write_arguments(inject)
+    inject.add_argument('--events', metavar='FILE',
+                        help='append per-file stage timings as JSON lines to FILE')
+    inject.add_argument('--profile', choices=('cprofile', 'tracemalloc'),
+                        help='profile the run (forces -j 1); summary goes to stderr')
+    inject.add_argument('--profile-out', metavar='FILE',
+                        help='write raw pstats / tracemalloc snapshot to FILE')
+    inject.add_argument('--json', action='store_true',
+                        help='print the final report as JSON')
+    inject.add_argument('-q', '--quiet', action='store_true',
+                        help='do not print per-file progress')
+    
+    plan = sub.add_parser('plan', help='dry run: show what inject would write, and how long it '
+                                       'would take, without touching any file')
+    add_source_arguments(plan)
+    plan.add_argument('-j', '--workers', type=int, default=None,
+                      help='worker processes for the plan and the time estimate (default: CPU count)')
+    add_write_arguments(plan)
+    plan.add_argument('--calibrate', metavar='EVENTS',
+                      help='derive the cost model from an earlier inject --events log')
+    plan.add_argument('--csv', action='store_true',
+                      help='write per-file rows as CSV instead of JSON (totals go to stderr)')
+    plan.add_argument('-o', '--output', metavar='FILE', help='write the plan to FILE (default: stdout)')
+    
+    watch = sub.add_parser('watch', help='watch directories and inject covers into arriving audio files')
+    watch.add_argument('paths', nargs='+', help='directories to watch (recursively)')
+    watch.add_argument('--image', help='cover image for every file (default: folder art, '
+                                       'see --cover-names)')
+    watch.add_argument('--cover-names', default=','.join(CoverResolver.DEFAULT_RULES),
+                       help='comma separated file name patterns tried in order (default: %(default)s)')
+    watch.add_argument('--no-largest', action='store_true',
+                       help='do not fall back to the largest image in the directory')
+    watch.add_argument('--settle', type=float, default=DEFAULT_SETTLE, metavar='SECONDS',
+                       help='quiet time before a directory is processed (default: %(default)s)')
+    watch.add_argument('--poll', type=float, default=None, metavar='SECONDS',
+                       help='poll at this interval instead of using inotify '
+                            '(automatic when inotify is unavailable)')
+    watch.add_argument('--scan-existing', action='store_true',
+                       help='also process audio files that are already there at start-up')
+    watch.add_argument('-j', '--workers', type=int, default=None,
+                       help='worker processes (default: CPU count, or what fits in free RAM '
+                            'with --memory-budget-mb)')
+    add_write_arguments(watch)
+    watch.add_argument('--events', metavar='FILE',
+                       help='append per-file results with arrival latency as JSON lines to FILE')
+    watch.add_argument('-q', '--quiet', action='store_true',
+                       help='do not print per-file progress')
+    
+    recover = sub.add_parser('recover', help='finish or roll back an interrupted --atomic run')
+    recover.add_argument('--journal', default=None,
+                         help='journal base name; every run journal next to it that no live '
+                              'process holds is recovered '
+                              '(default: ~/.cache/mp3_cover_tool/journal/inject.jsonl)')
+    recover.add_argument('--rollback', action='store_true',
+                         help='discard all unfinished temp files instead of completing them')
+    
+    audit = sub.add_parser('audit', help='list MP3 files that lack cover art or carry oversized art')
+    audit.add_argument('paths', nargs='+', help='MP3 files or directories')
+    audit.add_argument('--max-kb', type=int, default=None,
+                       help='front covers larger than this are reported as oversized')
+    audit.add_argument('--max-px', type=int, default=None,
+                       help='front covers with a longer edge than this are reported as oversized')
+    audit.add_argument('-j', '--workers', type=int, default=None,
+                       help='worker processes (default: CPU count)')
+    audit.add_argument('--all', action='store_true', help='also list files that are OK')
+    audit.add_argument('--json', action='store_true', help='print results as JSON')
+    
+    index = sub.add_parser('index', help='build and query a library-wide cover index')
+    index.add_argument('--db', default=None,
+                       help='SQLite index file (default: ~/.cache/mp3_cover_tool/index/covers.sqlite)')
+    index.add_argument('--scan', nargs='+', default=[], metavar='DIR',
+                       help='walk these directories and update changed files')
+    index.add_argument('--missing', action='store_true', help='tracks without cover art')
+    index.add_argument('--smaller-than', type=int, metavar='PX',
+                       help='covers whose longest edge is below PX')
+    index.add_argument('--larger-than', type=int, metavar='KB',
+                       help='covers larger than KB')
+    index.add_argument('--mismatch', action='store_true',
+                       help='tracks whose cover differs from the rest of the album')
+    index.add_argument('--dedup', action='store_true',
+                       help='report bytes spent on duplicate embedded covers')
+    index.add_argument('-j', '--workers', type=int, default=None,
+                       help='worker processes for scanning (default: CPU count)')
+    index.add_argument('--json', action='store_true', help='print results as JSON')
+    return parser
+
+
+def cover_rules_from_args(args):
+    return [name.strip() for name in args.cover_names.split(',') if name.strip()]
+
+
+def resolver_from_args(args, analyzer=None):
+    """--cover-names / --no-largest -> CoverResolver"""
+    return CoverResolver(rules=cover_rules_from_args(args),
+                         fallback_largest=not args.no_largest, analyzer=analyzer)
+
+
+def write_settings(args):
+    """add_write_arguments seçenekleri -> run_batch keyword argümanları"""
+    normalize = None
+    if args.normalize:
+        normalize = {
+            'max_size': args.max_size,
+            'format': args.format,
+            'quality': args.quality,
+            'progressive': not args.baseline,
+            'max_bytes': args.max_cover_kb * 1024 if args.max_cover_kb else None
+        }
+    memory_budget = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+    max_pixels = int(args.max_megapixels * 1000000) if args.max_megapixels else None
+    if memory_budget and max_pixels is None:
+        max_pixels = DEFAULT_MAX_PIXELS
+    atomic = None
+    if args.atomic:
+        atomic = {'fsync_batch': args.fsync_batch,
+                  'journal': os.path.abspath(args.journal or default_journal_path())}
+    analyzer = None
+    if args.analyze:
+        try:
+            analyzer = CoverAnalyzer(rules=cover_rules_from_args(args),
+                                     cache_path=os.path.join(default_cache_dir('analysis'),
+                                                             'scores.json'))
+        except ImportError as e:
+            raise SystemExit(f"mp3_cover_tool: error: --analyze: {e}") from None
+    return {
+        'cache': CoverCache(max_bytes=args.cache_mb * 1024 * 1024, normalize=normalize,
+                            max_pixels=max_pixels, max_image_bytes=memory_budget,
+                            analyzer=analyzer),
+        'state': InjectionState(args.state) if args.state else None,
+        'padding_reserve': args.padding_kb * 1024,
+        'force': args.force,
+        'atomic': atomic,
+        'memory_budget': memory_budget
+    }
+
+
+def cli_main(argv=None):
+    """Headless CLI giriş noktası"""
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    
+    if args.command == 'inject':
+        settings = write_settings(args)
+        analyzer = settings['cache'].analyzer
+        jobs = jobs_from_args(parser, args, analyzer)
+            
+        def on_result(result):
+            if not result['ok']:
+                print(f"FAILED: {result['mp3']} >>> {result['error']}", file=sys.stderr)
+            elif not (args.quiet or args.json):
+                if result['write_mode'] in ('skipped', 'unchanged'):
+                    print(f"SKIP: {result['mp3']}")
+                else:
+                    saved = result['cover_saved']
+                    print(f"OK: {result['mp3']}" + (f" (cover -{saved} bytes)" if saved > 0 else ""))
+                
+        events = JsonLinesLog(args.events) if args.events else None
+        workers = 1 if args.profile else args.workers
+        try:
+            with profiling(args.profile, args.profile_out):
+                if args.async_io:
+                    report = run_batch_async(jobs, concurrency=max(1, args.concurrency),
+                                             per_mount=max(1, args.per_mount),
+                                             read_ahead=args.read_ahead, on_result=on_result,
+                                             on_event=events, **settings)
+                else:
+                    report = run_batch(jobs, workers=workers, on_result=on_result,
+                                       on_event=events, **settings)
+        finally:
+            if events:
+                events.close()
+            if analyzer is not None:
+                analyzer.save()
+        
+        if args.json:
+            print(json.dumps(report.summary(), indent=2))
+        else:
+            print(f">>> {report.ok} OK, {report.failed} FAILED in {report.elapsed:.2f}s "
+                  f"({report.files_per_sec:.1f} files/s, {report.mb_per_sec:.1f} MB/s) <<<")
+            if report.recovered and any(report.recovered.values()):
+                print(f">>> JOURNAL: {report.recovered['resumed']} RESUMED, "
+                      f"{report.recovered['rolled_back']} ROLLED BACK <<<")
+            print(f">>> PATCHED IN PLACE: {report.in_place}, FULLY REWRITTEN: {report.rewritten}, "
+                  f"SKIPPED: {report.skipped + report.unchanged} <<<")
+            if report.cover_saved:
+                print(f">>> COVER BYTES SAVED: {report.cover_saved} <<<")
+            if report.picture_bytes_before != report.picture_bytes_after or report.pictures_deduped:
+                print(f">>> EMBEDDED PICTURES: {report.picture_bytes_before / (1024 * 1024):.2f} MB -> "
+                      f"{report.picture_bytes_after / (1024 * 1024):.2f} MB, "
+                      f"{report.pictures_deduped} DUPLICATE(S) DROPPED <<<")
+            if report.peak_rss:
+                print(f">>> WORKERS: {report.workers}, PEAK RSS PER JOB: "
+                      f"{report.peak_rss / (1024 * 1024):.1f} MB <<<")
+            if report.mounts is not None:
+                print(f">>> ASYNC: UP TO {report.workers} FILES IN FLIGHT, {report.mounts} MOUNT(S) <<<")
+            if report.stages.samples:
+                print(report.stages.format_table())
+        return 1 if report.failed else 0
+    
+    if args.command == 'plan':
+        settings = write_settings(args)
+        analyzer = settings['cache'].analyzer
+        jobs = jobs_from_args(parser, args, analyzer)
+        model = cost_model_from_events(args.calibrate) if args.calibrate else DEFAULT_COST_MODEL
+        plans, totals = run_plan(jobs, workers=args.workers, model=model, **settings)
+        if analyzer is not None:
+            analyzer.save()
+        out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+        try:
+            if args.csv:
+                writer = csv.DictWriter(out, fieldnames=PLAN_FIELDS)
+                writer.writeheader()
+                writer.writerows(plans)
+            else:
+                json.dump({'totals': totals, 'files': plans}, out, indent=2)
+                out.write("\n")
+        finally:
+            if args.output:
+                out.close()
+        if args.csv or args.output:
+            print(f">>> {totals['files']} FILES: {totals['in_place']} IN PLACE, "
+                  f"{totals['rewrite'] + totals['stream'] + totals['atomic']} FULL REWRITES, "
+                  f"{totals['skipped'] + totals['unchanged']} SKIPPED, {totals['error']} ERRORS <<<",
+                  file=sys.stderr)
+            print(f">>> {totals['bytes_written'] / (1024 * 1024):.1f} MB TO WRITE, "
+                  f"~{totals['est_wall_seconds']:.1f}s WITH {totals['workers']} WORKER(S) <<<",
+                  file=sys.stderr)
+        return 1 if totals['error'] else 0
+    
+    if args.command == 'watch':
+        import signal
+        
+        def on_result(result):
+            if not result['ok']:
+                print(f"FAILED: {result['mp3']} >>> {result['error']}", file=sys.stderr)
+            elif not args.quiet:
+                latency = f" ({result['latency']:.2f}s)" if result['latency'] is not None else ""
+                mode = "SKIP" if result['write_mode'] in ('skipped', 'unchanged') else "OK"
+                print(f"{mode}: {result['mp3']}{latency}", flush=True)
+                
+        watcher = open_watcher(args.paths, AUDIO_EXTENSIONS + IMAGE_EXTENSIONS, args.poll)
+        events = JsonLinesLog(args.events) if args.events else None
+        settings = write_settings(args)
+        analyzer = settings['cache'].analyzer
+        daemon = WatchDaemon(watcher, image_path=args.image,
+                             resolver=resolver_from_args(args, analyzer),
+                             workers=args.workers, settle=args.settle, on_result=on_result,
+                             on_event=events, **settings)
+        # SIGTERM (systemd, docker stop) Ctrl+C gibi temiz kapanış yapsın
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        mode = 'inotify' if isinstance(watcher, InotifyWatcher) else f'polling every {watcher.interval}s'
+        print(f">>> WATCHING {len(args.paths)} PATH(S) ({mode}), {daemon.workers} WORKER(S) <<<",
+              flush=True)
+        try:
+            report = daemon.run(scan_existing=args.scan_existing)
+        finally:
+            watcher.close()
+            if events:
+                events.close()
+            if analyzer is not None:
+                analyzer.save()
+        cpu = os.times()
+        print(f">>> {report.ok} OK, {report.failed} FAILED in {report.elapsed:.1f}s, "
+              f"CPU {cpu.user + cpu.system:.2f}s <<<")
+        if report.stages.samples:
+            print(report.stages.format_table())
+        return 1 if report.failed else 0
+    
+    if args.command == 'recover':
+        stats = recover_stale_journals(args.journal or default_journal_path(),
+                                       rollback=args.rollback)
+        print(f">>> {stats['resumed']} RESUMED, {stats['rolled_back']} ROLLED BACK <<<")
+        return 0
+    
+    if args.command == 'audit':
+        max_bytes = args.max_kb * 1024 if args.max_kb else None
+        results = []
+        counts = {'ok': 0, 'missing': 0, 'oversized': 0, 'error': 0}
+        for result in run_audit(expand_mp3_paths(args.paths), workers=args.workers,
+                                max_bytes=max_bytes, max_px=args.max_px):
+            counts[result['status']] += 1
+            if args.json:
+                results.append(result)
+            elif result['status'] == 'error':
+                print(f"ERROR: {result['mp3']} >>> {result['error']}", file=sys.stderr)
+            elif result['status'] != 'ok' or args.all:
+                details = ""
+                if result['front_bytes']:
+                    details = f" ({result['mime']}, {result['front_bytes']} bytes, " \
+                              f"{result['width']}x{result['height']})"
+                print(f"{result['status'].upper()}: {result['mp3']}{details}")
+                
+        if args.json:
+            print(json.dumps({'summary': counts, 'files': results}, indent=2))
+        else:
+            print(f">>> {counts['ok']} OK, {counts['missing']} MISSING, "
+                  f"{counts['oversized']} OVERSIZED, {counts['error']} ERRORS <<<")
+        return 0
+    
+    if args.command == 'index':
+        db_path = args.db
+        if db_path is None:
+            os.makedirs(default_cache_dir('index'), exist_ok=True)
+            db_path = os.path.join(default_cache_dir('index'), 'covers.sqlite')
+        cover_index = CoverIndex(db_path)
+        output = {}
+        try:
+            if args.scan:
+                output['scan'] = cover_index.update(args.scan, workers=args.workers)
+            if args.missing:
+                output['missing'] = cover_index.missing()
+            if args.smaller_than:
+                output['smaller_than'] = cover_index.smaller_than(args.smaller_than)
+            if args.larger_than:
+                output['larger_than'] = cover_index.larger_than(args.larger_than * 1024)
+            if args.mismatch:
+                output['mismatch'] = cover_index.album_mismatches()
+            if args.dedup:
+                output['dedup'] = cover_index.dedup_report()
+        finally:
+            cover_index.close()
+            
+        if args.json:
+            print(json.dumps(output, indent=2))
+            return 0
+        if 'scan' in output:
+            scan = output['scan']
+            print(f">>> SCANNED {scan['scanned']}, UNCHANGED {scan['unchanged']}, "
+                  f"REMOVED {scan['removed']} <<<")
+        for path in output.get('missing', []):
+            print(f"MISSING: {path}")
+        for row in output.get('smaller_than', []):
+            print(f"SMALL: {row['path']} ({row['width']}x{row['height']})")
+        for row in output.get('larger_than', []):
+            print(f"LARGE: {row['path']} ({row['cover_bytes']} bytes)")
+        for row in output.get('mismatch', []):
+            print(f"MISMATCH: {row['path']}")
+        if 'dedup' in output:
+            dedup = output['dedup']
+            print(f">>> {dedup['tracks']} TRACKS, {dedup['unique_covers']} UNIQUE COVERS, "
+                  f"{dedup['cover_bytes']} COVER BYTES, {dedup['duplicate_bytes']} IN DUPLICATES <<<")
+            for row in dedup['top']:
+                print(f"DUPLICATE: {row['cover_digest']} x{row['copies']} "
+                      f"({row['duplicate_bytes']} bytes wasted)")
+        return 0
+    
+    return 0
+
+
 def main():
     """Ana fonksiyon"""
     try:
-        from mutagen.mp3 import MP3
-        from mutagen.id3 import ID3, APIC
-        from PIL import Image
-        from tkinterdnd2 import TkinterDnD
-    except ImportError as e:
+        _load_gui_modules()
+    except ImportError:
         print("MISSING DEPENDENCIES!")
         print("Please install: pip install mutagen pillow tkinterdnd2")
         return
@@ -550,4 +4712,6 @@ def main():
         root.destroy()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli_main())
     main()
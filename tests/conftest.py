@@ -0,0 +1,130 @@
+import os
+import sys
+import struct
+
+import pytest
+from mutagen.id3 import ID3, APIC, TIT2
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mp3_cover_tool as tool  # noqa: E402
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz frame header; gövde rastgele
+FRAME_HEADER = b'\xff\xfb\x90\x64'
+FRAME_BODY = 413
+
+
+def audio_payload(path):
+    """ID3v2 tag'inden sonraki byte'lar (MPEG verisi)"""
+    with open(path, 'rb') as f:
+        header = tool.read_id3_header(f)
+        f.seek(header['total_size'] if header else 0)
+        return f.read()
+
+
+@pytest.fixture
+def make_mp3(tmp_path):
+    """make_mp3(name, padding=0, tagged=True, frames=64) -> yol"""
+    def make(name, padding=0, tagged=True, frames=64):
+        path = str(tmp_path / name)
+        with open(path, 'wb') as f:
+            for _ in range(frames):
+                f.write(FRAME_HEADER + os.urandom(FRAME_BODY))
+        if tagged:
+            tags = ID3()
+            tags.add(TIT2(encoding=3, text='Test'))
+            tags.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='', data=b'old' * 10))
+            tags.save(path, padding=lambda info: padding)
+        return path
+    return make
+
+
+@pytest.fixture
+def make_cover(tmp_path):
+    """make_cover(name, size=64, color=(200, 30, 30)) -> yol"""
+    def make(name, size=64, color=(200, 30, 30)):
+        path = str(tmp_path / name)
+        Image.new('RGB', (size, size), color).save(path, 'JPEG' if name.endswith('.jpg') else 'PNG')
+        return path
+    return make
+
+
+@pytest.fixture
+def make_flac(tmp_path):
+    """Sadece STREAMINFO + padding bloğu ve rastgele 'frame' verisi olan FLAC"""
+    def make(name):
+        path = str(tmp_path / name)
+        info = (struct.pack('>HH', 4096, 4096) + b'\0' * 6
+                + bytes([0x0A, 0xC4, 0x42, 0xF0]) + b'\0' * 4 + b'\0' * 16)
+        data = b'fLaC' + bytes([0]) + struct.pack('>I', len(info))[1:] + info
+        data += bytes([0x80 | 1]) + struct.pack('>I', 64)[1:] + b'\0' * 64
+        data += b'\xff\xf8' + os.urandom(20000)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    return make
+
+
+def _ogg_pages(headers, audio_packets, serial):
+    """Başlık paketleri (sayfa başına liste) + granule'lü audio sayfaları"""
+    from mutagen.ogg import OggPage
+
+    pages = [(packets, 0) for packets in headers]
+    pages += [([packet], granule) for packet, granule in audio_packets]
+    data = b''
+    for i, (packets, granule) in enumerate(pages):
+        page = OggPage()
+        page.serial, page.sequence, page.packets, page.position = serial, i, packets, granule
+        page.first, page.last = i == 0, i == len(pages) - 1
+        data += page.write()
+    return data
+
+
+@pytest.fixture
+def make_ogg(tmp_path):
+    """make_ogg(name, codec='vorbis') -> yol; 'opus' için OpusHead/OpusTags"""
+    def make(name, codec='vorbis'):
+        path = str(tmp_path / name)
+        if codec == 'opus':
+            head = b'OpusHead' + struct.pack('<BBHIhB', 1, 2, 312, 48000, 0, 0)
+            tags = b'OpusTags' + struct.pack('<I', 6) + b'tester' + struct.pack('<I', 0)
+            data = _ogg_pages([[head], [tags]],
+                              [(b'\xfc' + os.urandom(300), 960 * (k + 1)) for k in range(50)], 9)
+        else:
+            ident = b'\x01vorbis' + struct.pack('<IBIiii', 0, 2, 44100, 0, 128000, 0) + b'\xb8\x01'
+            comment = (b'\x03vorbis' + struct.pack('<I', 6) + b'tester' + struct.pack('<I', 1)
+                       + struct.pack('<I', 9) + b'TITLE=abc' + b'\x01')
+            data = _ogg_pages([[ident], [comment, b'\x05vorbis' + b'\0' * 100]],
+                              [(os.urandom(3000), 44100 * (k + 1)) for k in range(50)], 7)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    return make
+
+
+@pytest.fixture
+def make_m4a(tmp_path):
+    """ftyp + moov (ilst ve 1 KB free atom'u) + rastgele mdat olan M4A"""
+    def atom(kind, body, version=None):
+        if version is not None:
+            body = struct.pack('>I', version) + body
+        return struct.pack('>I', 8 + len(body)) + kind + body
+
+    def make(name):
+        path = str(tmp_path / name)
+        sample = atom(b'mp4a', b'\0' * 6 + struct.pack('>H', 1) + b'\0' * 8
+                      + struct.pack('>HHHHI', 2, 16, 0, 0, 44100 << 16) + atom(b'free', b''))
+        track = atom(b'trak', atom(b'mdia', (
+            atom(b'mdhd', struct.pack('>IIII', 0, 0, 44100, 44100 * 5) + b'\0' * 4, 0)
+            + atom(b'hdlr', b'\0' * 4 + b'soun' + b'\0' * 13, 0)
+            + atom(b'minf', atom(b'stbl', atom(b'stsd', struct.pack('>I', 1) + sample, 0))))))
+        ilst = atom(b'ilst', atom(b'\xa9nam', atom(b'data', struct.pack('>II', 1, 0) + b'abc')))
+        meta = atom(b'meta', atom(b'hdlr', b'\0' * 4 + b'mdirappl' + b'\0' * 9, 0)
+                    + ilst + atom(b'free', b'\0' * 1024), 0)
+        moov = atom(b'moov', atom(b'mvhd', struct.pack('>IIII', 0, 0, 1000, 5000) + b'\0' * 80, 0)
+                    + track + atom(b'udta', meta))
+        with open(path, 'wb') as f:
+            f.write(atom(b'ftyp', b'M4A \0\0\0\0M4A mp42isom') + moov + atom(b'mdat', os.urandom(20000)))
+        return path
+    return make
@@ -0,0 +1,39 @@
+import pytest
+from PIL import Image
+
+import mp3_cover_tool as tool
+
+np = pytest.importorskip('numpy')
+
+
+def pattern(seed, width, height):
+    """8x8 bloklu rastgele gri desen (küçültmede hash'i değişmez)"""
+    blocks = np.random.default_rng(seed).integers(0, 256, (8, 8), dtype=np.uint8)
+    return Image.fromarray(blocks).resize((width, height), Image.NEAREST).convert('RGB')
+
+
+def test_letterbox_is_cropped_and_clean_copy_wins(tmp_path):
+    content = pattern(1, 256, 192)
+    letterboxed = Image.new('RGB', (256, 256))
+    letterboxed.paste(content, (0, 32))
+    paths = {name: str(tmp_path / name) for name in ('scan.png', 'clean.png', 'other.png')}
+    letterboxed.save(paths['scan.png'])
+    content.resize((512, 384), Image.NEAREST).save(paths['clean.png'])
+    pattern(2, 300, 300).save(paths['other.png'])
+
+    analyzer = tool.CoverAnalyzer(cache_path=str(tmp_path / 'cache' / 'scores.json'))
+    # Üst/alt siyah şeritler atılır, 4:3 içerik ortadan kareye kırpılır
+    assert analyzer.crop_for(paths['scan.png']) == \
+        pytest.approx((0.125, 0.125, 0.875, 0.875), abs=0.01)
+    assert analyzer.crop_for(paths['other.png']) is None
+
+    ranked = analyzer.score(list(paths.values()))
+    duplicates = {path: copy_of for score, path, features, copy_of in ranked}
+    assert duplicates == {paths['scan.png']: paths['clean.png'],
+                          paths['clean.png']: None, paths['other.png']: None}
+    assert ranked[-1][1] == paths['scan.png']
+
+    analyzer.save()
+    cached = tool.CoverAnalyzer(cache_path=str(tmp_path / 'cache' / 'scores.json'))
+    assert cached.score(list(paths.values())) == ranked
+    assert cached.decoded == 0
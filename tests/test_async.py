@@ -0,0 +1,86 @@
+import os
+import time
+import threading
+
+import mp3_cover_tool as tool
+from conftest import audio_payload
+
+
+def library(make_mp3, make_cover):
+    """İki albüm: biri padding'li (in_place), biri sıkı tag'li (rewrite)"""
+    front = make_cover('front.png', color=(10, 200, 10))
+    other = make_cover('other.png', color=(200, 10, 200))
+    jobs = [(make_mp3(f'a{i}.mp3', padding=16 * 1024), front) for i in range(4)]
+    jobs += [(make_mp3(f'b{i}.mp3'), other) for i in range(3)]
+    return jobs
+
+
+def outcome(report):
+    return sorted((os.path.basename(r['mp3']), r['ok'], r['write_mode'], r['cover_digest'])
+                  for r in report.results)
+
+
+def test_async_matches_process_pool(tmp_path, make_mp3, make_cover):
+    jobs = library(make_mp3, make_cover)
+    audio = {path: audio_payload(path) for path, image in jobs}
+    originals = {path: open(path, 'rb').read() for path, image in jobs}
+
+    sync = tool.run_batch(jobs, workers=1)
+    written = {path: open(path, 'rb').read() for path, image in jobs}
+    for path, data in originals.items():
+        open(path, 'wb').write(data)
+
+    async_report = tool.run_batch_async(jobs, concurrency=3, per_mount=2)
+    assert outcome(async_report) == outcome(sync)
+    assert async_report.mounts == 1
+    assert {path: open(path, 'rb').read() for path, image in jobs} == written
+    assert {path: audio_payload(path) for path, image in jobs} == audio
+
+    again = tool.run_batch_async(jobs, concurrency=3, per_mount=2)
+    assert {r['write_mode'] for r in again.results} == {'skipped'}
+
+
+def test_async_atomic_batches_fsyncs(tmp_path, make_mp3, make_cover, monkeypatch):
+    jobs = library(make_mp3, make_cover)
+    flushes = []
+    original = tool.AtomicWriter._flush
+
+    def counting_flush(self, pending):
+        flushes.append(len(pending))
+        return original(self, pending)
+    monkeypatch.setattr(tool.AtomicWriter, '_flush', counting_flush)
+
+    report = tool.run_batch_async(jobs, concurrency=8, per_mount=8,
+                                  atomic={'fsync_batch': 4,
+                                          'journal': str(tmp_path / 'journal' / 'inject.jsonl')})
+    assert report.failed == 0
+    assert len(report.results) == len(jobs)
+    assert {r['write_mode'] for r in report.results} == {'atomic'}
+    assert all('sync' in r['stages'] for r in report.results)
+    assert sum(flushes) == len(jobs)
+    assert len(flushes) < len(jobs)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    assert os.listdir(tmp_path / 'journal') == []
+
+
+def test_per_mount_limit_caps_files_in_flight(make_mp3, make_cover, monkeypatch):
+    jobs = library(make_mp3, make_cover)
+    lock = threading.Lock()
+    running = [0, 0]
+    original = tool.write_cover
+
+    def slow_write(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(0.02)
+        try:
+            return original(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+    monkeypatch.setattr(tool, 'write_cover', slow_write)
+
+    report = tool.run_batch_async(jobs, concurrency=8, per_mount=2)
+    assert report.ok == len(jobs)
+    assert running[1] == 2
@@ -0,0 +1,39 @@
+import os
+
+import mp3_cover_tool as tool
+
+
+class WorkerKiller:
+    """Worker'da unpickle edilince process'i öldüren sahte cover"""
+
+    source = 'killer.png'
+    digest = 'killer'
+
+    def __reduce__(self):
+        return (os._exit, (3,))
+
+
+class KillerCache(tool.CoverCache):
+    def get(self, image_path):
+        if image_path == WorkerKiller.source:
+            return WorkerKiller()
+        return super().get(image_path)
+
+
+def test_dead_worker_fails_its_chunk_and_the_batch_continues(make_mp3, make_cover):
+    cover = make_cover('cover.png')
+    doomed = [make_mp3(f'doomed{i}.mp3') for i in range(2)]
+    healthy = [make_mp3(f'ok{i}.mp3') for i in range(6)]
+    jobs = [(path, WorkerKiller.source) for path in doomed] + [(path, cover) for path in healthy]
+
+    report = tool.run_batch(jobs, workers=2, cache=KillerCache())
+
+    by_path = {r['mp3']: r for r in report.results}
+    assert sorted(by_path) == sorted(doomed + healthy)
+    for path in doomed:
+        assert not by_path[path]['ok']
+        assert by_path[path]['error'].startswith('BrokenProcessPool')
+    # Ölen pool'da bekleyenler FAILED olabilir; yeni pool'a gidenler yazılır
+    written = [path for path in healthy if by_path[path]['ok']]
+    assert written
+    assert report.ok + report.failed == len(jobs)
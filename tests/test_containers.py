@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+import mp3_cover_tool as tool
+
+
+@pytest.fixture
+def cover(make_cover):
+    # 600 px PNG, 300 px JPEG'e normalize edilip gömülür
+    return tool.load_cover(make_cover('cover.png', size=600),
+                           normalize={'max_size': 300, 'format': 'jpeg'})
+
+
+@pytest.fixture(params=['flac', 'm4a', 'ogg', 'opus'])
+def track(request, make_flac, make_m4a, make_ogg):
+    if request.param == 'flac':
+        return make_flac('a.flac')
+    if request.param == 'm4a':
+        return make_m4a('a.m4a')
+    return make_ogg('a.ogg', codec='opus' if request.param == 'opus' else 'vorbis')
+
+
+def duration(path):
+    return tool.open_container(path).info.length
+
+
+def test_write_skip_and_patch_in_place(track, cover):
+    length = duration(track)
+    assert cover.mime == 'image/jpeg'
+
+    result = tool.write_cover(track, cover)
+    assert result['ok'] and result['write_mode'] == 'rewrite'
+    assert [(p.type, p.mime, p.data) for p in tool.read_embedded_covers(track)] == \
+        [(3, 'image/jpeg', cover.data)]
+    assert duration(track) == length
+
+    snapshot = open(track, 'rb').read()
+    assert tool.write_cover(track, cover)['write_mode'] == 'skipped'
+    assert open(track, 'rb').read() == snapshot
+
+    # İlk yazımda bırakılan padding'e sığar: dosya boyu değişmez
+    assert tool.write_cover(track, cover, force=True)['write_mode'] == 'in_place'
+    assert os.path.getsize(track) == len(snapshot)
+    assert [p.data for p in tool.read_embedded_covers(track)] == [cover.data]
+    assert duration(track) == length
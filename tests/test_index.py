@@ -0,0 +1,22 @@
+import os
+
+import mp3_cover_tool as tool
+
+
+def test_update_rescans_only_changed_files(tmp_path, make_mp3):
+    mp3s = [make_mp3(f'{i}.mp3') for i in range(4)]
+    index = tool.CoverIndex(str(tmp_path / 'index.db'))
+    try:
+        assert index.update([str(tmp_path)], workers=1) == \
+            {'scanned': 4, 'unchanged': 0, 'removed': 0}
+        assert index.update([str(tmp_path)], workers=1) == \
+            {'scanned': 0, 'unchanged': 4, 'removed': 0}
+
+        st = os.stat(mp3s[0])
+        os.utime(mp3s[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        os.remove(mp3s[1])
+        assert index.update([str(tmp_path)], workers=1) == \
+            {'scanned': 1, 'unchanged': 2, 'removed': 1}
+        assert index.missing() == []
+    finally:
+        index.close()
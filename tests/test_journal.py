@@ -0,0 +1,139 @@
+import os
+import json
+
+import pytest
+import mutagen.flac
+
+import mp3_cover_tool as tool
+
+
+def write_journal(path, *entries):
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+@pytest.fixture
+def pair(tmp_path):
+    """(hedef, temp) dosya çifti: hedefte eski, temp'te yeni içerik"""
+    target = tmp_path / 'song.mp3'
+    target.write_bytes(b'old')
+    tmp = tmp_path / '.song.mp3.x.tmp'
+    tmp.write_bytes(b'new content')
+    return str(target), str(tmp)
+
+
+def test_recover_begin_only_is_rolled_back(tmp_path, pair):
+    target, tmp = pair
+    journal = str(tmp_path / 'inject.jsonl')
+    write_journal(journal, {'op': 'begin', 'target': target, 'tmp': tmp})
+    assert tool.recover_journal(journal) == {'resumed': 0, 'rolled_back': 1}
+    assert open(target, 'rb').read() == b'old'
+    assert not os.path.exists(tmp)
+    assert not os.path.exists(journal)
+
+
+def test_recover_synced_is_resumed(tmp_path, pair):
+    target, tmp = pair
+    journal = str(tmp_path / 'inject.jsonl')
+    write_journal(journal,
+                  {'op': 'begin', 'target': target, 'tmp': tmp},
+                  {'op': 'synced', 'target': target, 'tmp': tmp, 'size': os.path.getsize(tmp)})
+    assert tool.recover_journal(journal) == {'resumed': 1, 'rolled_back': 0}
+    assert open(target, 'rb').read() == b'new content'
+    assert not os.path.exists(tmp)
+
+
+def test_recover_synced_with_wrong_size_or_rollback_is_discarded(tmp_path, pair):
+    target, tmp = pair
+    journal = str(tmp_path / 'inject.jsonl')
+    synced = {'op': 'synced', 'target': target, 'tmp': tmp, 'size': 3}
+    write_journal(journal, synced)
+    assert tool.recover_journal(journal) == {'resumed': 0, 'rolled_back': 1}
+    assert open(target, 'rb').read() == b'old'
+
+    open(tmp, 'wb').write(b'new content')
+    write_journal(journal, dict(synced, size=os.path.getsize(tmp)))
+    assert tool.recover_journal(journal, rollback=True) == {'resumed': 0, 'rolled_back': 1}
+    assert open(target, 'rb').read() == b'old'
+
+
+def test_recover_ignores_committed_and_aborted_entries(tmp_path, pair):
+    target, tmp = pair
+    journal = str(tmp_path / 'inject.jsonl')
+    size = os.path.getsize(tmp)
+    write_journal(journal,
+                  {'op': 'begin', 'target': target, 'tmp': tmp},
+                  {'op': 'synced', 'target': target, 'tmp': tmp, 'size': size},
+                  {'op': 'commit', 'target': target, 'tmp': tmp},
+                  {'op': 'begin', 'target': target, 'tmp': tmp + '2'},
+                  {'op': 'abort', 'target': target, 'tmp': tmp + '2'})
+    # Crash anında yarım kalmış satır
+    with open(journal, 'a') as f:
+        f.write('{"op": "beg')
+    assert tool.recover_journal(journal) == {'resumed': 0, 'rolled_back': 0}
+    assert open(target, 'rb').read() == b'old'
+    assert not os.path.exists(journal)
+
+
+def test_live_run_journal_is_not_recovered(tmp_path, pair):
+    target, tmp = pair
+    base = str(tmp_path / 'inject.jsonl')
+    live = tool.RunJournal(base)
+    write_journal(live.path, {'op': 'synced', 'target': target, 'tmp': tmp,
+                              'size': os.path.getsize(tmp)})
+    # Ölmüş bir çalışmanın journal'ı
+    stale = str(tmp_path / 'inject.1-dead.jsonl')
+    stale_tmp = tmp + '.stale'
+    open(stale_tmp, 'wb').write(b'x')
+    write_journal(stale, {'op': 'begin', 'target': target, 'tmp': stale_tmp})
+
+    assert tool.recover_stale_journals(base) == {'resumed': 0, 'rolled_back': 1}
+    assert not os.path.exists(stale)
+    assert os.path.exists(live.path) and os.path.exists(tmp)
+
+    # Çalışma kendi açık kayıtlarını resume etmez, abort eder
+    live.close()
+    assert open(target, 'rb').read() == b'old'
+    assert not os.path.exists(tmp)
+    assert os.listdir(tmp_path) == ['song.mp3']
+
+
+def test_failed_fsync_aborts_instead_of_resuming(tmp_path, make_mp3, make_cover, monkeypatch):
+    mp3 = make_mp3('a.mp3')
+    before = open(mp3, 'rb').read()
+    cover = make_cover('cover.png')
+    journal_dir = tmp_path / 'journal'
+
+    def broken_fsync(fd):
+        raise OSError(5, 'Input/output error')
+    monkeypatch.setattr(tool.os, 'fsync', broken_fsync)
+    report = tool.run_batch([(mp3, cover)], workers=1,
+                            atomic={'fsync_batch': 8, 'journal': str(journal_dir / 'inject.jsonl')})
+    monkeypatch.undo()
+
+    assert report.failed == 1
+    assert open(mp3, 'rb').read() == before
+    assert sorted(os.listdir(tmp_path)) == ['a.mp3', 'cover.png', 'journal']
+    assert os.listdir(journal_dir) == []
+    assert tool.recover_stale_journals(str(journal_dir / 'inject.jsonl')) == \
+        {'resumed': 0, 'rolled_back': 0}
+
+
+def test_failed_container_save_records_abort(tmp_path, make_flac, make_cover, monkeypatch):
+    flac = make_flac('a.flac')
+    before = open(flac, 'rb').read()
+    cover = tool.load_cover(make_cover('cover.png'))
+    journal = str(tmp_path / 'inject.jsonl')
+    writer = tool.AtomicWriter(journal=journal)
+
+    def broken_save(self, *args, **kwargs):
+        raise OSError(28, 'No space left on device')
+    monkeypatch.setattr(mutagen.flac.FLAC, 'save', broken_save)
+    with pytest.raises(OSError):
+        tool.write_cover(flac, cover, writer=writer)
+
+    assert open(flac, 'rb').read() == before
+    ops = [json.loads(line)['op'] for line in open(journal)]
+    assert ops == ['begin', 'abort']
+    assert sorted(os.listdir(tmp_path)) == ['a.flac', 'cover.png', 'inject.jsonl']
@@ -0,0 +1,29 @@
+import io
+
+from PIL import Image
+
+import mp3_cover_tool as tool
+
+
+def test_normalized_cover_round_trip(tmp_path, make_mp3, make_flac, make_m4a, make_ogg):
+    image = Image.new('RGB', (1200, 900), (40, 90, 160))
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera'
+    image.save(tmp_path / 'cover.jpg', 'JPEG', exif=exif)
+    tracks = [make_mp3('a.mp3'), make_flac('b.flac'), make_m4a('c.m4a'), make_ogg('d.ogg')]
+    jobs = [(path, str(tmp_path / 'cover.jpg')) for path in tracks]
+    normalize = dict(tool.DEFAULT_NORMALIZE, max_size=500, max_bytes=20 * 1024)
+
+    first = tool.run_batch(jobs, workers=1, cache=tool.CoverCache(normalize=normalize))
+    assert first.failed == 0 and first.skipped == 0
+    embedded = {cover.data for path in tracks for cover in tool.read_embedded_covers(path)}
+    assert len(embedded) == 1
+    data = embedded.pop()
+    assert len(data) <= 20 * 1024
+    with Image.open(io.BytesIO(data)) as cover:
+        assert (cover.format, cover.size) == ('JPEG', (500, 375))
+        assert not cover.getexif()
+
+    # Normalize deterministik: yeni bir cache aynı digest'i üretir, hiçbir dosya yazılmaz
+    second = tool.run_batch(jobs, workers=1, cache=tool.CoverCache(normalize=normalize))
+    assert [r['write_mode'] for r in second.results] == ['skipped'] * len(tracks)
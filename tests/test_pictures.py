@@ -0,0 +1,49 @@
+import os
+
+import mp3_cover_tool as tool
+
+
+def embedded_roles(path):
+    """{type: data} gömülü resimler"""
+    return {int(frame.type): frame.data for frame in tool.read_embedded_covers(path)}
+
+
+def inject_args(argv):
+    parser = tool.build_arg_parser()
+    args = parser.parse_args(['inject'] + argv)
+    return tool.jobs_from_args(parser, args)
+
+
+def test_picture_spec_merges_row_roles_over_cli_roles():
+    row = tool.picture_spec('/m/front.jpg', [('back', '/m/back.jpg')])
+    assert row == (('front', '/m/front.jpg'), ('back', '/m/back.jpg'))
+    merged = tool.picture_spec(row, [('artist', '/c/artist.jpg'), ('back', '/c/back.jpg')])
+    assert merged == (('front', '/m/front.jpg'), ('back', '/m/back.jpg'),
+                      ('artist', '/c/artist.jpg'))
+    assert tool.picture_spec('/m/front.jpg', []) == '/m/front.jpg'
+    assert tool.picture_spec(None, [('back', '/c/back.jpg')]) == (('back', '/c/back.jpg'),)
+
+
+def test_manifest_roles_with_picture_option(tmp_path, make_mp3, make_cover):
+    with_roles = make_mp3('x.mp3')
+    plain = make_mp3('y.mp3')
+    make_cover('front.png', color=(255, 0, 0))
+    make_cover('back.png', color=(0, 255, 0))
+    artist = make_cover('artist.png', color=(0, 0, 255))
+    make_cover('other_back.png', color=(9, 9, 9))
+    manifest = tmp_path / 'pairs.csv'
+    manifest.write_text('x.mp3,front.png,back=back.png\n'
+                        'y.mp3,front.png\n')
+
+    jobs = inject_args(['--manifest', str(manifest), '--picture', f'artist={artist}',
+                        '--picture', f'back={tmp_path / "other_back.png"}'])
+    report = tool.run_batch(jobs, workers=1)
+    assert report.failed == 0, [r['error'] for r in report.results]
+
+    data = {name: open(tmp_path / name, 'rb').read()
+            for name in ('front.png', 'back.png', 'artist.png', 'other_back.png')}
+    assert embedded_roles(with_roles) == {3: data['front.png'], 4: data['back.png'],
+                                          8: data['artist.png']}
+    assert embedded_roles(plain) == {3: data['front.png'], 4: data['other_back.png'],
+                                     8: data['artist.png']}
+    assert sorted(os.listdir(tmp_path)) == sorted(['x.mp3', 'y.mp3', 'pairs.csv'] + list(data))
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+from mutagen import MutagenError
+
+import mp3_cover_tool as tool
+
+
+@pytest.fixture
+def cover(make_cover):
+    return tool.load_cover(make_cover('cover.jpg', size=128))
+
+
+def plan_then_inject(path, cover, **options):
+    plan = tool.plan_cover(path, cover, **options)
+    result = tool.write_cover(path, cover, **options)
+    return plan['mode'], result['write_mode']
+
+
+@pytest.mark.parametrize('overflow, mode', [(0, 'in_place'), (1, 'rewrite')])
+def test_id3_padding_boundary(make_mp3, cover, overflow, mode):
+    probe = tool.plan_cover(make_mp3('probe.mp3'), cover)
+    old_size, new_size = probe['old_tag_size'], probe['new_tag_size']
+    # Yeni tag eski tag + padding'i tam dolduruyor ya da 1 byte taşıyor
+    mp3 = make_mp3('a.mp3', padding=new_size - old_size - overflow)
+    assert tool.plan_cover(mp3, cover)['old_tag_size'] == new_size - overflow
+    assert plan_then_inject(mp3, cover) == (mode, mode)
+
+
+def test_flac_plan_matches_inject(make_flac, cover):
+    flac = make_flac('a.flac')
+    # 64 byte'lık padding bloğuna sığmaz; ikinci yazımda bırakılan padding'e sığar
+    assert plan_then_inject(flac, cover) == ('rewrite', 'rewrite')
+    size = os.path.getsize(flac)
+    assert plan_then_inject(flac, cover, force=True) == ('in_place', 'in_place')
+    assert os.path.getsize(flac) == size
+    assert plan_then_inject(flac, cover) == ('skipped', 'skipped')
+
+
+def test_corrupt_mp3_is_planned_as_error(tmp_path, cover):
+    mp3 = str(tmp_path / 'garbage.mp3')
+    with open(mp3, 'wb') as f:
+        f.write(b'\x00garbage' * 1024)
+    plan = tool.plan_cover(mp3, cover)
+    assert plan['mode'] == 'error'
+    assert plan['error'].startswith('HeaderNotFoundError')
+    with pytest.raises(MutagenError):
+        tool.write_cover(mp3, cover)
@@ -0,0 +1,33 @@
+import os
+
+import mp3_cover_tool as tool
+
+
+def album(tmp_path, make_cover, *names):
+    """names resimleriyle bir albüm klasörü; MP3 yolu döner"""
+    directory = tmp_path / 'album'
+    directory.mkdir(exist_ok=True)
+    for name, size in names:
+        make_cover(os.path.join('album', name), size=size)
+    return str(directory / '01.mp3')
+
+
+def test_rules_are_tried_in_order_before_the_largest(tmp_path, make_cover):
+    mp3 = album(tmp_path, make_cover, ('scan_big.png', 512), ('front.png', 64),
+                ('Folder.jpg', 64), ('folder.png', 64))
+    directory = os.path.dirname(mp3)
+    resolver = tool.CoverResolver()
+    # 'folder' kuralı 'front'tan önce; aynı adda IMAGE_EXTENSIONS sırası (.jpg önce)
+    assert resolver.resolve(mp3) == os.path.join(directory, 'Folder.jpg')
+
+    os.remove(os.path.join(directory, 'Folder.jpg'))
+    os.remove(os.path.join(directory, 'folder.png'))
+    assert resolver.resolve(mp3) == os.path.join(directory, 'Folder.jpg')
+    resolver.forget(directory)
+    assert resolver.resolve(mp3) == os.path.join(directory, 'front.png')
+
+    os.remove(os.path.join(directory, 'front.png'))
+    resolver.forget(directory)
+    assert resolver.resolve(mp3) == os.path.join(directory, 'scan_big.png')
+    assert tool.CoverResolver(fallback_largest=False).resolve(mp3) is None
+    assert resolver.listings == 3
@@ -0,0 +1,44 @@
+import os
+import time
+
+import mp3_cover_tool as tool
+from conftest import FRAME_HEADER, FRAME_BODY
+
+
+def spin(daemon, seconds):
+    """WatchDaemon.run döngüsünün bir kısmı, pool olmadan"""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        daemon.add(daemon.watcher.wait(0.02))
+        daemon.check_pending()
+        daemon.dispatch(None)
+        daemon.collect()
+
+
+def test_album_is_injected_once_after_it_settles(tmp_path, make_mp3, make_cover):
+    watcher = tool.PollingWatcher([str(tmp_path)], tool.AUDIO_EXTENSIONS + tool.IMAGE_EXTENSIONS,
+                                  interval=0.02)
+    results = []
+    daemon = tool.WatchDaemon(watcher, workers=1, settle=0.3, on_result=results.append)
+
+    (tmp_path / 'album').mkdir()
+    make_cover(os.path.join('album', 'cover.png'))
+    mp3s = [make_mp3(os.path.join('album', f'{i}.mp3')) for i in range(3)]
+    spin(daemon, 0.15)
+    # Kopyalama sürüyor: dosya büyüdükçe klasör beklemeye devam eder
+    with open(mp3s[0], 'ab') as f:
+        f.write(FRAME_HEADER + os.urandom(FRAME_BODY))
+    spin(daemon, 0.15)
+    assert results == []
+    assert daemon.pending
+
+    spin(daemon, 0.5)
+    assert sorted(r['mp3'] for r in results) == sorted(mp3s)
+    assert all(r['ok'] and r['latency'] >= 0.3 for r in results)
+    assert not daemon.pending and not daemon.busy
+    assert sorted(daemon.written) == sorted(mp3s)
+
+    # Kendi yazmalarımızın kaydı debounce penceresinden sonra düşer
+    spin(daemon, 1.1)
+    assert daemon.written == {}
+    assert len(results) == 3
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+import mp3_cover_tool as tool
+from conftest import audio_payload
+
+
+@pytest.fixture
+def cover(make_cover):
+    return tool.load_cover(make_cover('cover.jpg', size=128))
+
+
+def embedded(path):
+    return [frame.data for frame in tool.read_embedded_covers(path)]
+
+
+def test_in_place_keeps_audio_and_file_size(make_mp3, cover):
+    mp3 = make_mp3('a.mp3', padding=64 * 1024)
+    audio, size = audio_payload(mp3), os.path.getsize(mp3)
+    result = tool.write_cover(mp3, cover)
+    assert result['write_mode'] == 'in_place'
+    assert os.path.getsize(mp3) == size
+    assert audio_payload(mp3) == audio
+    assert embedded(mp3) == [cover.data]
+
+
+@pytest.mark.parametrize('tagged', [True, False])
+def test_rewrite_keeps_audio_and_leaves_padding(make_mp3, cover, tagged):
+    mp3 = make_mp3('a.mp3', tagged=tagged)
+    audio = audio_payload(mp3)
+    result = tool.write_cover(mp3, cover, padding_reserve=8192)
+    assert result['write_mode'] == 'rewrite'
+    assert result['padding'] == 8192
+    assert audio_payload(mp3) == audio
+    assert embedded(mp3) == [cover.data]
+
+
+@pytest.mark.parametrize('fsync_batch', [1, 4])
+def test_atomic_keeps_audio(tmp_path, make_mp3, cover, fsync_batch):
+    mp3s = [make_mp3(f'{i}.mp3', padding=4096 * (i % 2)) for i in range(3)]
+    audio = [audio_payload(path) for path in mp3s]
+    report = tool.run_batch([(path, cover.source) for path in mp3s], workers=1,
+                            atomic={'fsync_batch': fsync_batch,
+                                    'journal': str(tmp_path / 'journal' / 'inject.jsonl')})
+    assert report.failed == 0
+    assert {r['write_mode'] for r in report.results} == {'atomic'}
+    assert [audio_payload(path) for path in mp3s] == audio
+    assert all(embedded(path) == [cover.data] for path in mp3s)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    assert os.listdir(tmp_path / 'journal') == []
+
+
+def test_stream_keeps_audio(make_mp3, cover):
+    mp3 = make_mp3('a.mp3')
+    audio = audio_payload(mp3)
+    result = tool.write_cover(mp3, cover, memory_budget=64 * 1024 * 1024)
+    assert result['write_mode'] == 'stream'
+    assert audio_payload(mp3) == audio
+    assert embedded(mp3) == [cover.data]
+
+
+def test_second_run_is_skipped(tmp_path, make_mp3, cover):
+    mp3s = [make_mp3(f'{i}.mp3') for i in range(3)]
+    jobs = [(path, cover.source) for path in mp3s]
+    first = tool.run_batch(jobs, workers=1)
+    assert first.failed == 0 and first.skipped == 0
+    snapshot = [(open(path, 'rb').read(), os.stat(path).st_mtime_ns) for path in mp3s]
+
+    # Gömülü cover digest'i aynı: dosyalar açılır ama yazılmaz
+    second = tool.run_batch(jobs, workers=1)
+    assert [r['write_mode'] for r in second.results] == ['skipped'] * 3
+    assert [(open(path, 'rb').read(), os.stat(path).st_mtime_ns) for path in mp3s] == snapshot
+
+    # State dosyasıyla değişmemiş dosyalar hiç açılmaz
+    state_path = str(tmp_path / 'state.json')
+    tool.run_batch(jobs, workers=1, state=tool.InjectionState(state_path))
+    third = tool.run_batch(jobs, workers=1, state=tool.InjectionState(state_path))
+    assert [r['write_mode'] for r in third.results] == ['unchanged'] * 3
+
+    # force her iki kontrolü de kapatır
+    forced = tool.run_batch(jobs, workers=1, force=True,
+                            state=tool.InjectionState(state_path))
+    assert {r['write_mode'] for r in forced.results} == {'in_place'}